@@ -14,6 +14,7 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import json
 import time
+import random
 
 import httpx
 import yaml
@@ -25,14 +26,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger("gentleman-client")
 
+LATENCY_RANK = {"fast": 0, "normal": 1, "slow": 2, None: 3}
+
+def local_score(service: Dict) -> Tuple[int, float]:
+    """Lokale Bewertung für P2C: Latenzklasse aus dem Change-Feed, danach gemeldete Last
+    
+    Replizierte Einträge (events.service_view) tragen nur latency_class, keine Rohlatenz.
+    Bei gleicher Klasse ohne Lastangaben entscheidet die zufällige Auswahl der Kandidaten.
+    """
+    health = service.get("health") if isinstance(service.get("health"), dict) else {}
+    load = 0.0
+    for source in (health, health.get("stats")):
+        if not isinstance(source, dict):
+            continue
+        for field in ("in_flight", "busy_workers", "queue_depth"):
+            value = source.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                load += value
+    return LATENCY_RANK.get(service.get("latency_class"), 3), load
+
+def entry_version(service: Dict) -> Tuple:
+    """Replikationsversion eines Service-Eintrags (ältere Coordinators liefern keine)"""
+    version = service.get("version") or [0, ""]
+    return (version[0], version[1])
+
+class MeshReplica:
+    """Lokale Kopie des Mesh-Zustands, über den Change-Feed (/mesh/events) aktuell gehalten"""
+    
+    def __init__(self):
+        self.services: Dict[str, Dict] = {}
+        self.nodes: Dict[str, Dict] = {}
+        self.epoch: Optional[str] = None
+        self.version = 0
+        self.connected = False
+    
+    def apply(self, event: Dict):
+        if event["type"] == "snapshot":
+            self.services = dict(event["data"]["services"])
+            self.nodes = dict(event["data"]["nodes"])
+        elif event["type"] in ("service_removed", "node_leave"):
+            target = self.services if event["type"] == "service_removed" else self.nodes
+            target.pop(event["key"], None)
+        elif event["type"].startswith("node_"):
+            self.nodes[event["key"]] = event["data"]
+        elif event["data"] is not None:
+            self.services[event["key"]] = event["data"]
+        self.epoch = event.get("epoch", self.epoch)
+        self.version = event["version"]
+    
+    def healthy(self, service_type: str) -> List[Dict]:
+        matching = [s for s in self.services.values() if s["name"] == service_type and s["status"] == "healthy"]
+        matching.sort(key=lambda s: LATENCY_RANK.get(s.get("latency_class"), 3))
+        return matching
+    
+    async def follow(self, coordinator_urls: List[str]):
+        """SSE-Stream lesen, bei Abbruch mit since=<version> am nächsten Coordinator weitermachen"""
+        attempt = 0
+        while True:
+            coordinator_url = coordinator_urls[attempt % len(coordinator_urls)]
+            params = {"since": self.version, "epoch": self.epoch} if self.epoch else {}
+            try:
+                async with httpx.AsyncClient(timeout=httpx.Timeout(5.0, read=60.0)) as client:
+                    async with client.stream("GET", f"{coordinator_url}/mesh/events", params=params) as response:
+                        response.raise_for_status()
+                        attempt = 0
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data: "):
+                                continue
+                            event = json.loads(line[6:])
+                            if event["type"] == "resync":
+                                break
+                            self.apply(event)
+                            self.connected = True
+            except Exception as e:
+                logger.warning(f"⚠️ Change-Feed von {coordinator_url} unterbrochen: {e}")
+                attempt += 1
+            finally:
+                self.connected = False
+            await asyncio.sleep(min(30, 2 ** min(attempt, 5)) if attempt else 0)
+
 class GentlemanIntelligentClient:
     """Intelligenter Client für das Gentleman AI System"""
     
     def __init__(self):
         self.discovered_services = {}
         self.mesh_coordinators = []
+        self.coordinator_rtt: Dict[str, float] = {}
         self.service_cache = {}
-        self.cache_ttl = 300  # 5 Minuten
+        self.cache_ttl = 300  # 5 Minuten (nur ohne Change-Feed)
+        self.replica = MeshReplica()
+        self.replica_task: Optional[asyncio.Task] = None
         
         # Service Discovery Konfiguration
         self.discovery_config = {
@@ -102,6 +185,8 @@ class GentlemanIntelligentClient:
             except Exception as e:
                 logger.warning(f"⚠️ Fehler beim Scannen von {network}: {e}")
         
+        # Nächster Coordinator zuerst: alle replizieren denselben Stand
+        coordinators.sort(key=lambda url: self.coordinator_rtt.get(url, float("inf")))
         self.mesh_coordinators = coordinators
         logger.info(f"✅ {len(coordinators)} Mesh Coordinators gefunden: {coordinators}")
         return coordinators
@@ -114,8 +199,10 @@ class GentlemanIntelligentClient:
                 url = f"http://{ip}:{port}"
                 
                 async with httpx.AsyncClient(timeout=5.0) as client:
+                    start_time = time.time()
                     response = await client.get(f"{url}/health")
                     if response.status_code == 200:
+                        self.coordinator_rtt[url] = time.time() - start_time
                         return url
         except:
             pass
@@ -134,7 +221,11 @@ class GentlemanIntelligentClient:
                     response = await client.get(f"{coordinator_url}/mesh/services")
                     if response.status_code == 200:
                         services_data = response.json()
-                        all_services.update(services_data.get("services", {}))
+                        # Bei Abweichungen gewinnt der neuere Eintrag, nicht der zuletzt gefragte Coordinator
+                        for service_key, service in services_data.get("services", {}).items():
+                            known = all_services.get(service_key)
+                            if known is None or entry_version(service) > entry_version(known):
+                                all_services[service_key] = service
                         
             except Exception as e:
                 logger.warning(f"⚠️ Fehler beim Abrufen von Services von {coordinator_url}: {e}")
@@ -143,8 +234,36 @@ class GentlemanIntelligentClient:
         logger.info(f"🔍 {len(all_services)} Services über Mesh entdeckt")
         return all_services
     
+    async def find_via_coordinator(self, service_type: str) -> Optional[Dict]:
+        """Auswahl des Coordinators (/mesh/find: P2C über Latenz, Last und Hardware)"""
+        for coordinator_url in self.mesh_coordinators:
+            try:
+                async with httpx.AsyncClient(timeout=5.0) as client:
+                    response = await client.get(f"{coordinator_url}/mesh/find/{service_type}")
+                    if response.status_code == 200:
+                        return response.json().get("service")
+            except Exception as e:
+                logger.warning(f"⚠️ Fehler beim Suchen von {service_type}: {e}")
+        raise LookupError(f"Kein Mesh Coordinator erreichbar für {service_type}")
+    
     async def find_best_service(self, service_type: str) -> Optional[Dict]:
         """Besten Service für einen Typ finden"""
+        # Replica liefert die Verfügbarkeit ohne Polling; bei mehreren Instanzen entscheidet der Coordinator,
+        # damit Last und Hardware-Präferenzen (P2C) auch mit Change-Feed greifen
+        if self.replica.connected:
+            matching_services = self.replica.healthy(service_type)
+            if len(matching_services) <= 1:
+                return matching_services[0] if matching_services else None
+            try:
+                chosen = await self.find_via_coordinator(service_type)
+                if chosen is not None:
+                    return chosen
+            except LookupError:
+                pass
+            # Coordinator nicht erreichbar: P2C lokal über die replizierten Latenzklassen
+            first, second = random.sample(matching_services, 2)
+            return first if local_score(first) <= local_score(second) else second
+        
         # Cache prüfen
         cache_key = f"best_{service_type}"
         if cache_key in self.service_cache:
@@ -153,20 +272,13 @@ class GentlemanIntelligentClient:
                 return cached_service
         
         # Über Mesh Coordinator suchen
-        for coordinator_url in self.mesh_coordinators:
-            try:
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    response = await client.get(f"{coordinator_url}/mesh/find/{service_type}")
-                    if response.status_code == 200:
-                        result = response.json()
-                        best_service = result.get("service")
-                        
-                        # In Cache speichern
-                        self.service_cache[cache_key] = (time.time(), best_service)
-                        return best_service
-                        
-            except Exception as e:
-                logger.warning(f"⚠️ Fehler beim Suchen von {service_type}: {e}")
+        try:
+            best_service = await self.find_via_coordinator(service_type)
+            # In Cache speichern
+            self.service_cache[cache_key] = (time.time(), best_service)
+            return best_service
+        except LookupError:
+            pass
         
         # Fallback: Direkte Suche in entdeckten Services
         matching_services = [
@@ -341,6 +453,10 @@ class GentlemanIntelligentClient:
         # Services entdecken
         await self.discover_services_via_mesh()
         
+        # Danach Änderungen per Change-Feed statt Polling
+        if self.mesh_coordinators and self.replica_task is None:
+            self.replica_task = asyncio.create_task(self.replica.follow(self.mesh_coordinators))
+        
         logger.info("✅ Gentleman Intelligent Client bereit!")
     
     def print_status(self, status: Dict):
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+GENTLEMAN Cluster - Remote Admin Executor
+Admin-Operationen (Status, Shutdown, Wake-on-LAN) parallel auf mehreren Nodes
+
+SSH-Verbindungen werden per ControlMaster wiederverwendet: der erste Befehl an einen
+Node startet eine Master-Verbindung im Hintergrund (ControlPersist), weitere Befehle
+laufen über deren Socket ohne neuen Verbindungsaufbau. Jeder Node hat eine eigene
+Deadline; Ergebnisse kommen in der Reihenfolge, in der die Nodes fertig werden, ein
+Durchlauf dauert also so lange wie der langsamste Node.
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+class ClusterNode:
+    """Ein Ziel für Admin-Operationen"""
+
+    __slots__ = ('name', 'ip', 'user', 'ssh_key', 'mac')
+
+    def __init__(self, name, ip, user=None, ssh_key=None, mac=None):
+        self.name = name
+        self.ip = ip
+        self.user = user
+        self.ssh_key = ssh_key
+        self.mac = mac
+
+    @property
+    def target(self):
+        return f"{self.user}@{self.ip}"
+
+    def to_dict(self):
+        return {'name': self.name, 'ip': self.ip, 'user': self.user, 'mac': self.mac}
+
+def load_inventory(path, defaults=None, ssh_key=None):
+    """Nodes aus dem "nodes"-Abschnitt von key_rotation_config.json, ergänzt um bekannte Defaults (z.B. MAC)"""
+    nodes = dict(defaults or {})
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Cluster-Inventar {path} nicht lesbar: {e}")
+        return nodes
+    for name, entry in (config.get('nodes') or {}).items():
+        if not isinstance(entry, dict) or not entry.get('ip'):
+            continue
+        known = nodes.get(name)
+        nodes[name] = ClusterNode(
+            name,
+            entry['ip'],
+            user=entry.get('ssh_user') or (known.user if known else None),
+            ssh_key=entry.get('ssh_key') or (known.ssh_key if known else ssh_key),
+            mac=entry.get('mac') or (known.mac if known else None)
+        )
+    return nodes
+
+def send_magic_packet(mac):
+    """Wake-on-LAN: wakeonlan-Tool wenn installiert, sonst Magic Packet per UDP-Broadcast"""
+    try:
+        wol_result = subprocess.run(['wakeonlan', mac], capture_output=True, text=True)
+        if wol_result.returncode == 0:
+            return "wakeonlan"
+    except OSError:
+        pass
+
+    # Magic Packet erstellen (6 x 0xFF + 16 x MAC-Adresse)
+    mac_bytes = bytes.fromhex(mac.replace(':', '').replace('-', ''))
+    magic_packet = b'\xff' * 6 + mac_bytes * 16
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.sendto(magic_packet, ('255.255.255.255', 9))
+    return "python"
+
+class RemoteExecutor:
+    """Führt eine Operation parallel auf mehreren Nodes aus"""
+
+    def __init__(self, max_parallel=16, control_dir=None, control_persist=300):
+        self.pool = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix='remote')
+        self.control_dir = Path(control_dir or os.getenv('GENTLEMAN_SSH_CONTROL_DIR', '~/.gentleman/ssh')).expanduser()
+        self.control_dir.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self.control_persist = control_persist
+        self._master_locks = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {
+            'runs': 0,
+            'ssh_commands': 0,
+            'masters_started': 0,
+            'timeouts': 0
+        }
+
+    # 🔐 SSH mit geteilten Verbindungen
+    def _control_path(self, node):
+        # Kurzer, fester Name: Unix-Socket-Pfade sind auf ~104 Zeichen begrenzt
+        return str(self.control_dir / node.target)
+
+    def _ssh_base(self, node, connect_timeout):
+        command = [
+            'ssh', '-o', 'BatchMode=yes', '-o', 'StrictHostKeyChecking=no',
+            '-o', f'ConnectTimeout={max(1, int(connect_timeout))}',
+            '-o', f'ControlPath={self._control_path(node)}'
+        ]
+        if node.ssh_key:
+            command += ['-i', node.ssh_key]
+        return command
+
+    def _ensure_master(self, node, timeout):
+        """Master-Verbindung starten, falls noch keine läuft; -f trennt sie von unseren Pipes"""
+        if os.path.exists(self._control_path(node)):
+            return True
+        with self._locks_guard:
+            lock = self._master_locks.setdefault(node.target, threading.Lock())
+        with lock:
+            if os.path.exists(self._control_path(node)):
+                return True
+            result = subprocess.run(
+                self._ssh_base(node, timeout) + [
+                    '-o', 'ControlMaster=yes', '-o', f'ControlPersist={self.control_persist}',
+                    '-N', '-f', node.target
+                ],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                timeout=timeout
+            )
+            if result.returncode != 0:
+                return False
+            self.stats['masters_started'] += 1
+            return True
+
+    def ssh(self, node, command, deadline):
+        """Befehl auf einem Node; die Deadline gilt für Verbindungsaufbau und Ausführung zusammen"""
+        started = time.monotonic()
+        result = {'node': node.name, 'ip': node.ip, 'ok': False}
+        try:
+            if not node.user:
+                result['error'] = 'Kein SSH-User konfiguriert'
+            elif not self._ensure_master(node, deadline):
+                result['error'] = 'SSH Verbindung fehlgeschlagen'
+            else:
+                # Bei totem Master-Socket baut ssh selbst eine direkte Verbindung auf
+                remaining = max(0.5, deadline - (time.monotonic() - started))
+                self.stats['ssh_commands'] += 1
+                proc = subprocess.run(
+                    self._ssh_base(node, remaining) + ['-o', 'ControlMaster=no', node.target, command],
+                    capture_output=True, text=True, timeout=remaining
+                )
+                result.update({
+                    'ok': proc.returncode == 0,
+                    'exit_code': proc.returncode,
+                    'stdout': proc.stdout.strip(),
+                    'stderr': proc.stderr.strip()
+                })
+        except subprocess.TimeoutExpired:
+            self.stats['timeouts'] += 1
+            result['error'] = f'Deadline von {deadline:g}s überschritten'
+        except OSError as e:
+            result['error'] = str(e)
+        result['duration'] = round(time.monotonic() - started, 3)
+        return result
+
+    # ⚡ Parallele Ausführung
+    def _guarded(self, operation, node, deadline, params):
+        started = time.monotonic()
+        try:
+            return operation(self, node, deadline, params)
+        except Exception as e:
+            logging.error(f"❌ Admin-Operation auf {node.name} fehlgeschlagen: {e}")
+            return {'node': node.name, 'ip': node.ip, 'ok': False, 'error': str(e),
+                    'duration': round(time.monotonic() - started, 3)}
+
+    def run(self, nodes, operation, deadline, params=None):
+        """Startet sofort auf allen Nodes; das Ergebnis ist ein Iterator in Fertigstellungs-Reihenfolge"""
+        self.stats['runs'] += 1
+        futures = [self.pool.submit(self._guarded, operation, node, deadline, params or {}) for node in nodes]
+
+        def results():
+            for future in as_completed(futures):
+                yield future.result()
+        return results()
+
+    def close(self):
+        for path in self.control_dir.iterdir():
+            if path.is_socket():
+                subprocess.run(['ssh', '-o', f'ControlPath={path}', '-O', 'exit', path.name],
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.pool.shutdown(wait=False)
+
+# 🧰 Operationen: (executor, node, deadline, params) -> Ergebnis-Dict
+def op_status(executor, node, deadline, params):
+    result = executor.ssh(node, 'uptime && hostname && whoami', deadline)
+    result['status'] = 'online' if result['ok'] else 'offline'
+    return result
+
+def op_shutdown(executor, node, deadline, params):
+    delay_minutes = int(params.get('delay_minutes', 1))
+    result = executor.ssh(node, f'sudo shutdown -h +{delay_minutes}', deadline)
+    result['delay_minutes'] = delay_minutes
+    return result
+
+def op_wakeup(executor, node, deadline, params):
+    started = time.monotonic()
+    if not node.mac:
+        return {'node': node.name, 'ip': node.ip, 'ok': False, 'error': 'Keine MAC-Adresse bekannt', 'duration': 0.0}
+    method = send_magic_packet(node.mac)
+    return {'node': node.name, 'ip': node.ip, 'ok': True, 'mac': node.mac, 'method': method,
+            'duration': round(time.monotonic() - started, 3)}
+
+# Name -> (Operation, Standard-Deadline in Sekunden)
+OPERATIONS = {
+    'status': (op_status, 5.0),
+    'shutdown': (op_shutdown, 15.0),
+    'wakeup': (op_wakeup, 5.0)
+}
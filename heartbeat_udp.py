@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+GENTLEMAN Cluster - UDP Heartbeat Protokoll
+Kompakte, per HMAC signierte Heartbeats zwischen Nodes und M1 Handshake Server
+
+Paket (Network Byte Order):
+    magic "GH" | version u8 | flags u8 | key_id 4 bytes | sequence u64 | state_version u32
+    | node_id_len u8 | node_id (UTF-8) | HMAC-SHA256 (16 bytes, gekürzt)
+
+sequence sind Mikrosekunden seit Epoch, pro Node streng steigend; der Server verwirft
+alles, was nicht neuer als der letzte Heartbeat ist oder außerhalb des Zeitfensters liegt.
+Der Schlüssel ist der rotierte "heartbeat_key" aus api_keys.json (key_rotation_system.py);
+die jüngste Sicherung bleibt während der Verteilung einer Rotation gültig.
+Registrierung und Zustandsänderungen laufen weiter über HTTP /handshake.
+"""
+
+import os
+import glob
+import hmac
+import json
+import time
+import struct
+import hashlib
+import logging
+
+MAGIC = b'GH'
+VERSION = 1
+HEADER = struct.Struct('!2sBB4sQI')
+MAC_SIZE = 16
+MAX_NODE_ID = 64
+
+FLAG_RESYNC = 0x01  # Server -> Node: Zustand per HTTP neu senden
+
+DEFAULT_PORT = 8766
+MAX_SKEW = 60.0  # Sekunden
+
+def key_id(key):
+    return hashlib.sha256(key).digest()[:4]
+
+def _mac(key, data):
+    return hmac.new(key, data, hashlib.sha256).digest()[:MAC_SIZE]
+
+def encode(key, node_id, sequence, state_version, flags=0):
+    node = node_id.encode('utf-8')
+    if len(node) > MAX_NODE_ID:
+        raise ValueError(f"node_id länger als {MAX_NODE_ID} Bytes")
+    body = HEADER.pack(MAGIC, VERSION, flags, key_id(key), sequence, state_version & 0xFFFFFFFF)
+    body += bytes((len(node),)) + node
+    return body + _mac(key, body)
+
+def decode(packet, keyring):
+    """(node_id, sequence, state_version, flags, key) oder None bei ungültigem Paket"""
+    if len(packet) < HEADER.size + 1 + MAC_SIZE:
+        return None
+    magic, version, flags, kid, sequence, state_version = HEADER.unpack_from(packet)
+    if magic != MAGIC or version != VERSION:
+        return None
+    key = keyring.get(kid)
+    if key is None:
+        return None
+    body, mac = packet[:-MAC_SIZE], packet[-MAC_SIZE:]
+    if not hmac.compare_digest(_mac(key, body), mac):
+        return None
+    node_len = body[HEADER.size]
+    node = body[HEADER.size + 1:]
+    if len(node) != node_len:
+        return None
+    try:
+        return node.decode('utf-8'), sequence, state_version, flags, key
+    except UnicodeDecodeError:
+        return None
+
+class Sequence:
+    """Streng steigende Sequenznummern (Mikrosekunden), auch über Neustarts des Nodes"""
+
+    def __init__(self):
+        self._last = 0
+
+    def next(self):
+        self._last = max(time.time_ns() // 1000, self._last + 1)
+        return self._last
+
+class KeyRing:
+    """Aktueller Schlüssel (Standard: heartbeat_key) plus Schlüssel aus der jüngsten Sicherung;
+    lädt neu, wenn sich die Datei ändert"""
+
+    def __init__(self, path=None, backups=1, field='heartbeat_key'):
+        self.path = path or os.environ.get('GENTLEMAN_API_KEYS', 'api_keys.json')
+        self.backups = backups
+        self.field = field
+        self.keys = {}
+        self.current = None
+        self._mtime = None
+        self._checked_at = 0.0
+
+    def _read(self, path):
+        try:
+            with open(path) as f:
+                value = json.load(f).get(self.field)
+            return value.encode('utf-8') if value else None
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def load(self):
+        try:
+            self._mtime = os.stat(self.path).st_mtime
+        except OSError:
+            self._mtime = None
+        self.current = self._read(self.path)
+        keys = [self.current]
+        directory = os.path.dirname(self.path) or '.'
+        for backup in sorted(glob.glob(os.path.join(directory, 'api_keys.backup_*.json')), reverse=True)[:self.backups]:
+            keys.append(self._read(backup))
+        self.keys = {key_id(key): key for key in keys if key}
+        return self
+
+    def refresh(self, min_interval=5.0):
+        """Bei geänderter Datei neu laden (höchstens alle min_interval Sekunden prüfen)"""
+        now = time.monotonic()
+        if now - self._checked_at < min_interval:
+            return False
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        self.load()
+        logging.info(f"🔑 {self.field} neu geladen ({len(self.keys)} gültig)")
+        return True
+
+    def get(self, kid):
+        return self.keys.get(kid)
@@ -6,17 +6,28 @@ Kommuniziert mit dem M1 Handshake Server
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import copy
 import json
 import time
 import socket
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
 from datetime import datetime
 import subprocess
 import os
 import sys
 from pathlib import Path
 
+import heartbeat_udp
+
+# Optional: HTTP/2 über den Cloudflare Tunnel (pip install 'httpx[http2]')
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 # Logging Setup
 logging.basicConfig(
     level=logging.INFO,
@@ -27,6 +38,31 @@ logging.basicConfig(
     ]
 )
 
+def diff_state(old, new, path=()):
+    """Geänderte Felder (verschachtelte Dicts nur mit geänderten Schlüsseln) und entfernte Pfade"""
+    changes = {}
+    removed = []
+    for key, value in new.items():
+        if key not in old:
+            changes[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub_changes, sub_removed = diff_state(old[key], value, path + (key,))
+            if sub_changes:
+                changes[key] = sub_changes
+            removed.extend(sub_removed)
+        elif old[key] != value:
+            changes[key] = value
+    removed.extend(list(path + (key,)) for key in old if key not in new)
+    return changes, removed
+
+# Messwerte, die sich bei jedem Heartbeat ändern; sie gehen nur mit HTTP-Handshakes mit
+VOLATILE_SYSTEM_INFO = ("uptime", "load_average", "memory_usage", "disk_usage")
+
+def stable_state(state):
+    system_info = {key: value for key, value in state.get("system_info", {}).items()
+                   if key not in VOLATILE_SYSTEM_INFO}
+    return {**state, "system_info": system_info}
+
 class I7HandshakeClient:
     def __init__(self):
         # M1 Handshake Server Konfiguration - mit Cloudflare Tunnel Fallback
@@ -50,11 +86,37 @@ class I7HandshakeClient:
         self.max_retries = 3
         self.timeout = 30
         
+        # Verbindungen: Keep-Alive Pools statt neuer TCP/TLS-Verbindung pro Request
+        self.session = self._create_session()
+        self.tunnel_session = self._create_tunnel_session()
+        self._probe_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="probe")
+        self.path_recheck_interval = 300  # Sekunden, danach LAN/Tunnel neu vergleichen
+        self._path_checked_at = 0.0
+        
         # Status
         self.is_running = False
         self.last_successful_handshake = None
         self.failed_attempts = 0
         
+        # Delta-Heartbeats: erster Handshake mit vollem Zustand, danach nur Änderungen
+        self.static_refresh_interval = 600  # Sekunden
+        self._static_facts = None
+        self._memory_total = None
+        self._static_collected_at = 0.0
+        self.state_version = 0
+        self._last_state = None
+        self._acked_version = None
+        self._acked_state = None
+        
+        # UDP-Heartbeats: nur im LAN, nur wenn der Server sie anbietet (/health) und ein Schlüssel da ist
+        self.udp_enabled = os.getenv("GENTLEMAN_HEARTBEAT_UDP", "1") != "0"
+        self.udp_port = None
+        self.udp_http_every = 10  # jeder n-te Heartbeat geht trotzdem per HTTP (Messwerte, gefiltertes UDP)
+        self._udp_beats = 0
+        self._udp_sock = None
+        self._keyring = heartbeat_udp.KeyRing().load() if self.udp_enabled else None
+        self._sequence = heartbeat_udp.Sequence()
+        
         logging.info(f"🚀 I7 Handshake Client initialisiert")
         logging.info(f"   Node ID: {self.node_id}")
         logging.info(f"   Lokale IP: {self.local_ip}")
@@ -70,14 +132,29 @@ class I7HandshakeClient:
         except Exception:
             return "127.0.0.1"
     
-    def _get_system_info(self):
-        """Sammle System-Informationen"""
-        try:
-            return {
+    def _get_static_facts(self):
+        """Unveränderliche Fakten (Tools, Plattform) nur alle paar Minuten neu ermitteln"""
+        if self._static_facts is None or time.time() - self._static_collected_at > self.static_refresh_interval:
+            self._static_facts = {
                 "hostname": socket.gethostname(),
                 "platform": sys.platform,
                 "python_version": sys.version.split()[0],
                 "cpu_count": os.cpu_count(),
+                "git": self._test_git_availability(),
+                "docker": self._test_docker_availability()
+            }
+            self._static_collected_at = time.time()
+        return self._static_facts
+    
+    def _get_system_info(self):
+        """Sammle System-Informationen"""
+        try:
+            static = self._get_static_facts()
+            return {
+                "hostname": static["hostname"],
+                "platform": static["platform"],
+                "python_version": static["python_version"],
+                "cpu_count": static["cpu_count"],
                 "uptime": self._get_uptime(),
                 "load_average": self._get_load_average(),
                 "memory_usage": self._get_memory_usage(),
@@ -105,14 +182,43 @@ class I7HandshakeClient:
             return [0.0, 0.0, 0.0]
     
     def _get_memory_usage(self):
-        """Ermittle Speicher-Nutzung"""
+        """Ermittle Speicher-Nutzung (numerisch, damit der Server Zeitreihen bilden kann)"""
         try:
             if sys.platform == "darwin":
+                if self._memory_total is None:
+                    result = subprocess.run(['sysctl', '-n', 'hw.memsize'], capture_output=True, text=True)
+                    self._memory_total = int(result.stdout.strip())
                 result = subprocess.run(['vm_stat'], capture_output=True, text=True)
-                return result.stdout[:200] + "..." if len(result.stdout) > 200 else result.stdout
-            return "Unknown"
+                page_size = 4096
+                pages = {}
+                for line in result.stdout.splitlines():
+                    if "page size of" in line:
+                        page_size = int(line.split("page size of")[1].split()[0])
+                    elif ":" in line:
+                        name, value = line.split(":", 1)
+                        pages[name.strip()] = int(value.strip().rstrip("."))
+                # Frei = free + inactive + speculative (wie "Memory Pressure" in der Aktivitätsanzeige)
+                available = (pages.get("Pages free", 0) + pages.get("Pages inactive", 0)
+                             + pages.get("Pages speculative", 0)) * page_size
+                total = self._memory_total
+            elif os.path.exists("/proc/meminfo"):
+                meminfo = {}
+                with open("/proc/meminfo") as f:
+                    for line in f:
+                        name, value = line.split(":", 1)
+                        meminfo[name] = int(value.split()[0]) * 1024
+                total = meminfo["MemTotal"]
+                available = meminfo.get("MemAvailable", meminfo.get("MemFree", 0))
+            else:
+                return {}
+            used = total - available
+            return {
+                "total_gb": round(total / (1024**3), 2),
+                "used_gb": round(used / (1024**3), 2),
+                "usage_percent": round((used / total) * 100, 1)
+            }
         except:
-            return "Unknown"
+            return {}
     
     def _get_disk_usage(self):
         """Ermittle Festplatten-Nutzung"""
@@ -128,73 +234,200 @@ class I7HandshakeClient:
         except:
             return {}
     
+    def _create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"User-Agent": f"gentleman-handshake-client/{self.node_id}"})
+        return session
+    
+    def _create_tunnel_session(self):
+        """HTTP/2 Client für den Tunnel, falls httpx mit h2 installiert ist, sonst die requests-Session"""
+        if httpx is not None:
+            try:
+                return httpx.Client(http2=True, timeout=self.timeout,
+                                    headers={"User-Agent": f"gentleman-handshake-client/{self.node_id}"})
+            except ImportError:
+                pass
+        return self.session
+    
+    @property
+    def base_url(self):
+        if self.use_tunnel:
+            return self.m1_tunnel_url
+        return f"http://{self.m1_host}:{self.handshake_port}"
+    
+    def _http(self):
+        return self.tunnel_session if self.use_tunnel else self.session
+    
+    def _probe(self, tunnel):
+        session = self.tunnel_session if tunnel else self.session
+        base_url = self.m1_tunnel_url if tunnel else f"http://{self.m1_host}:{self.handshake_port}"
+        response = session.get(f"{base_url}/health", timeout=5)
+        if response.status_code != 200:
+            raise ConnectionError(f"HTTP {response.status_code}")
+        try:
+            health = response.json()
+        except ValueError:
+            health = {}
+        return tunnel, health
+    
     def test_connectivity(self):
-        """Teste Verbindung zum M1 Server"""
-        # Teste zuerst lokale Verbindung
+        """Teste LAN und Cloudflare Tunnel gleichzeitig; der Pfad, der zuerst antwortet, wird gemerkt"""
+        probes = [self._probe_pool.submit(self._probe, tunnel) for tunnel in (False, True)]
         try:
-            response = requests.get(
-                f"http://{self.m1_host}:{self.handshake_port}/health",
-                timeout=5
-            )
-            if response.status_code == 200:
-                self.use_tunnel = False
+            for probe in as_completed(probes, timeout=6):
+                try:
+                    tunnel, health = probe.result()
+                except Exception:
+                    continue
+                if tunnel and not self.use_tunnel:
+                    logging.info("🌐 Verwende Cloudflare Tunnel für M1 Server Verbindung")
+                self.use_tunnel = tunnel
+                # UDP-Heartbeats gibt es nur im LAN
+                self.udp_port = None if tunnel else health.get("udp_heartbeat_port")
+                self._path_checked_at = time.time()
                 return True
-        except:
+        except FutureTimeout:
             pass
+        self._path_checked_at = 0.0
+        return False
+    
+    def ensure_connectivity(self):
+        """Gemerkten Pfad weiterverwenden; neu proben erst nach Fehlern oder path_recheck_interval"""
+        if self._path_checked_at and time.time() - self._path_checked_at < self.path_recheck_interval:
+            return True
+        return self.test_connectivity()
+    
+    def _build_state(self):
+        static = self._get_static_facts()
+        return {
+            "node_type": self.node_type,
+            "ip": self.local_ip,
+            "vpn_ip": self.vpn_ip,
+            "status": "active",
+            "capabilities": self.capabilities,
+            "system_info": self._get_system_info(),
+            "services": {
+                "ssh": True,
+                "git": static["git"],
+                "python": True,
+                "docker": static["docker"]
+            }
+        }
+    
+    def _current_state(self):
+        """Aktueller Zustand; jede Änderung erhöht state_version"""
+        state = self._build_state()
+        if state != self._last_state:
+            self.state_version += 1
+            self._last_state = state
+        return state
+    
+    def _build_heartbeat(self, state=None):
+        """Voller Zustand ohne bestätigte Basis, sonst nur die Änderungen seit der Basis"""
+        if state is None:
+            state = self._current_state()
         
-        # Fallback: Teste Cloudflare Tunnel
-        try:
-            response = requests.get(
-                f"{self.m1_tunnel_url}/health",
-                timeout=5
-            )
-            if response.status_code == 200:
-                self.use_tunnel = True
-                logging.info("🌐 Verwende Cloudflare Tunnel für M1 Server Verbindung")
-                return True
-        except:
-            pass
+        message = {
+            "node_id": self.node_id,
+            "timestamp": int(time.time()),
+            "state_version": self.state_version
+        }
+        if self._acked_state is None:
+            message.update(state)
+        else:
+            changes, removed = diff_state(self._acked_state, state)
+            message.update({"base_version": self._acked_version, "changes": changes})
+            if removed:
+                message["removed"] = removed
+        return message, state
+    
+    def _udp_resync_requested(self):
+        """Vom Server signalisierten RESYNC aus dem UDP-Socket lesen (nicht blockierend)"""
+        resync = False
+        while True:
+            try:
+                packet = self._udp_sock.recv(512)
+            except (BlockingIOError, InterruptedError):
+                return resync
+            except OSError:
+                # z.B. ICMP port unreachable: Server lauscht nicht (mehr) auf UDP
+                self.udp_port = None
+                return resync
+            decoded = heartbeat_udp.decode(packet, self._keyring)
+            if decoded and decoded[0] == self.node_id and decoded[3] & heartbeat_udp.FLAG_RESYNC:
+                resync = True
+    
+    def send_udp_heartbeat(self, state):
+        """Kompakter signierter Heartbeat per UDP, solange sich am Zustand nichts geändert hat
         
-        return False
+        False heißt: dieser Heartbeat muss über HTTP laufen.
+        """
+        if not self.udp_enabled or not self.udp_port or self.use_tunnel or self._acked_state is None:
+            return False
+        if self._udp_beats >= self.udp_http_every or stable_state(state) != stable_state(self._acked_state):
+            return False
+        self._keyring.refresh()
+        if self._keyring.current is None:
+            return False
+        try:
+            if self._udp_sock is None:
+                self._udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._udp_sock.setblocking(False)
+                self._udp_sock.connect((self.m1_host, self.udp_port))
+            if self._udp_resync_requested():
+                logging.info("🔁 Server verlangt Resync (UDP), sende vollständigen Zustand")
+                self._acked_state = None
+                self._acked_version = None
+                return False
+            self._udp_sock.send(heartbeat_udp.encode(self._keyring.current, self.node_id,
+                                                     self._sequence.next(), self._acked_version))
+        except OSError as e:
+            logging.warning(f"UDP Heartbeat fehlgeschlagen, nutze HTTP: {e}")
+            if self._udp_sock is not None:
+                self._udp_sock.close()
+                self._udp_sock = None
+            return False
+        self._udp_beats += 1
+        logging.debug("💓 UDP Heartbeat gesendet")
+        return True
     
-    def send_handshake(self):
+    def send_handshake(self, state=None):
         """Sende Handshake zum M1 Server"""
         try:
-            handshake_data = {
-                "node_id": self.node_id,
-                "node_type": self.node_type,
-                "ip": self.local_ip,
-                "vpn_ip": self.vpn_ip,
-                "status": "active",
-                "timestamp": int(time.time()),
-                "capabilities": self.capabilities,
-                "system_info": self._get_system_info(),
-                "services": {
-                    "ssh": True,
-                    "git": self._test_git_availability(),
-                    "python": True,
-                    "docker": self._test_docker_availability()
-                }
-            }
+            handshake_data, state = self._build_heartbeat(state)
             
             # Wähle URL basierend auf Verbindungsmodus
             if self.use_tunnel:
-                url = f"{self.m1_tunnel_url}/handshake"
                 logging.info("🌐 Sende Handshake über Cloudflare Tunnel")
             else:
-                url = f"http://{self.m1_host}:{self.handshake_port}/handshake"
                 logging.info("🏠 Sende Handshake über lokales Netzwerk")
             
-            response = requests.post(
-                url,
+            response = self._http().post(
+                f"{self.base_url}/handshake",
                 json=handshake_data,
                 timeout=self.timeout
             )
             
+            if response.status_code == 409 or (response.status_code == 200 and response.json().get('status') == 'resync'):
+                # Server kennt unsere Basis nicht (z.B. nach Neustart): sofort vollen Zustand schicken
+                logging.info("🔁 Server verlangt Resync, sende vollständigen Zustand")
+                self._acked_state = None
+                self._acked_version = None
+                if 'base_version' in handshake_data:
+                    return self.send_handshake()
+                return False
+            
             if response.status_code == 200:
                 result = response.json()
                 self.last_successful_handshake = datetime.now()
                 self.failed_attempts = 0
+                self._udp_beats = 0
+                if result.get('state_version') == handshake_data['state_version']:
+                    self._acked_version = handshake_data['state_version']
+                    self._acked_state = copy.deepcopy(state)
                 
                 logging.info("✅ Handshake erfolgreich")
                 logging.info(f"   Server Response: {result.get('message', 'OK')}")
@@ -208,10 +441,13 @@ class I7HandshakeClient:
             else:
                 logging.error(f"Handshake fehlgeschlagen: HTTP {response.status_code}")
                 logging.error(f"Response: {response.text}")
+                self._path_checked_at = 0.0
                 return False
                 
         except Exception as e:
             logging.error(f"Fehler beim Handshake: {e}")
+            # Beim nächsten Durchlauf beide Pfade neu proben
+            self._path_checked_at = 0.0
             return False
     
     def _test_git_availability(self):
@@ -233,8 +469,8 @@ class I7HandshakeClient:
     def get_cluster_status(self):
         """Hole Cluster-Status vom M1 Server"""
         try:
-            response = requests.get(
-                f"http://{self.m1_host}:{self.handshake_port}/status",
+            response = self._http().get(
+                f"{self.base_url}/status",
                 timeout=5
             )
             
@@ -251,8 +487,8 @@ class I7HandshakeClient:
     def get_active_nodes(self):
         """Hole Liste der aktiven Nodes"""
         try:
-            response = requests.get(
-                f"http://{self.m1_host}:{self.handshake_port}/nodes",
+            response = self._http().get(
+                f"{self.base_url}/nodes",
                 timeout=5
             )
             
@@ -273,8 +509,11 @@ class I7HandshakeClient:
         
         while self.is_running:
             try:
-                if self.test_connectivity():
-                    self.send_handshake()
+                state = self._current_state()
+                if self.send_udp_heartbeat(state):
+                    pass
+                elif self.ensure_connectivity():
+                    self.send_handshake(state)
                 else:
                     logging.warning("M1 Server nicht erreichbar")
                 
@@ -298,6 +537,10 @@ class I7HandshakeClient:
         """Stoppe Handshake-Client"""
         logging.info("🛑 Stoppe I7 Handshake Client")
         self.is_running = False
+        self._probe_pool.shutdown(wait=False)
+        self.session.close()
+        if self.tunnel_session is not self.session:
+            self.tunnel_session.close()
     
     def run_once(self):
         """Führe einen einzelnen Handshake durch"""
@@ -230,7 +230,8 @@ class KeyRotationSystem:
             "llm_server_key": self.generate_api_key(),
             "mesh_coordinator_key": self.generate_api_key(),
             "discovery_service_key": self.generate_api_key(),
-            "monitoring_key": self.generate_api_key()
+            "monitoring_key": self.generate_api_key(),
+            "heartbeat_key": self.generate_api_key()
         }
         
         # Speichere neue API-Keys
@@ -4,13 +4,29 @@ GENTLEMAN Cluster - M1 Handshake Server
 Koordiniert Handshakes und Status-Updates der Cluster Nodes
 """
 
+import os
+import hmac
 import json
 import time
+import heapq
+import hashlib
+import queue
+import socket
+import selectors
+import asyncio
 import logging
+import subprocess
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qsl
 import threading
 from pathlib import Path
+from contextlib import contextmanager
+
+import heartbeat_udp
+import node_metrics
+import cluster_admin
 
 # Logging Setup
 logging.basicConfig(
@@ -22,1079 +38,1387 @@ logging.basicConfig(
     ]
 )
 
-class NodeRegistry:
-    """Registry für alle Cluster Nodes"""
+# RX Node Details
+RX_NODE_IP = "192.168.68.117"
+RX_NODE_MAC = "30:9c:23:5f:44:a8"  # Bekannte MAC-Adresse der RX Node
+RX_NODE_USER = "amo9n11"
+RX_NODE_SSH_KEY = "/Users/amonbaumgartner/.ssh/gentleman_key"
+
+# Cluster-Inventar für /admin/cluster/* (Abschnitt "nodes"), die RX Node ist immer bekannt
+CLUSTER_INVENTORY = os.getenv('GENTLEMAN_CLUSTER_INVENTORY',
+                              str(Path(__file__).resolve().parent / 'key_rotation_config.json'))
+
+class ReadWriteLock:
+    """Viele Leser gleichzeitig oder ein Schreiber; wartende Schreiber haben Vorrang"""
     
     def __init__(self):
-        self.nodes = {}
-        self.lock = threading.Lock()
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
         
-    def register_node(self, node_data):
-        """Registriere oder aktualisiere Node"""
-        with self.lock:
-            node_id = node_data.get('node_id')
-            self.nodes[node_id] = {
-                **node_data,
-                'last_seen': time.time(),
-                'registered_at': self.nodes.get(node_id, {}).get('registered_at', time.time())
-            }
-            logging.info(f"✅ Node '{node_id}' registriert/aktualisiert")
-            
-    def get_active_nodes(self, timeout=300):
-        """Hole alle aktiven Nodes (last_seen < timeout seconds)"""
-        with self.lock:
-            current_time = time.time()
-            active = {}
-            for node_id, data in self.nodes.items():
-                if current_time - data['last_seen'] < timeout:
-                    active[node_id] = data
-            return active
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+                    
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+class NodeRecord:
+    """Ein Node im Registry: Handshake-Daten plus Zeitstempel"""
     
-    def get_node_status(self, node_id):
-        """Hole Status eines spezifischen Nodes"""
-        with self.lock:
-            return self.nodes.get(node_id)
-    
-    def get_cluster_summary(self):
-        """Hole Cluster-Zusammenfassung"""
-        with self.lock:
-            current_time = time.time()
-            active = {}
-            for node_id, data in self.nodes.items():
-                if current_time - data['last_seen'] < 300:  # 5 Minuten Timeout
-                    active[node_id] = data
-            return {
-                'total_nodes': len(self.nodes),
-                'active_nodes': len(active),
-                'nodes': active,
-                'timestamp': time.time()
-            }
+    __slots__ = ('node_id', 'data', 'last_seen', 'registered_at', 'active', 'state_version')
+    
+    def __init__(self, node_id, data, now):
+        self.node_id = node_id
+        self.data = data
+        self.last_seen = now
+        self.registered_at = now
+        self.active = True
+        # Zustandsversion des Nodes, Basis für Delta-Heartbeats (None: Node sendet immer alles)
+        self.state_version = None
+        
+    def to_dict(self):
+        return {**self.data, 'last_seen': self.last_seen, 'registered_at': self.registered_at}
 
-class HandshakeHandler(BaseHTTPRequestHandler):
-    """HTTP Request Handler für Handshakes"""
+class RegistryJournal:
+    """Write-Ahead-Log des Node Registry (JSON Lines) mit periodischem Snapshot
     
-    def do_POST(self):
-        """Handle POST Requests"""
-        try:
-            # Parse URL
-            parsed_url = urlparse(self.path)
-            
-            if parsed_url.path == '/handshake':
-                self.handle_handshake()
-            elif parsed_url.path == '/admin/shutdown':
-                self.handle_shutdown_request()
-            elif parsed_url.path == '/admin/bootup':
-                self.handle_bootup_request()
-            elif parsed_url.path == '/admin/rx-node/shutdown':
-                self.handle_rx_node_shutdown()
-            elif parsed_url.path == '/admin/rx-node/wakeup':
-                self.handle_rx_node_wakeup()
-            elif parsed_url.path == '/admin/rx-node/status':
-                self.handle_rx_node_status()
-            else:
-                self.send_error(404, "Endpoint not found")
-                
-        except Exception as e:
-            logging.error(f"❌ POST Handler Fehler: {e}")
-            self.send_error(500, f"Server Error: {e}")
+    Heartbeats hängen nur an eine Liste im Speicher an; ein Hintergrund-Thread
+    schreibt gesammelt und ruft fsync einmal pro Batch. Ab compact_every WAL-Einträgen
+    wird ein Snapshot atomar ersetzt und das WAL geleert.
+    """
     
-    def do_GET(self):
-        """Handle GET Requests"""
-        try:
-            parsed_url = urlparse(self.path)
-            
-            if parsed_url.path == '/status':
-                self.handle_status_request()
-            elif parsed_url.path == '/nodes':
-                self.handle_nodes_request()
-            elif parsed_url.path == '/health':
-                self.handle_health_check()
-            elif parsed_url.path == '/admin/rx-node/status':
-                self.handle_rx_node_status()
-            else:
-                self.send_error(404, "Endpoint not found")
+    def __init__(self, state_dir, flush_interval=1.0, compact_every=10000):
+        self.state_dir = Path(state_dir).expanduser()
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.state_dir / 'registry.snapshot.json'
+        self.wal_path = self.state_dir / 'registry.wal'
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.snapshot_source = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._wal = None
+        self._wal_entries = 0
+        self._thread = None
+        
+    def load(self):
+        """Snapshot plus WAL in Schreibreihenfolge; ein abgeschnittener letzter Eintrag wird ignoriert"""
+        entries = []
+        if self.snapshot_path.exists():
+            try:
+                entries.extend(json.loads(self.snapshot_path.read_text())['nodes'])
+            except (ValueError, KeyError, OSError) as e:
+                logging.warning(f"⚠️ Registry-Snapshot unlesbar, nur WAL wird gelesen: {e}")
+        if self.wal_path.exists():
+            valid_bytes = 0
+            with open(self.wal_path, 'rb') as wal:
+                for line in wal:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+                    valid_bytes += len(line)
+                    self._wal_entries += 1
+            # Abgeschnittenen Rest entfernen, sonst hängen neue Einträge an die kaputte Zeile
+            if valid_bytes < self.wal_path.stat().st_size:
+                os.truncate(self.wal_path, valid_bytes)
+        return entries
+    
+    def start(self):
+        self._wal = open(self.wal_path, 'ab')
+        self._thread = threading.Thread(target=self.run, name='registry-journal', daemon=True)
+        self._thread.start()
+        
+    def append(self, entry):
+        with self._lock:
+            self._pending.append(entry)
+            
+    def run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if self._wal_entries >= self.compact_every and self.snapshot_source:
+                    self.compact()
+            except OSError as e:
+                logging.error(f"❌ Registry-Journal Schreibfehler: {e}")
                 
-        except Exception as e:
-            logging.error(f"❌ GET Handler Fehler: {e}")
-            self.send_error(500, f"Server Error: {e}")
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._wal.write(b''.join(json.dumps(entry, separators=(',', ':')).encode('utf-8') + b'\n' for entry in batch))
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+        self._wal_entries += len(batch)
+        
+    def compact(self):
+        """Snapshot atomar ersetzen, danach WAL leeren (nur aus dem Journal-Thread)"""
+        self.flush()
+        nodes = self.snapshot_source()
+        tmp_path = self.snapshot_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as tmp:
+            json.dump({'version': 1, 'written_at': time.time(), 'nodes': nodes}, tmp, separators=(',', ':'))
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._wal.close()
+        self._wal = open(self.wal_path, 'wb')
+        os.fsync(self._wal.fileno())
+        self._wal_entries = 0
+        
+    def close(self):
+        self._stopped = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._wal:
+            self.flush()
+            if self.snapshot_source:
+                self.compact()
+            self._wal.close()
+
+class ResyncRequired(Exception):
+    """Delta-Heartbeat ohne passende Basisversion; der Node muss den vollen Zustand schicken"""
+
+def apply_changes(state, changes, removed=()):
+    """Delta auf eine Kopie des Zustands anwenden: Dicts werden rekursiv gemischt, alles andere ersetzt"""
+    merged = dict(state)
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = apply_changes(merged[key], value)
+        else:
+            merged[key] = value
+    for path in removed:
+        if not path:
+            continue
+        target = merged
+        for key in path[:-1]:
+            child = target.get(key)
+            if not isinstance(child, dict):
+                break
+            target[key] = child = dict(child)
+            target = child
+        else:
+            target.pop(path[-1], None)
+    return merged
+
+class NodeRegistry:
+    """Registry für alle Cluster Nodes
     
-    def handle_handshake(self):
-        """Verarbeite Node Handshake"""
-        try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            node_data = json.loads(post_data.decode('utf-8'))
-            
-            # Validiere Handshake Data
-            required_fields = ['node_id', 'timestamp', 'status']
-            if not all(field in node_data for field in required_fields):
-                self.send_error(400, "Missing required fields")
+    Ein Min-Heap nach last_seen (mit verzögertem Löschen veralteter Einträge) hält
+    die Zahl aktiver Nodes aktuell, ohne bei jedem Aufruf alle Nodes zu durchlaufen.
+    
+    Locks: der Schreib-Lock des ReadWriteLock schützt nur die Struktur von _records
+    (neue Nodes, restore). Heartbeats bekannter Nodes nehmen den Lese-Lock plus den
+    Stripe-Lock ihres Nodes und halten den Heap-Lock nur für den Heap-Eintrag; das WAL
+    wird erst nach allen Locks beschrieben.
+    """
+    
+    def __init__(self, timeout=300, journal=None, stripes=16):
+        self.timeout = timeout
+        self._records = {}
+        self._heap = []
+        self._active = 0
+        self._lock = ReadWriteLock()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+        self._heap_lock = threading.Lock()
+        self.journal = journal
+        if journal is not None:
+            started = time.perf_counter()
+            entries = journal.load()
+            self.restore(entries)
+            logging.info(f"💾 Registry wiederhergestellt: {len(self._records)} Nodes aus {len(entries)} Einträgen "
+                         f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+            journal.snapshot_source = self.export
+            journal.start()
+    
+    def restore(self, entries):
+        """Journal-Einträge anwenden; ältere Einträge als der bekannte Stand ändern nichts"""
+        now = time.time()
+        with self._lock.write(), self._heap_lock:
+            for entry in entries:
+                node_id = entry.get('node_id')
+                record = self._records.get(node_id)
+                if record is None:
+                    if 'data' not in entry:
+                        continue
+                    record = self._records[node_id] = NodeRecord(node_id, entry['data'], entry['last_seen'])
+                    record.registered_at = entry.get('registered_at', entry['last_seen'])
+                    record.state_version = entry.get('state_version')
+                elif entry['last_seen'] >= record.last_seen:
+                    record.last_seen = entry['last_seen']
+                    if 'data' in entry:
+                        record.data = entry['data']
+                        record.state_version = entry.get('state_version')
+            self._heap = []
+            self._active = 0
+            for node_id, record in self._records.items():
+                record.active = now - record.last_seen < self.timeout
+                if record.active:
+                    self._active += 1
+                    self._heap.append((record.last_seen, node_id))
+            heapq.heapify(self._heap)
+    
+    def export(self):
+        with self._lock.read():
+            return [{'node_id': node_id, 'data': record.data, 'last_seen': record.last_seen,
+                     'registered_at': record.registered_at, 'state_version': record.state_version}
+                    for node_id, record in self._records.items()]
+    
+    @contextmanager
+    def _node(self, node_id, create=False):
+        """Record eines Nodes unter seinem Stripe-Lock (None, wenn unbekannt und nicht create)
+        
+        Bekannte Nodes brauchen nur den Lese-Lock; nur ein neuer Node nimmt den Schreib-Lock.
+        """
+        stripe = self._stripes[hash(node_id) % len(self._stripes)]
+        with self._lock.read():
+            record = self._records.get(node_id)
+            if record is not None or not create:
+                with stripe:
+                    yield record
                 return
-            
-            # Registriere Node
-            self.server.node_registry.register_node(node_data)
-            
-            # Sende Response
-            response = {
-                'status': 'success',
-                'message': f"Node {node_data['node_id']} registered",
-                'server_timestamp': time.time(),
-                'cluster_nodes': len(self.server.node_registry.get_active_nodes())
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"📡 Handshake von {node_data['node_id']} verarbeitet")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ Handshake Fehler: {e}")
-            self.send_error(500, f"Handshake Error: {e}")
+        with self._lock.write():
+            record = self._records.get(node_id)
+            if record is None:
+                record = self._records[node_id] = NodeRecord(node_id, None, time.time())
+                record.active = False
+            with stripe:
+                yield record
+        
+    def register_node(self, node_data):
+        """Registriere oder aktualisiere Node mit vollständigem Zustand"""
+        node_id = node_data.get('node_id')
+        with self._node(node_id, create=True) as record:
+            changed = record.data != node_data
+            active, entry = self._store(record, node_data, node_data.get('state_version'), changed)
+        self._journal(entry)
+        logging.info(f"✅ Node '{node_id}' registriert/aktualisiert")
+        return active
     
-    def handle_status_request(self):
-        """Sende Cluster Status"""
-        try:
-            status = self.server.node_registry.get_cluster_summary()
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(status, indent=2).encode('utf-8'))
-            
-        except Exception as e:
-            logging.error(f"❌ Status Request Fehler: {e}")
-            self.send_error(500, f"Status Error: {e}")
+    def apply_delta(self, delta):
+        """Delta-Heartbeat auf den bekannten Zustand anwenden -> (aktive Nodes, voller Zustand)
+        
+        Passt base_version nicht zur gespeicherten Version (Node unbekannt, Server neu
+        gestartet, Antwort verloren), wird ResyncRequired geworfen.
+        """
+        node_id = delta.get('node_id')
+        with self._node(node_id) as record:
+            if record is None or record.state_version is None or record.state_version != delta.get('base_version'):
+                raise ResyncRequired(node_id)
+            changes = delta.get('changes') or {}
+            removed = delta.get('removed') or []
+            changed = bool(changes or removed)
+            node_data = apply_changes(record.data, changes, removed) if changed else dict(record.data)
+            node_data.update({'timestamp': delta['timestamp'], 'state_version': delta['state_version']})
+            active, entry = self._store(record, node_data, delta['state_version'], changed)
+        self._journal(entry)
+        logging.debug(f"Delta-Heartbeat von '{node_id}': {len(changes)} Felder geändert")
+        return active, node_data
     
-    def handle_nodes_request(self):
-        """Sende Node Liste"""
-        try:
-            nodes = self.server.node_registry.get_active_nodes()
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(nodes, indent=2).encode('utf-8'))
-            
-        except Exception as e:
-            logging.error(f"❌ Nodes Request Fehler: {e}")
-            self.send_error(500, f"Nodes Error: {e}")
+    def touch(self, node_id, state_version):
+        """UDP-Heartbeat: nur last_seen auffrischen, wenn der Zustand des Nodes bekannt ist
+        
+        Gibt den gespeicherten Zustand zurück oder None (unbekannter Node oder andere
+        state_version), dann muss der Node per HTTP synchronisieren.
+        """
+        with self._node(node_id) as record:
+            if record is None or record.state_version is None or record.state_version != state_version:
+                return None
+            node_data = record.data
+            _, entry = self._store(record, node_data, state_version, False)
+        self._journal(entry)
+        return node_data
     
-    def handle_health_check(self):
-        """Health Check Endpoint"""
-        try:
-            health = {
-                'status': 'healthy',
-                'timestamp': time.time(),
-                'server': 'M1 Handshake Server',
-                'version': '1.0.0'
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(health).encode('utf-8'))
-            
-        except Exception as e:
-            logging.error(f"❌ Health Check Fehler: {e}")
-            self.send_error(500, f"Health Error: {e}")
+    def _store(self, record, node_data, state_version, changed):
+        """Zustand übernehmen und Heap nachführen -> (aktive Nodes, WAL-Eintrag oder None)
+        
+        Aufrufer hält den Stripe-Lock des Nodes und mindestens den Lese-Lock.
+        """
+        now = time.time()
+        record.data = node_data
+        record.last_seen = now
+        record.state_version = state_version
+        with self._heap_lock:
+            self._expire(now)
+            if not record.active:
+                record.active = True
+                self._active += 1
+            heapq.heappush(self._heap, (now, record.node_id))
+            self._compact()
+            active = self._active
+        if self.journal is None:
+            return active, None
+        # Unveränderte Heartbeats brauchen nur den Zeitstempel im WAL
+        entry = {'node_id': record.node_id, 'last_seen': now}
+        if changed:
+            entry.update({'data': node_data, 'registered_at': record.registered_at,
+                          'state_version': state_version})
+        return active, entry
     
-    def handle_shutdown_request(self):
-        """Handle Remote Shutdown Request"""
-        try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            request_data = json.loads(post_data.decode('utf-8')) if content_length > 0 else {}
-            
-            source = request_data.get('source', 'unknown')
-            delay_minutes = request_data.get('delay_minutes', 1)
-            
-            logging.info(f"🔌 Shutdown-Anfrage von: {source}")
-            
-            # Importiere subprocess für System-Befehle
-            import subprocess
-            import os
-            
-            # Stoppe GENTLEMAN Services
-            try:
-                subprocess.run(['./m1_master_control.sh', 'stop'], 
-                              capture_output=True, timeout=30, cwd='/Users/amonbaumgartner/Gentleman')
-                logging.info("✅ GENTLEMAN Services gestoppt")
-            except Exception as e:
-                logging.warning(f"⚠️ Service-Stop Fehler: {e}")
-            
-            # Stoppe Handshake Server Prozesse
-            try:
-                subprocess.run(['pkill', '-f', 'python3.*handshake'], capture_output=True)
-                logging.info("✅ Handshake Server Prozesse gestoppt")
-            except Exception as e:
-                logging.warning(f"⚠️ Handshake-Stop Fehler: {e}")
-            
-            # Stoppe Cloudflare Tunnel
-            try:
-                subprocess.run(['pkill', '-f', 'cloudflared'], capture_output=True)
-                logging.info("✅ Cloudflare Tunnel gestoppt")
-            except Exception as e:
-                logging.warning(f"⚠️ Tunnel-Stop Fehler: {e}")
-            
-            # Plane System-Shutdown
-            try:
-                subprocess.Popen(['sudo', 'shutdown', '-h', f'+{delay_minutes}'])
-                logging.info(f"⏰ System-Shutdown in {delay_minutes} Minute(n) geplant")
-            except Exception as e:
-                logging.error(f"❌ Shutdown-Planung Fehler: {e}")
-                raise
-            
-            # Sende Erfolgs-Response
-            response = {
-                'status': 'success',
-                'message': f'System-Shutdown in {delay_minutes} Minute(n) geplant',
-                'source': source,
-                'delay_minutes': delay_minutes,
-                'timestamp': time.time()
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"✅ Shutdown-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ Shutdown Handler Fehler: {e}")
-            self.send_error(500, f"Shutdown Error: {e}")
+    def _journal(self, entry):
+        if entry is not None:
+            self.journal.append(entry)
     
-    def handle_bootup_request(self):
-        """Handle Remote Bootup Request (Wake-on-LAN)"""
-        try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            request_data = json.loads(post_data.decode('utf-8')) if content_length > 0 else {}
-            
-            target_mac = request_data.get('target_mac', 'auto')
-            target_ip = request_data.get('target_ip', '192.168.68.111')
-            source = request_data.get('source', 'unknown')
-            
-            logging.info(f"🔋 Bootup-Anfrage von: {source} für {target_ip}")
-            
-            # Importiere subprocess für System-Befehle
-            import subprocess
-            
-            # Automatische MAC-Adresse ermitteln falls nicht angegeben
-            if target_mac == 'auto':
-                try:
-                    # Versuche MAC-Adresse aus ARP-Tabelle zu holen
-                    arp_result = subprocess.run(['arp', '-n', target_ip], 
-                                              capture_output=True, text=True)
-                    if arp_result.returncode == 0:
-                        lines = arp_result.stdout.strip().split('\n')
-                        for line in lines:
-                            if target_ip in line:
-                                parts = line.split()
-                                if len(parts) >= 3:
-                                    target_mac = parts[2]
-                                    break
-                except Exception as e:
-                    logging.warning(f"⚠️ MAC-Adresse Auto-Ermittlung fehlgeschlagen: {e}")
-            
-            # Fallback MAC-Adresse für M1 Mac (falls bekannt)
-            if target_mac == 'auto' or not target_mac:
-                # Hier könntest du die bekannte MAC-Adresse des M1 Mac eintragen
-                target_mac = "00:00:00:00:00:00"  # Placeholder
-                logging.warning(f"⚠️ Verwende Fallback MAC-Adresse: {target_mac}")
-            
-            # Wake-on-LAN Magic Packet senden
-            try:
-                # Verwende wakeonlan Tool (falls installiert)
-                wol_result = subprocess.run(['wakeonlan', target_mac], 
-                                          capture_output=True, text=True)
-                if wol_result.returncode == 0:
-                    logging.info(f"✅ Wake-on-LAN Packet gesendet an {target_mac}")
-                    wol_method = "wakeonlan"
-                else:
-                    raise Exception("wakeonlan nicht verfügbar")
-            except:
-                # Fallback: Python-basiertes Wake-on-LAN
-                try:
-                    import socket
-                    
-                    # MAC-Adresse formatieren
-                    mac_bytes = bytes.fromhex(target_mac.replace(':', '').replace('-', ''))
-                    
-                    # Magic Packet erstellen (6 x 0xFF + 16 x MAC-Adresse)
-                    magic_packet = b'\xff' * 6 + mac_bytes * 16
-                    
-                    # UDP-Socket erstellen und Packet senden
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                    sock.sendto(magic_packet, ('255.255.255.255', 9))
-                    sock.close()
-                    
-                    logging.info(f"✅ Python Wake-on-LAN Packet gesendet an {target_mac}")
-                    wol_method = "python"
-                except Exception as e:
-                    logging.error(f"❌ Wake-on-LAN Fehler: {e}")
-                    raise
+    def _expire(self, now):
+        """Heap-Einträge älter als timeout abbauen; nur der jüngste Eintrag eines Nodes zählt (Heap-Lock)"""
+        cutoff = now - self.timeout
+        heap = self._heap
+        while heap and heap[0][0] <= cutoff:
+            last_seen, node_id = heapq.heappop(heap)
+            record = self._records.get(node_id)
+            if record is not None and record.active and record.last_seen == last_seen:
+                record.active = False
+                self._active -= 1
+    
+    def _compact(self):
+        # Jeder Heartbeat legt einen Eintrag an; veraltete nicht unbegrenzt mitschleppen.
+        # Durchläuft _records: Heap-Lock plus mindestens Lese-Lock
+        if len(self._heap) > 4 * len(self._records) + 64:
+            self._heap = [(record.last_seen, node_id) for node_id, record in self._records.items() if record.active]
+            heapq.heapify(self._heap)
+    
+    def sweep(self):
+        """Abgelaufene Heap-Einträge abbauen, auch wenn keine Heartbeats mehr kommen"""
+        with self._lock.read(), self._heap_lock:
+            self._expire(time.time())
+            self._compact()
+    
+    def active_count(self):
+        with self._heap_lock:
+            self._expire(time.time())
+            return self._active
             
-            # Sende Erfolgs-Response
-            response = {
-                'status': 'success',
-                'message': f'Wake-on-LAN Packet gesendet an {target_mac}',
-                'target_mac': target_mac,
-                'target_ip': target_ip,
-                'source': source,
-                'method': wol_method,
+    def get_active_nodes(self, timeout=None):
+        """Hole alle aktiven Nodes (last_seen < timeout seconds)"""
+        now = time.time()
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock.read():
+            return {node_id: record.to_dict() for node_id, record in self._records.items()
+                    if now - record.last_seen < timeout}
+    
+    def get_inactive_nodes(self):
+        """node_id -> last_seen aller Nodes ohne Heartbeat innerhalb des Timeouts"""
+        now = time.time()
+        with self._lock.read():
+            return {node_id: record.last_seen for node_id, record in self._records.items()
+                    if now - record.last_seen >= self.timeout}
+    
+    def get_node_status(self, node_id):
+        """Hole Status eines spezifischen Nodes"""
+        with self._lock.read():
+            record = self._records.get(node_id)
+            return record.to_dict() if record else None
+    
+    def get_cluster_summary(self, include_nodes=True):
+        """Hole Cluster-Zusammenfassung; Zähler kommen aus dem Heap, nodes kostet einen Durchlauf"""
+        with self._lock.read():
+            total = len(self._records)
+            with self._heap_lock:
+                self._expire(time.time())
+                active = self._active
+            summary = {
+                'total_nodes': total,
+                'active_nodes': active,
                 'timestamp': time.time()
             }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"✅ Bootup-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ Bootup Handler Fehler: {e}")
-            self.send_error(500, f"Bootup Error: {e}")
+            if include_nodes:
+                summary['nodes'] = {node_id: record.to_dict() for node_id, record in self._records.items()
+                                    if record.active}
+        return summary
+
+class CoordinatorForwarder:
+    """Leitet Handshakes als Announcements an den Mesh Coordinator weiter"""
     
-    def handle_rx_node_shutdown(self):
-        """Handle RX Node Remote Shutdown Request"""
+    def __init__(self, coordinator_url, ttl=300, max_pending=100):
+        self.announce_url = coordinator_url.rstrip('/') + '/mesh/announce'
+        self.ttl = ttl
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.forwarded = 0
+        self.failed = 0
+        self.dropped = 0
+        self._last_submitted = {}
+        # Announcements für fremde Adressen nimmt der Coordinator nur signiert an (mesh-coordinator/auth.py)
+        self.keyring = heartbeat_udp.KeyRing(field='mesh_coordinator_key').load()
+        
+    def sign(self, announcement):
+        configured = os.getenv('GENTLEMAN_MESH_KEYS')
+        self.keyring.refresh()
+        key = configured.split(',')[0].strip().encode('utf-8') if configured else self.keyring.current
+        if not key:
+            return announcement
+        signed = {**announcement, 'sent_at': time.time()}
+        canonical = json.dumps(signed, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        signed['sig'] = hmac.new(key, canonical, hashlib.sha256).hexdigest()
+        return signed
+        
+    def start(self):
+        thread = threading.Thread(target=self.run, name='coordinator-forwarder', daemon=True)
+        thread.start()
+        logging.info(f"📡 Handshakes werden an {self.announce_url} weitergeleitet")
+        
+    def submit(self, node_data, client_ip):
+        """Nicht blockierend: der Handshake-Request wartet nie auf den Coordinator"""
+        announcement = {
+            'node_id': node_data.get('node_id'),
+            'ip': node_data.get('ip') or client_ip,
+            'node_type': node_data.get('node_type'),
+            'services': node_data.get('services') or {},
+            'capabilities': node_data.get('capabilities') or [],
+            'system_info': node_data.get('system_info') or {},
+            'ttl': self.ttl,
+            'source': 'handshake'
+        }
         try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            request_data = json.loads(post_data.decode('utf-8')) if content_length > 0 else {}
-            
-            source = request_data.get('source', 'unknown')
-            delay_minutes = request_data.get('delay_minutes', 1)
-            
-            logging.info(f"🎯 RX Node Shutdown-Anfrage von: {source}")
-            
-            import subprocess
-            
-            # SSH-Verbindung zur RX Node über M1 Mac (als Gateway)
-            rx_node_ip = "192.168.68.117"
-            ssh_key = "/Users/amonbaumgartner/.ssh/gentleman_key"
-            
-            # SSH-Befehl für RX Node Shutdown
-            ssh_cmd = [
-                'ssh', '-i', ssh_key, '-o', 'StrictHostKeyChecking=no',
-                '-o', 'ConnectTimeout=10', f'amo9n11@{rx_node_ip}',
-                f'sudo shutdown -h +{delay_minutes}'
-            ]
+            self.pending.put_nowait(announcement)
+            self._last_submitted[announcement['node_id']] = time.monotonic()
+        except queue.Full:
+            self.dropped += 1
+    
+    def refresh(self, node_data, client_ip):
+        """Für UDP-Heartbeats: Announcement nur erneuern, bevor die TTL beim Coordinator abläuft"""
+        last = self._last_submitted.get(node_data.get('node_id'))
+        if last is None or time.monotonic() - last >= self.ttl / 3:
+            self.submit(node_data, client_ip)
             
+    def run(self):
+        while True:
+            announcement = self.pending.get()
             try:
-                result = subprocess.run(ssh_cmd, capture_output=True, text=True, timeout=15)
-                
-                if result.returncode == 0:
-                    logging.info(f"✅ RX Node Shutdown erfolgreich geplant ({delay_minutes} Min)")
-                    status = "success"
-                    message = f"RX Node Shutdown in {delay_minutes} Minute(n) geplant"
-                else:
-                    logging.error(f"❌ RX Node Shutdown Fehler: {result.stderr}")
-                    status = "error"
-                    message = f"SSH Fehler: {result.stderr}"
-                    
-            except subprocess.TimeoutExpired:
-                logging.error("❌ RX Node SSH Timeout")
-                status = "error"
-                message = "SSH Verbindung zur RX Node timeout"
+                request = urllib.request.Request(
+                    self.announce_url,
+                    data=json.dumps(self.sign(announcement)).encode('utf-8'),
+                    headers={'Content-Type': 'application/json'},
+                    method='POST'
+                )
+                with urllib.request.urlopen(request, timeout=3) as response:
+                    response.read()
+                self.forwarded += 1
             except Exception as e:
-                logging.error(f"❌ RX Node SSH Fehler: {e}")
-                status = "error"
-                message = f"SSH Verbindungsfehler: {e}"
-            
-            # Sende Response
-            response = {
-                'status': status,
-                'message': message,
-                'target': 'RX Node',
-                'target_ip': rx_node_ip,
-                'source': source,
-                'delay_minutes': delay_minutes,
-                'timestamp': time.time()
-            }
-            
-            self.send_response(200 if status == "success" else 500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"📡 RX Node Shutdown-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ RX Node Shutdown Handler Fehler: {e}")
-            self.send_error(500, f"RX Node Shutdown Error: {e}")
+                self.failed += 1
+                logging.warning(f"⚠️ Coordinator Announcement fehlgeschlagen: {e}")
+
+class HeartbeatListener:
+    """UDP-Heartbeats (heartbeat_udp): ein Thread, kein TCP und kein JSON im Pfad
     
-    def handle_rx_node_wakeup(self):
-        """Handle RX Node Wake-on-LAN Request"""
-        try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            request_data = json.loads(post_data.decode('utf-8')) if content_length > 0 else {}
-            
-            source = request_data.get('source', 'unknown')
-            
-            logging.info(f"🔋 RX Node Wakeup-Anfrage von: {source}")
-            
-            import subprocess
-            import socket
-            
-            # RX Node Details
-            rx_node_ip = "192.168.68.117"
-            rx_node_mac = "30:9c:23:5f:44:a8"  # Bekannte MAC-Adresse der RX Node
-            
+    Gültige Heartbeats frischen nur last_seen auf. Kennt der Server den Zustand des
+    Nodes nicht (Neustart ohne WAL, neue state_version), antwortet er mit einem
+    signierten RESYNC-Paket; der Node schickt dann den Zustand per HTTP.
+    """
+    
+    def __init__(self, ctx, host, port, keyring):
+        self.ctx = ctx
+        self.address = (host, port)
+        self.keyring = keyring
+        self.sock = None
+        self._last_sequence = {}
+        self.stats = {
+            'received': 0,
+            'accepted': 0,
+            'invalid': 0,
+            'replayed': 0,
+            'resync': 0
+        }
+        
+    def start(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Großer Empfangspuffer fängt Bursts ab, wenn viele Nodes gleichzeitig senden
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.sock.bind(self.address)
+        thread = threading.Thread(target=self.run, name='udp-heartbeat', daemon=True)
+        thread.start()
+        logging.info(f"💓 UDP Heartbeats auf {self.address[0]}:{self.address[1]} ({len(self.keyring.keys)} Schlüssel)")
+        
+    def run(self):
+        while True:
             try:
-                # Wake-on-LAN Magic Packet senden
-                try:
-                    # Verwende wakeonlan Tool (falls installiert)
-                    wol_result = subprocess.run(['wakeonlan', rx_node_mac], 
-                                              capture_output=True, text=True)
-                    if wol_result.returncode == 0:
-                        logging.info(f"✅ RX Node Wake-on-LAN Packet gesendet an {rx_node_mac}")
-                        wol_method = "wakeonlan"
-                    else:
-                        raise Exception("wakeonlan nicht verfügbar")
-                except:
-                    # Fallback: Python-basiertes Wake-on-LAN
-                    mac_bytes = bytes.fromhex(rx_node_mac.replace(':', ''))
-                    magic_packet = b'\xff' * 6 + mac_bytes * 16
-                    
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                    sock.sendto(magic_packet, ('255.255.255.255', 9))
-                    sock.close()
-                    
-                    logging.info(f"✅ RX Node Python Wake-on-LAN Packet gesendet an {rx_node_mac}")
-                    wol_method = "python"
+                packet, address = self.sock.recvfrom(512)
+            except OSError:
+                if self.sock.fileno() < 0:
+                    return
+                continue
+            try:
+                self.handle(packet, address)
+            except Exception as e:
+                logging.error(f"❌ UDP Heartbeat Fehler: {e}")
                 
-                status = "success"
-                message = f"Wake-on-LAN Packet an RX Node gesendet ({rx_node_mac})"
+    def handle(self, packet, address):
+        self.stats['received'] += 1
+        decoded = heartbeat_udp.decode(packet, self.keyring)
+        if decoded is None:
+            self.stats['invalid'] += 1
+            # Unbekannte key_id kann eine frische Rotation sein
+            self.keyring.refresh()
+            return
+        node_id, sequence, state_version, flags, key = decoded
+        if abs(sequence / 1e6 - time.time()) > heartbeat_udp.MAX_SKEW or sequence <= self._last_sequence.get(node_id, 0):
+            self.stats['replayed'] += 1
+            return
+        self._last_sequence[node_id] = sequence
+        
+        node_data = self.ctx.node_registry.touch(node_id, state_version)
+        if node_data is None:
+            self.stats['resync'] += 1
+            self.sock.sendto(heartbeat_udp.encode(key, node_id, sequence, state_version, heartbeat_udp.FLAG_RESYNC),
+                             address)
+            return
+        self.stats['accepted'] += 1
+        if self.ctx.forwarder:
+            self.ctx.forwarder.refresh(node_data, address[0])
+            
+    def close(self):
+        if self.sock:
+            self.sock.close()
+
+class HandlerError(Exception):
+    """Fehler mit HTTP-Status, den der Backend-Code als JSON ausliefert"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class ServerContext:
+    """Gemeinsamer Zustand für alle Handler, unabhängig vom HTTP-Backend"""
+    
+    def __init__(self, node_registry, forwarder=None, admin_workers=2):
+        self.node_registry = node_registry
+        self.forwarder = forwarder
+        self.heartbeat_listener = None
+        self.metrics = None
+        self.remote = cluster_admin.RemoteExecutor()
+        rx_node = cluster_admin.ClusterNode('rx_node', RX_NODE_IP, RX_NODE_USER, RX_NODE_SSH_KEY, RX_NODE_MAC)
+        self.inventory = cluster_admin.load_inventory(CLUSTER_INVENTORY, {'rx_node': rx_node},
+                                                      ssh_key=RX_NODE_SSH_KEY)
+        # Langsame Admin-Operationen (ssh, subprocess) laufen nie im Request-Pfad der Heartbeats
+        self.admin_executor = ThreadPoolExecutor(max_workers=admin_workers, thread_name_prefix='admin')
+        self.admin_slots = threading.BoundedSemaphore(admin_workers)
+        self.admin_rejected = 0
+        
+    def submit_admin(self, handler, data, client_ip):
+        """Future mit (status, payload) der Admin-Operation oder None, wenn alle Admin-Slots belegt sind
+        
+        Ein StreamingResponse wird sofort ausgeliefert, gefüllt wird er aber weiter im
+        Admin-Thread: der Slot bleibt belegt, bis das letzte Element vorliegt.
+        """
+        if not self.admin_slots.acquire(blocking=False):
+            self.admin_rejected += 1
+            return None
+        response = Future()
+        
+        def task():
+            status, payload = run_handler(self, handler, data, client_ip)
+            response.set_result((status, payload))
+            if isinstance(payload, StreamingResponse):
+                payload.pump()
                 
-            except Exception as e:
-                logging.error(f"❌ RX Node Wake-on-LAN Fehler: {e}")
-                status = "error"
-                message = f"Wake-on-LAN Fehler: {e}"
-                wol_method = "failed"
-            
-            # Sende Response
-            response = {
-                'status': status,
-                'message': message,
-                'target': 'RX Node',
-                'target_ip': rx_node_ip,
-                'target_mac': rx_node_mac,
-                'source': source,
-                'method': wol_method,
-                'timestamp': time.time()
-            }
-            
-            self.send_response(200 if status == "success" else 500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"📡 RX Node Wakeup-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ RX Node Wakeup Handler Fehler: {e}")
-            self.send_error(500, f"RX Node Wakeup Error: {e}")
+        try:
+            future = self.admin_executor.submit(task)
+        except RuntimeError:
+            self.admin_slots.release()
+            raise
+        future.add_done_callback(lambda _: self.admin_slots.release())
+        return response
+
+# 🧩 Handler: reine Funktionen (ctx, request_data, client_ip) -> (status, payload)
+def handle_handshake(ctx, node_data, client_ip):
+    """Verarbeite Node Handshake
     
-    def handle_rx_node_status(self):
-        """Handle RX Node Status Check Request"""
+    Voller Handshake: kompletter Zustand, optional mit state_version.
+    Delta-Heartbeat: node_id, timestamp, state_version, base_version und nur die
+    geänderten Felder (changes, removed); ohne passende Basis antwortet der Server
+    mit 409 und status 'resync'.
+    """
+    if 'base_version' in node_data:
+        if not all(field in node_data for field in ('node_id', 'timestamp', 'state_version')):
+            raise HandlerError(400, "Missing required fields")
         try:
-            # Kann sowohl GET als auch POST sein
-            source = "unknown"
-            if self.command == "POST":
-                content_length = int(self.headers.get('Content-Length', 0))
-                if content_length > 0:
-                    post_data = self.rfile.read(content_length)
-                    request_data = json.loads(post_data.decode('utf-8'))
-                    source = request_data.get('source', 'unknown')
-            
-            logging.info(f"📊 RX Node Status-Anfrage von: {source}")
-            
-            import subprocess
-            
-            # RX Node Details
-            rx_node_ip = "192.168.68.117"
-            rx_node_mac = "30:9c:23:5f:44:a8"
-            ssh_key = "/Users/amonbaumgartner/.ssh/gentleman_key"
-            
-            # Teste SSH-Verbindung zur RX Node mit kurzen Timeouts
-            ssh_cmd = [
-                'ssh', '-i', ssh_key, '-o', 'StrictHostKeyChecking=no',
-                '-o', 'ConnectTimeout=3', '-o', 'ServerAliveInterval=2',
-                '-o', 'ServerAliveCountMax=1', f'amo9n11@{rx_node_ip}',
-                'uptime && hostname && whoami'
-            ]
-            
-            try:
-                result = subprocess.run(ssh_cmd, capture_output=True, text=True, timeout=5)
-                
-                if result.returncode == 0:
-                    # RX Node ist online
-                    uptime_info = result.stdout.strip()
-                    status = "online"
-                    message = "RX Node ist online und erreichbar"
-                    details = {
-                        'ssh_accessible': True,
-                        'uptime': uptime_info
-                    }
-                    logging.info(f"✅ RX Node Status: ONLINE")
-                else:
-                    # SSH-Fehler
-                    status = "offline"
-                    message = f"RX Node SSH Fehler: {result.stderr}"
-                    details = {
-                        'ssh_accessible': False,
-                        'error': result.stderr
-                    }
-                    logging.warning(f"⚠️ RX Node Status: SSH FEHLER")
-                    
-            except subprocess.TimeoutExpired:
-                status = "offline"
-                message = "RX Node SSH Timeout - möglicherweise offline"
-                details = {
-                    'ssh_accessible': False,
-                    'error': 'SSH Timeout'
-                }
-                logging.warning(f"⚠️ RX Node Status: TIMEOUT")
-            except Exception as e:
-                status = "offline"
-                message = f"RX Node Verbindungsfehler: {e}"
-                details = {
-                    'ssh_accessible': False,
-                    'error': str(e)
-                }
-                logging.error(f"❌ RX Node Status Fehler: {e}")
-            
-            # Sende Response
-            response = {
-                'status': status,
-                'message': message,
-                'target': 'RX Node',
-                'target_ip': rx_node_ip,
-                'target_mac': rx_node_mac,
-                'source': source,
-                'details': details,
-                'timestamp': time.time()
+            active_nodes, node_data = ctx.node_registry.apply_delta(node_data)
+        except ResyncRequired:
+            logging.info(f"🔁 Resync für {node_data['node_id']} angefordert")
+            return 409, {
+                'status': 'resync',
+                'message': f"Unknown base version for {node_data['node_id']}, send full state",
+                'server_timestamp': time.time()
             }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response, indent=2).encode('utf-8'))
-            
-            logging.info(f"📡 RX Node Status-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ RX Node Status Handler Fehler: {e}")
-            self.send_error(500, f"RX Node Status Error: {e}")
+    else:
+        # Validiere Handshake Data
+        required_fields = ['node_id', 'timestamp', 'status']
+        if not all(field in node_data for field in required_fields):
+            raise HandlerError(400, "Missing required fields")
+        
+        # Registriere Node
+        active_nodes = ctx.node_registry.register_node(node_data)
+    if ctx.metrics:
+        ctx.metrics.record(node_data['node_id'], node_data.get('system_info'))
+    if ctx.forwarder:
+        ctx.forwarder.submit(node_data, client_ip)
     
-    def log_message(self, format, *args):
-        """Überschreibe Standard-Logging"""
-        logging.info(f"🌐 {self.address_string()} - {format % args}")
+    logging.info(f"📡 Handshake von {node_data['node_id']} verarbeitet")
+    return 200, {
+        'status': 'success',
+        'message': f"Node {node_data['node_id']} registered",
+        'server_timestamp': time.time(),
+        'cluster_nodes': active_nodes,
+        'state_version': node_data.get('state_version')
+    }
 
-class HandshakeServer:
-    """Main Handshake Server Class"""
+def handle_status_request(ctx, request_data, client_ip):
+    """Sende Cluster Status"""
+    return 200, ctx.node_registry.get_cluster_summary()
+
+def handle_nodes_request(ctx, request_data, client_ip):
+    """Sende Node Liste"""
+    return 200, ctx.node_registry.get_active_nodes()
+
+def handle_health_check(ctx, request_data, client_ip):
+    """Health Check Endpoint"""
+    return 200, {
+        'status': 'healthy',
+        'timestamp': time.time(),
+        'server': 'M1 Handshake Server',
+        'version': '1.1.0',
+        # Nodes nutzen UDP-Heartbeats nur, wenn der Server sie anbietet
+        'udp_heartbeat_port': ctx.heartbeat_listener.address[1] if ctx.heartbeat_listener else None
+    }
+
+def _float_param(request_data, name):
+    value = request_data.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise HandlerError(400, f"Invalid {name}")
+
+def _metric_params(request_data):
+    """Gemeinsame Parameter der Metrik-Endpoints; start/end als Unix-Zeit oder start relativ (z.B. -3600)"""
+    end = _float_param(request_data, 'end') or time.time()
+    start = _float_param(request_data, 'start')
+    if start is not None and start < 0:
+        start = end + start
+    return start, end
+
+def handle_metrics_range(ctx, request_data, client_ip):
+    """Zeitreihe eines Nodes: ?node=...&metric=load_1m,memory_percent&start=-86400&step=300"""
+    node_id = request_data.get('node')
+    if not node_id:
+        raise HandlerError(400, "Missing node")
+    metrics = request_data.get('metric') or ','.join(node_metrics.METRICS)
+    if isinstance(metrics, str):
+        metrics = [metric for metric in metrics.split(',') if metric]
+    unknown = [metric for metric in metrics if metric not in node_metrics.METRICS]
+    if unknown:
+        raise HandlerError(400, f"Unknown metric: {', '.join(unknown)}")
+    start, end = _metric_params(request_data)
+    result = ctx.metrics.query(node_id, tuple(metrics), start, end, _float_param(request_data, 'step'))
+    if result is None:
+        raise HandlerError(404, f"No metrics for node {node_id}")
+    return 200, result
+
+def handle_metrics_aggregate(ctx, request_data, client_ip):
+    """Aggregate einer Metrik über alle (oder ausgewählte) Nodes: ?metric=load_1m&start=-604800"""
+    metric = request_data.get('metric', 'load_1m')
+    if metric not in node_metrics.METRICS:
+        raise HandlerError(400, f"Unknown metric: {metric}")
+    nodes = request_data.get('nodes')
+    if isinstance(nodes, str):
+        nodes = [node for node in nodes.split(',') if node]
+    start, end = _metric_params(request_data)
+    return 200, ctx.metrics.aggregate(metric, start, end, nodes)
+
+def handle_shutdown_request(ctx, request_data, client_ip):
+    """Handle Remote Shutdown Request"""
+    source = request_data.get('source', 'unknown')
+    delay_minutes = request_data.get('delay_minutes', 1)
     
-    def __init__(self, host='0.0.0.0', port=8765):
-        self.host = host
-        self.port = port
-        self.node_registry = NodeRegistry()
-        self.server = None
-        
-    def start(self):
-        """Starte den Handshake Server"""
+    logging.info(f"🔌 Shutdown-Anfrage von: {source}")
+    
+    # Stoppe GENTLEMAN Services
+    try:
+        subprocess.run(['./m1_master_control.sh', 'stop'], 
+                      capture_output=True, timeout=30, cwd='/Users/amonbaumgartner/Gentleman')
+        logging.info("✅ GENTLEMAN Services gestoppt")
+    except Exception as e:
+        logging.warning(f"⚠️ Service-Stop Fehler: {e}")
+    
+    # Stoppe Handshake Server Prozesse
+    try:
+        subprocess.run(['pkill', '-f', 'python3.*handshake'], capture_output=True)
+        logging.info("✅ Handshake Server Prozesse gestoppt")
+    except Exception as e:
+        logging.warning(f"⚠️ Handshake-Stop Fehler: {e}")
+    
+    # Stoppe Cloudflare Tunnel
+    try:
+        subprocess.run(['pkill', '-f', 'cloudflared'], capture_output=True)
+        logging.info("✅ Cloudflare Tunnel gestoppt")
+    except Exception as e:
+        logging.warning(f"⚠️ Tunnel-Stop Fehler: {e}")
+    
+    # Plane System-Shutdown
+    try:
+        subprocess.Popen(['sudo', 'shutdown', '-h', f'+{delay_minutes}'])
+        logging.info(f"⏰ System-Shutdown in {delay_minutes} Minute(n) geplant")
+    except Exception as e:
+        logging.error(f"❌ Shutdown-Planung Fehler: {e}")
+        raise HandlerError(500, f"Shutdown Error: {e}")
+    
+    logging.info(f"✅ Shutdown-Response gesendet an {source}")
+    return 200, {
+        'status': 'success',
+        'message': f'System-Shutdown in {delay_minutes} Minute(n) geplant',
+        'source': source,
+        'delay_minutes': delay_minutes,
+        'timestamp': time.time()
+    }
+
+def handle_bootup_request(ctx, request_data, client_ip):
+    """Handle Remote Bootup Request (Wake-on-LAN)"""
+    target_mac = request_data.get('target_mac', 'auto')
+    target_ip = request_data.get('target_ip', '192.168.68.111')
+    source = request_data.get('source', 'unknown')
+    
+    logging.info(f"🔋 Bootup-Anfrage von: {source} für {target_ip}")
+    
+    # Automatische MAC-Adresse ermitteln falls nicht angegeben
+    if target_mac == 'auto':
         try:
-            # Erstelle HTTP Server
-            self.server = HTTPServer((self.host, self.port), HandshakeHandler)
-            self.server.node_registry = self.node_registry
-            
-            logging.info(f"🚀 Handshake Server gestartet auf {self.host}:{self.port}")
-            logging.info(f"📡 Endpoints verfügbar:")
-            logging.info(f"   POST /handshake               - Node Registrierung")
-            logging.info(f"   GET  /status                  - Cluster Status")
-            logging.info(f"   GET  /nodes                   - Aktive Nodes")
-            logging.info(f"   GET  /health                  - Health Check")
-            logging.info(f"   POST /admin/shutdown          - M1 Mac Remote Shutdown")
-            logging.info(f"   POST /admin/bootup            - M1 Mac Remote Bootup (Wake-on-LAN)")
-            logging.info(f"   POST /admin/rx-node/shutdown  - RX Node Remote Shutdown")
-            logging.info(f"   POST /admin/rx-node/wakeup    - RX Node Wake-on-LAN")
-            logging.info(f"   GET  /admin/rx-node/status    - RX Node Status Check")
-            
-            # Starte Status Monitor Thread
-            status_thread = threading.Thread(target=self.status_monitor, daemon=True)
-            status_thread.start()
-            
-            # Starte Server
-            self.server.serve_forever()
-            
-        except KeyboardInterrupt:
-            logging.info("🛑 Server durch Benutzer gestoppt")
+            # Versuche MAC-Adresse aus ARP-Tabelle zu holen
+            arp_result = subprocess.run(['arp', '-n', target_ip], 
+                                      capture_output=True, text=True, timeout=5)
+            if arp_result.returncode == 0:
+                for line in arp_result.stdout.strip().split('\n'):
+                    if target_ip in line:
+                        parts = line.split()
+                        if len(parts) >= 3:
+                            target_mac = parts[2]
+                            break
         except Exception as e:
-            logging.error(f"❌ Server Fehler: {e}")
-        finally:
-            if self.server:
-                self.server.shutdown()
-                logging.info("✅ Server heruntergefahren")
+            logging.warning(f"⚠️ MAC-Adresse Auto-Ermittlung fehlgeschlagen: {e}")
     
-    def status_monitor(self):
-        """Überwache Cluster Status"""
-        while True:
-            try:
-                time.sleep(60)  # Alle 60 Sekunden
-                status = self.node_registry.get_cluster_summary()
-                logging.info(f"📊 Cluster Status: {status['active_nodes']}/{status['total_nodes']} Nodes aktiv")
-                
-                # Log inactive nodes
-                all_nodes = self.node_registry.nodes
-                active_nodes = status['nodes']
-                
-                for node_id in all_nodes:
-                    if node_id not in active_nodes:
-                        last_seen = all_nodes[node_id]['last_seen']
-                        offline_minutes = (time.time() - last_seen) / 60
-                        logging.warning(f"⚠️ Node '{node_id}' offline seit {offline_minutes:.1f} Minuten")
-                        
-            except Exception as e:
-                logging.error(f"❌ Status Monitor Fehler: {e}")
+    # Fallback MAC-Adresse für M1 Mac (falls bekannt)
+    if target_mac == 'auto' or not target_mac:
+        # Hier könntest du die bekannte MAC-Adresse des M1 Mac eintragen
+        target_mac = "00:00:00:00:00:00"  # Placeholder
+        logging.warning(f"⚠️ Verwende Fallback MAC-Adresse: {target_mac}")
+    
+    try:
+        wol_method = cluster_admin.send_magic_packet(target_mac)
+        logging.info(f"✅ Wake-on-LAN Packet gesendet an {target_mac} ({wol_method})")
+    except Exception as e:
+        logging.error(f"❌ Wake-on-LAN Fehler: {e}")
+        raise HandlerError(500, f"Bootup Error: {e}")
+    
+    logging.info(f"✅ Bootup-Response gesendet an {source}")
+    return 200, {
+        'status': 'success',
+        'message': f'Wake-on-LAN Packet gesendet an {target_mac}',
+        'target_mac': target_mac,
+        'target_ip': target_ip,
+        'source': source,
+        'method': wol_method,
+        'timestamp': time.time()
+    }
 
-def main():
-    """Main Function"""
-    import argparse
+def rx_node(ctx):
+    return ctx.inventory['rx_node']
+
+def run_on_node(ctx, operation, node, params=None, deadline=None):
+    """Eine Cluster-Operation auf einem einzelnen Node, über denselben Executor wie /admin/cluster/*"""
+    function, default_deadline = cluster_admin.OPERATIONS[operation]
+    return next(ctx.remote.run([node], function, deadline or default_deadline, params))
+
+def handle_rx_node_shutdown(ctx, request_data, client_ip):
+    """Handle RX Node Remote Shutdown Request"""
+    source = request_data.get('source', 'unknown')
+    delay_minutes = request_data.get('delay_minutes', 1)
     
-    parser = argparse.ArgumentParser(description='GENTLEMAN M1 Handshake Server')
-    parser.add_argument('--host', default='0.0.0.0', help='Server Host (default: 0.0.0.0)')
-    parser.add_argument('--port', type=int, default=8765, help='Server Port (default: 8765)')
+    logging.info(f"🎯 RX Node Shutdown-Anfrage von: {source}")
     
-    args = parser.parse_args()
+    node = rx_node(ctx)
+    result = run_on_node(ctx, 'shutdown', node, {'delay_minutes': delay_minutes})
+    if result['ok']:
+        logging.info(f"✅ RX Node Shutdown erfolgreich geplant ({delay_minutes} Min)")
+        status = "success"
+        message = f"RX Node Shutdown in {delay_minutes} Minute(n) geplant"
+    else:
+        error = result.get('error') or result.get('stderr')
+        logging.error(f"❌ RX Node Shutdown Fehler: {error}")
+        status = "error"
+        message = f"SSH Fehler: {error}"
     
-    # Erstelle und starte Server
-    server = HandshakeServer(host=args.host, port=args.port)
-    server.start()
+    logging.info(f"📡 RX Node Shutdown-Response gesendet an {source}")
+    return 200 if status == "success" else 500, {
+        'status': status,
+        'message': message,
+        'target': 'RX Node',
+        'target_ip': node.ip,
+        'source': source,
+        'delay_minutes': delay_minutes,
+        'timestamp': time.time()
+    }
 
-if __name__ == "__main__":
-    main()             
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ Shutdown Handler Fehler: {e}")
-            self.send_error(500, f"Shutdown Error: {e}")
+def handle_rx_node_wakeup(ctx, request_data, client_ip):
+    """Handle RX Node Wake-on-LAN Request"""
+    source = request_data.get('source', 'unknown')
+    
+    logging.info(f"🔋 RX Node Wakeup-Anfrage von: {source}")
+    
+    node = rx_node(ctx)
+    result = run_on_node(ctx, 'wakeup', node)
+    if result['ok']:
+        logging.info(f"✅ RX Node Wake-on-LAN Packet gesendet an {node.mac} ({result['method']})")
+        status = "success"
+        message = f"Wake-on-LAN Packet an RX Node gesendet ({node.mac})"
+        wol_method = result['method']
+    else:
+        logging.error(f"❌ RX Node Wake-on-LAN Fehler: {result.get('error')}")
+        status = "error"
+        message = f"Wake-on-LAN Fehler: {result.get('error')}"
+        wol_method = "failed"
+    
+    logging.info(f"📡 RX Node Wakeup-Response gesendet an {source}")
+    return 200 if status == "success" else 500, {
+        'status': status,
+        'message': message,
+        'target': 'RX Node',
+        'target_ip': node.ip,
+        'target_mac': node.mac,
+        'source': source,
+        'method': wol_method,
+        'timestamp': time.time()
+    }
+
+def handle_rx_node_status(ctx, request_data, client_ip):
+    """Handle RX Node Status Check Request (GET oder POST)"""
+    source = request_data.get('source', 'unknown')
+    
+    logging.info(f"📊 RX Node Status-Anfrage von: {source}")
+    
+    node = rx_node(ctx)
+    result = run_on_node(ctx, 'status', node)
+    if result['ok']:
+        status = "online"
+        message = "RX Node ist online und erreichbar"
+        details = {
+            'ssh_accessible': True,
+            'uptime': result['stdout']
+        }
+        logging.info(f"✅ RX Node Status: ONLINE")
+    else:
+        error = result.get('error') or result.get('stderr')
+        status = "offline"
+        message = f"RX Node nicht erreichbar: {error}"
+        details = {
+            'ssh_accessible': False,
+            'error': error
+        }
+        logging.warning(f"⚠️ RX Node Status: OFFLINE ({error})")
+    
+    logging.info(f"📡 RX Node Status-Response gesendet an {source}")
+    return 200, {
+        'status': status,
+        'message': message,
+        'target': 'RX Node',
+        'target_ip': node.ip,
+        'target_mac': node.mac,
+        'source': source,
+        'details': details,
+        'timestamp': time.time()
+    }
+
+class StreamingResponse:
+    """Payload, den die Backends als NDJSON ausliefern (eine Zeile pro Element, sobald es vorliegt)
+    
+    Nur für Admin-Handler: submit_admin ruft pump() im Admin-Thread auf, das Backend
+    liest über die Queue mit und wartet dabei nur.
+    """
     
-    def handle_bootup_request(self):
-        """Handle Remote Bootup Request (Wake-on-LAN)"""
+    _END = object()
+    
+    def __init__(self, items):
+        self.items = items
+        self._queue = queue.Queue()
+        
+    def pump(self):
         try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            request_data = json.loads(post_data.decode('utf-8')) if content_length > 0 else {}
-            
-            target_mac = request_data.get('target_mac', 'auto')
-            target_ip = request_data.get('target_ip', '192.168.68.111')
-            source = request_data.get('source', 'unknown')
-            
-            logging.info(f"🔋 Bootup-Anfrage von: {source} für {target_ip}")
-            
-            # Importiere subprocess für System-Befehle
-            import subprocess
-            
-            # Automatische MAC-Adresse ermitteln falls nicht angegeben
-            if target_mac == 'auto':
-                try:
-                    # Versuche MAC-Adresse aus ARP-Tabelle zu holen
-                    arp_result = subprocess.run(['arp', '-n', target_ip], 
-                                              capture_output=True, text=True)
-                    if arp_result.returncode == 0:
-                        lines = arp_result.stdout.strip().split('\n')
-                        for line in lines:
-                            if target_ip in line:
-                                parts = line.split()
-                                if len(parts) >= 3:
-                                    target_mac = parts[2]
-                                    break
-                except Exception as e:
-                    logging.warning(f"⚠️ MAC-Adresse Auto-Ermittlung fehlgeschlagen: {e}")
-            
-            # Fallback MAC-Adresse für M1 Mac (falls bekannt)
-            if target_mac == 'auto' or not target_mac:
-                # Hier könntest du die bekannte MAC-Adresse des M1 Mac eintragen
-                target_mac = "00:00:00:00:00:00"  # Placeholder
-                logging.warning(f"⚠️ Verwende Fallback MAC-Adresse: {target_mac}")
-            
-            # Wake-on-LAN Magic Packet senden
-            try:
-                # Verwende wakeonlan Tool (falls installiert)
-                wol_result = subprocess.run(['wakeonlan', target_mac], 
-                                          capture_output=True, text=True)
-                if wol_result.returncode == 0:
-                    logging.info(f"✅ Wake-on-LAN Packet gesendet an {target_mac}")
-                    wol_method = "wakeonlan"
-                else:
-                    raise Exception("wakeonlan nicht verfügbar")
-            except:
-                # Fallback: Python-basiertes Wake-on-LAN
-                try:
-                    import socket
-                    
-                    # MAC-Adresse formatieren
-                    mac_bytes = bytes.fromhex(target_mac.replace(':', '').replace('-', ''))
-                    
-                    # Magic Packet erstellen (6 x 0xFF + 16 x MAC-Adresse)
-                    magic_packet = b'\xff' * 6 + mac_bytes * 16
-                    
-                    # UDP-Socket erstellen und Packet senden
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                    sock.sendto(magic_packet, ('255.255.255.255', 9))
-                    sock.close()
-                    
-                    logging.info(f"✅ Python Wake-on-LAN Packet gesendet an {target_mac}")
-                    wol_method = "python"
-                except Exception as e:
-                    logging.error(f"❌ Wake-on-LAN Fehler: {e}")
-                    raise
-            
-            # Sende Erfolgs-Response
-            response = {
-                'status': 'success',
-                'message': f'Wake-on-LAN Packet gesendet an {target_mac}',
-                'target_mac': target_mac,
-                'target_ip': target_ip,
-                'source': source,
-                'method': wol_method,
-                'timestamp': time.time()
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"✅ Bootup-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
+            for item in self.items:
+                self._queue.put(item)
         except Exception as e:
-            logging.error(f"❌ Bootup Handler Fehler: {e}")
-            self.send_error(500, f"Bootup Error: {e}")
+            logging.error(f"❌ Streaming-Fehler: {e}")
+            self._queue.put({'status': 'error', 'error': str(e)})
+        finally:
+            self._queue.put(self._END)
+        
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._END:
+                return
+            yield item
     
-    def handle_rx_node_shutdown(self):
-        """Handle RX Node Remote Shutdown Request"""
-        try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            request_data = json.loads(post_data.decode('utf-8')) if content_length > 0 else {}
-            
-            source = request_data.get('source', 'unknown')
-            delay_minutes = request_data.get('delay_minutes', 1)
-            
-            logging.info(f"🎯 RX Node Shutdown-Anfrage von: {source}")
-            
-            import subprocess
-            
-            # SSH-Verbindung zur RX Node über M1 Mac (als Gateway)
-            rx_node_ip = "192.168.68.117"
-            ssh_key = "/Users/amonbaumgartner/.ssh/gentleman_key"
-            
-            # SSH-Befehl für RX Node Shutdown
-            ssh_cmd = [
-                'ssh', '-i', ssh_key, '-o', 'StrictHostKeyChecking=no',
-                '-o', 'ConnectTimeout=10', f'amo9n11@{rx_node_ip}',
-                f'sudo shutdown -h +{delay_minutes}'
-            ]
-            
+def select_cluster_nodes(ctx, requested, operation):
+    """Nodes per Name oder IP; ohne Angabe alle, außer beim Shutdown"""
+    if not requested:
+        if operation == 'shutdown':
+            raise HandlerError(400, "Shutdown braucht eine explizite Node-Liste (nodes)")
+        return list(ctx.inventory.values())
+    if isinstance(requested, str):
+        requested = [name for name in requested.split(',') if name]
+    by_ip = {node.ip: node for node in ctx.inventory.values()}
+    nodes = []
+    for name in requested:
+        node = ctx.inventory.get(name) or by_ip.get(name)
+        if node is None:
+            raise HandlerError(400, f"Unknown node: {name}")
+        nodes.append(node)
+    return nodes
+
+def cluster_results(operation, results, started):
+    ok = failed = 0
+    for result in results:
+        if result['ok']:
+            ok += 1
+        else:
+            failed += 1
+        yield result
+    logging.info(f"🛠️ Cluster-{operation}: {ok} ok, {failed} fehlgeschlagen in {time.monotonic() - started:.1f}s")
+    yield {'summary': True, 'operation': operation, 'ok': ok, 'failed': failed,
+           'duration': round(time.monotonic() - started, 3)}
+
+CLUSTER_MAX_DEADLINE = 120.0
+
+def cluster_handler(operation):
+    """Handler für /admin/cluster/<operation>
+    
+    Parameter: nodes (Namen oder IPs, Liste oder kommagetrennt), deadline (Sekunden pro Node),
+    delay_minutes (shutdown), stream (Standard: NDJSON, eine Zeile pro Node + Zusammenfassung).
+    """
+    function, default_deadline = cluster_admin.OPERATIONS[operation]
+    
+    def handle_cluster_operation(ctx, request_data, client_ip):
+        nodes = select_cluster_nodes(ctx, request_data.get('nodes'), operation)
+        # Deadline pro Node begrenzen: solange der Lauf dauert, ist ein Admin-Slot belegt
+        deadline = min(max(_float_param(request_data, 'deadline') or default_deadline, 1.0), CLUSTER_MAX_DEADLINE)
+        params = {}
+        if operation == 'shutdown':
             try:
-                result = subprocess.run(ssh_cmd, capture_output=True, text=True, timeout=15)
-                
-                if result.returncode == 0:
-                    logging.info(f"✅ RX Node Shutdown erfolgreich geplant ({delay_minutes} Min)")
-                    status = "success"
-                    message = f"RX Node Shutdown in {delay_minutes} Minute(n) geplant"
-                else:
-                    logging.error(f"❌ RX Node Shutdown Fehler: {result.stderr}")
-                    status = "error"
-                    message = f"SSH Fehler: {result.stderr}"
-                    
-            except subprocess.TimeoutExpired:
-                logging.error("❌ RX Node SSH Timeout")
-                status = "error"
-                message = "SSH Verbindung zur RX Node timeout"
-            except Exception as e:
-                logging.error(f"❌ RX Node SSH Fehler: {e}")
-                status = "error"
-                message = f"SSH Verbindungsfehler: {e}"
-            
-            # Sende Response
-            response = {
-                'status': status,
-                'message': message,
-                'target': 'RX Node',
-                'target_ip': rx_node_ip,
-                'source': source,
-                'delay_minutes': delay_minutes,
+                params['delay_minutes'] = int(request_data.get('delay_minutes', 1))
+            except (TypeError, ValueError):
+                raise HandlerError(400, "Invalid delay_minutes")
+        
+        source = request_data.get('source', client_ip)
+        logging.info(f"🛠️ Cluster-{operation} von {source} auf {', '.join(node.name for node in nodes)}")
+        results = cluster_results(operation, ctx.remote.run(nodes, function, deadline, params), time.monotonic())
+        if str(request_data.get('stream', 'true')).lower() in ('0', 'false', 'no'):
+            *node_results, summary = list(results)
+            return 200, {
+                'status': 'success' if not summary['failed'] else 'partial',
+                'operation': operation,
+                'results': node_results,
+                'summary': summary,
                 'timestamp': time.time()
             }
-            
-            self.send_response(200 if status == "success" else 500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"📡 RX Node Shutdown-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ RX Node Shutdown Handler Fehler: {e}")
-            self.send_error(500, f"RX Node Shutdown Error: {e}")
+        return 200, StreamingResponse(results)
+    
+    handle_cluster_operation.__name__ = f'handle_cluster_{operation}'
+    return handle_cluster_operation
+
+# 🗺️ Dispatch-Tabelle: (Methode, Pfad) -> (Handler, Admin-Operation?)
+ROUTES = {
+    ('POST', '/handshake'): (handle_handshake, False),
+    ('GET', '/status'): (handle_status_request, False),
+    ('GET', '/nodes'): (handle_nodes_request, False),
+    ('GET', '/health'): (handle_health_check, False),
+    ('GET', '/metrics/range'): (handle_metrics_range, False),
+    ('GET', '/metrics/aggregate'): (handle_metrics_aggregate, False),
+    ('POST', '/admin/shutdown'): (handle_shutdown_request, True),
+    ('POST', '/admin/bootup'): (handle_bootup_request, True),
+    ('POST', '/admin/rx-node/shutdown'): (handle_rx_node_shutdown, True),
+    ('POST', '/admin/rx-node/wakeup'): (handle_rx_node_wakeup, True),
+    ('POST', '/admin/rx-node/status'): (handle_rx_node_status, True),
+    ('GET', '/admin/rx-node/status'): (handle_rx_node_status, True),
+}
+for _operation in cluster_admin.OPERATIONS:
+    ROUTES[('POST', f'/admin/cluster/{_operation}')] = (cluster_handler(_operation), True)
+ROUTES[('GET', '/admin/cluster/status')] = ROUTES[('POST', '/admin/cluster/status')]
+
+# Heartbeat-Pfade kompakt, alles andere lesbar formatiert
+COMPACT_PATHS = {'/handshake', '/health'}
+
+def parse_request_body(body, query=None):
+    """JSON-Body; Query-Parameter (GET) ergänzen, was der Body nicht setzt"""
+    data = json.loads(body.decode('utf-8')) if body else {}
+    if not isinstance(data, dict):
+        raise HandlerError(400, "JSON object expected")
+    if query:
+        data = {**dict(query), **data}
+    return data
+
+def encode_response(path, payload):
+    indent = None if path in COMPACT_PATHS else 2
+    return json.dumps(payload, indent=indent).encode('utf-8')
+
+def run_handler(ctx, handler, data, client_ip):
+    try:
+        return handler(ctx, data, client_ip)
+    except HandlerError as e:
+        return e.status, {'status': 'error', 'error': e.message}
+    except Exception as e:
+        logging.error(f"❌ Handler Fehler ({handler.__name__}): {e}")
+        return 500, {'status': 'error', 'error': f"Server Error: {e}"}
+
+ADMIN_BUSY = (503, {'status': 'error', 'error': 'Admin-Operationen ausgelastet, später erneut versuchen'})
+
+def dispatch_blocking(ctx, method, path, body, client_ip, admin_timeout, query=None):
+    """Thread-Backend: Admin-Operationen laufen im Admin-Executor, der Worker wartet nur auf das Ergebnis"""
+    route = ROUTES.get((method, path))
+    if route is None:
+        return 404, {'status': 'error', 'error': 'Endpoint not found'}
+    handler, is_admin = route
+    try:
+        data = parse_request_body(body, query)
+    except (ValueError, UnicodeDecodeError):
+        return 400, {'status': 'error', 'error': 'Invalid JSON'}
+    except HandlerError as e:
+        return e.status, {'status': 'error', 'error': e.message}
+    
+    if not is_admin:
+        return run_handler(ctx, handler, data, client_ip)
+    future = ctx.submit_admin(handler, data, client_ip)
+    if future is None:
+        return ADMIN_BUSY
+    try:
+        return future.result(timeout=admin_timeout)
+    except FutureTimeout:
+        return 504, {'status': 'error', 'error': 'Admin-Operation läuft noch im Hintergrund'}
+
+# 🧵 Fallback-Backend: HTTPServer mit begrenztem Worker-Pool
+class PooledHTTPServer(HTTPServer):
+    """Wie ThreadingHTTPServer, aber mit fester Anzahl Worker-Threads
+    
+    Ein Worker gehört einer Verbindung nur für die Dauer eines Requests: danach
+    wartet die Keep-Alive-Verbindung in einem Selector auf den nächsten Request
+    und belegt keinen Worker. Nach keepalive_timeout ohne Request wird sie geschlossen.
+    """
     
-    def handle_rx_node_wakeup(self):
-        """Handle RX Node Wake-on-LAN Request"""
+    daemon_threads = True
+    
+    def __init__(self, server_address, handler_class, workers=16, keepalive_timeout=30.0):
+        super().__init__(server_address, handler_class)
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http')
+        self.keepalive_timeout = keepalive_timeout
+        self._selector = selectors.DefaultSelector()
+        self._parking = []
+        self._parking_lock = threading.Lock()
+        self._closed = False
+        # Aufwecken des Selectors, wenn ein Worker eine Verbindung zurückgibt
+        self._wakeup, self._wakeup_send = socket.socketpair()
+        self._wakeup.setblocking(False)
+        self._selector.register(self._wakeup, selectors.EVENT_READ)
+        self._idle_thread = threading.Thread(target=self.watch_idle, name='http-idle', daemon=True)
+        self._idle_thread.start()
+        
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+        
+    def process_request_thread(self, request, client_address):
+        keep_alive = False
         try:
-            # Lese Request Body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
-            # Parse JSON
-            request_data = json.loads(post_data.decode('utf-8')) if content_length > 0 else {}
-            
-            source = request_data.get('source', 'unknown')
-            
-            logging.info(f"🔋 RX Node Wakeup-Anfrage von: {source}")
-            
-            import subprocess
-            import socket
-            
-            # RX Node Details
-            rx_node_ip = "192.168.68.117"
-            rx_node_mac = "30:9c:23:5f:44:a8"  # Bekannte MAC-Adresse der RX Node
-            
-            try:
-                # Wake-on-LAN Magic Packet senden
-                try:
-                    # Verwende wakeonlan Tool (falls installiert)
-                    wol_result = subprocess.run(['wakeonlan', rx_node_mac], 
-                                              capture_output=True, text=True)
-                    if wol_result.returncode == 0:
-                        logging.info(f"✅ RX Node Wake-on-LAN Packet gesendet an {rx_node_mac}")
-                        wol_method = "wakeonlan"
-                    else:
-                        raise Exception("wakeonlan nicht verfügbar")
-                except:
-                    # Fallback: Python-basiertes Wake-on-LAN
-                    mac_bytes = bytes.fromhex(rx_node_mac.replace(':', ''))
-                    magic_packet = b'\xff' * 6 + mac_bytes * 16
-                    
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-                    sock.sendto(magic_packet, ('255.255.255.255', 9))
-                    sock.close()
-                    
-                    logging.info(f"✅ RX Node Python Wake-on-LAN Packet gesendet an {rx_node_mac}")
-                    wol_method = "python"
-                
-                status = "success"
-                message = f"Wake-on-LAN Packet an RX Node gesendet ({rx_node_mac})"
-                
-            except Exception as e:
-                logging.error(f"❌ RX Node Wake-on-LAN Fehler: {e}")
-                status = "error"
-                message = f"Wake-on-LAN Fehler: {e}"
-                wol_method = "failed"
-            
-            # Sende Response
-            response = {
-                'status': status,
-                'message': message,
-                'target': 'RX Node',
-                'target_ip': rx_node_ip,
-                'target_mac': rx_node_mac,
-                'source': source,
-                'method': wol_method,
-                'timestamp': time.time()
-            }
-            
-            self.send_response(200 if status == "success" else 500)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-            
-            logging.info(f"📡 RX Node Wakeup-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ RX Node Wakeup Handler Fehler: {e}")
-            self.send_error(500, f"RX Node Wakeup Error: {e}")
+            keep_alive = self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            if keep_alive and not self._closed:
+                self.park(request, client_address)
+            else:
+                self.shutdown_request(request)
+    
+    def finish_request(self, request, client_address):
+        """Beantworte anstehende Requests; True, wenn die Verbindung offen bleiben soll"""
+        handler = self.RequestHandlerClass(request, client_address, self)
+        return getattr(handler, 'keep_alive', False)
     
-    def handle_rx_node_status(self):
-        """Handle RX Node Status Check Request"""
+    def park(self, request, client_address):
+        with self._parking_lock:
+            self._parking.append((request, client_address))
         try:
-            # Kann sowohl GET als auch POST sein
-            source = "unknown"
-            if self.command == "POST":
-                content_length = int(self.headers.get('Content-Length', 0))
-                if content_length > 0:
-                    post_data = self.rfile.read(content_length)
-                    request_data = json.loads(post_data.decode('utf-8'))
-                    source = request_data.get('source', 'unknown')
-            
-            logging.info(f"📊 RX Node Status-Anfrage von: {source}")
-            
-            import subprocess
-            
-            # RX Node Details
-            rx_node_ip = "192.168.68.117"
-            rx_node_mac = "30:9c:23:5f:44:a8"
-            ssh_key = "/Users/amonbaumgartner/.ssh/gentleman_key"
-            
-            # Teste SSH-Verbindung zur RX Node mit kurzen Timeouts
-            ssh_cmd = [
-                'ssh', '-i', ssh_key, '-o', 'StrictHostKeyChecking=no',
-                '-o', 'ConnectTimeout=3', '-o', 'ServerAliveInterval=2',
-                '-o', 'ServerAliveCountMax=1', f'amo9n11@{rx_node_ip}',
-                'uptime && hostname && whoami'
-            ]
-            
+            self._wakeup_send.send(b'\0')
+        except OSError:
+            pass
+    
+    def watch_idle(self):
+        """Gibt lesbare Keep-Alive-Verbindungen an den Pool, schließt abgelaufene"""
+        while not self._closed:
             try:
-                result = subprocess.run(ssh_cmd, capture_output=True, text=True, timeout=5)
-                
-                if result.returncode == 0:
-                    # RX Node ist online
-                    uptime_info = result.stdout.strip()
-                    status = "online"
-                    message = "RX Node ist online und erreichbar"
-                    details = {
-                        'ssh_accessible': True,
-                        'uptime': uptime_info
-                    }
-                    logging.info(f"✅ RX Node Status: ONLINE")
-                else:
-                    # SSH-Fehler
-                    status = "offline"
-                    message = f"RX Node SSH Fehler: {result.stderr}"
-                    details = {
-                        'ssh_accessible': False,
-                        'error': result.stderr
-                    }
-                    logging.warning(f"⚠️ RX Node Status: SSH FEHLER")
-                    
-            except subprocess.TimeoutExpired:
-                status = "offline"
-                message = "RX Node SSH Timeout - möglicherweise offline"
-                details = {
-                    'ssh_accessible': False,
-                    'error': 'SSH Timeout'
-                }
-                logging.warning(f"⚠️ RX Node Status: TIMEOUT")
-            except Exception as e:
-                status = "offline"
-                message = f"RX Node Verbindungsfehler: {e}"
-                details = {
-                    'ssh_accessible': False,
-                    'error': str(e)
-                }
-                logging.error(f"❌ RX Node Status Fehler: {e}")
-            
-            # Sende Response
-            response = {
-                'status': status,
-                'message': message,
-                'target': 'RX Node',
-                'target_ip': rx_node_ip,
-                'target_mac': rx_node_mac,
-                'source': source,
-                'details': details,
-                'timestamp': time.time()
-            }
-            
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(response, indent=2).encode('utf-8'))
-            
-            logging.info(f"📡 RX Node Status-Response gesendet an {source}")
-            
-        except json.JSONDecodeError:
-            self.send_error(400, "Invalid JSON")
-        except Exception as e:
-            logging.error(f"❌ RX Node Status Handler Fehler: {e}")
-            self.send_error(500, f"RX Node Status Error: {e}")
+                events = self._selector.select(timeout=1.0)
+            except (OSError, ValueError):
+                return
+            now = time.monotonic()
+            for key, _ in events:
+                if key.fileobj is self._wakeup:
+                    try:
+                        self._wakeup.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                self.pool.submit(self.process_request_thread, key.fileobj, key.data[0])
+            with self._parking_lock:
+                parking, self._parking = self._parking, []
+            for request, client_address in parking:
+                self._selector.register(request, selectors.EVENT_READ, (client_address, now))
+            for key in list(self._selector.get_map().values()):
+                if key.data and now - key.data[1] > self.keepalive_timeout:
+                    self._selector.unregister(key.fileobj)
+                    self.shutdown_request(key.fileobj)
+            
+    def server_close(self):
+        super().server_close()
+        self._closed = True
+        self._idle_thread.join(timeout=2)
+        for key in list(self._selector.get_map().values()):
+            if key.data:
+                self.shutdown_request(key.fileobj)
+        self._selector.close()
+        self._wakeup.close()
+        self._wakeup_send.close()
+        self.pool.shutdown(wait=False)
+
+class HandshakeHandler(BaseHTTPRequestHandler):
+    """Dünne HTTP-Schicht über der Dispatch-Tabelle"""
+    
+    protocol_version = 'HTTP/1.1'
+    # Obergrenze je Request; zwischen Requests wartet die Verbindung im Selector des Servers
+    timeout = 10
+    keep_alive = False
+    
+    def handle(self):
+        """Requests, solange schon Daten der Verbindung vorliegen; danach zurück an den Server"""
+        self.handle_one_request()
+        while not self.close_connection and self.pending():
+            self.handle_one_request()
+        self.keep_alive = not self.close_connection
+    
+    def pending(self):
+        """Liegt ein weiterer (gepipelineter) Request im Puffer oder Socket?"""
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+    
+    def do_POST(self):
+        self.dispatch()
+    
+    def do_GET(self):
+        self.dispatch()
+        
+    def dispatch(self):
+        url = urlparse(self.path)
+        path = url.path
+        content_length = int(self.headers.get('Content-Length', 0) or 0)
+        body = self.rfile.read(content_length) if content_length > 0 else b''
+        
+        status, payload = dispatch_blocking(self.server.ctx, self.command, path, body,
+                                            self.client_address[0], self.server.admin_timeout,
+                                            parse_qsl(url.query))
+        if isinstance(payload, StreamingResponse):
+            self.stream(status, payload)
+            return
+        data = encode_response(path, payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def stream(self, status, payload):
+        """NDJSON, chunked bei HTTP/1.1; HTTP/1.0-Clients lesen bis Verbindungsende"""
+        chunked = self.request_version == 'HTTP/1.1'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        self.end_headers()
+        for item in payload:
+            line = json.dumps(item).encode('utf-8') + b'\n'
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line) if chunked else line)
+            self.wfile.flush()
+        if chunked:
+            self.wfile.write(b'0\r\n\r\n')
     
     def log_message(self, format, *args):
         """Überschreibe Standard-Logging"""
         logging.info(f"🌐 {self.address_string()} - {format % args}")
 
+# ⚡ Async-Backend (aiohttp, falls installiert)
+def create_aiohttp_app(ctx, admin_timeout):
+    from aiohttp import web
+    
+    async def dispatch(request):
+        path = request.path
+        route = ROUTES.get((request.method, path))
+        if route is None:
+            status, payload = 404, {'status': 'error', 'error': 'Endpoint not found'}
+        else:
+            handler, is_admin = route
+            try:
+                data = parse_request_body(await request.read(), request.query)
+            except (ValueError, UnicodeDecodeError):
+                data, status, payload = None, 400, {'status': 'error', 'error': 'Invalid JSON'}
+            except HandlerError as e:
+                data, status, payload = None, e.status, {'status': 'error', 'error': e.message}
+            
+            if data is not None and not is_admin:
+                status, payload = run_handler(ctx, handler, data, request.remote)
+            elif data is not None:
+                future = ctx.submit_admin(handler, data, request.remote)
+                if future is None:
+                    status, payload = ADMIN_BUSY
+                else:
+                    try:
+                        status, payload = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                                                 timeout=admin_timeout)
+                    except asyncio.TimeoutError:
+                        status, payload = 504, {'status': 'error', 'error': 'Admin-Operation läuft noch im Hintergrund'}
+        
+        if isinstance(payload, StreamingResponse):
+            response = web.StreamResponse(status=status, headers={'Content-Type': 'application/x-ndjson'})
+            await response.prepare(request)
+            # Der Iterator wartet auf Ergebnisse der Nodes, also nicht im Event-Loop ziehen
+            loop = asyncio.get_running_loop()
+            items = iter(payload)
+            while True:
+                item = await loop.run_in_executor(None, next, items, None)
+                if item is None:
+                    break
+                await response.write(json.dumps(item).encode('utf-8') + b'\n')
+            await response.write_eof()
+            return response
+        return web.Response(body=encode_response(path, payload), status=status, content_type='application/json')
+    
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', dispatch)
+    return app
+
+def aiohttp_available():
+    try:
+        import aiohttp  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
 class HandshakeServer:
     """Main Handshake Server Class"""
     
-    def __init__(self, host='0.0.0.0', port=8765):
+    def __init__(self, host='0.0.0.0', port=8765, coordinator_url=None, backend='auto',
+                 workers=16, admin_workers=2, admin_timeout=60.0, state_dir=None,
+                 udp_port=heartbeat_udp.DEFAULT_PORT):
         self.host = host
         self.port = port
-        self.node_registry = NodeRegistry()
+        self.udp_port = udp_port
+        self.journal = None
+        if state_dir:
+            try:
+                self.journal = RegistryJournal(state_dir)
+            except OSError as e:
+                logging.warning(f"⚠️ Registry-Persistenz deaktiviert ({state_dir}): {e}")
+        self.node_registry = NodeRegistry(journal=self.journal)
+        self.forwarder = CoordinatorForwarder(coordinator_url) if coordinator_url else None
+        self.ctx = ServerContext(self.node_registry, self.forwarder, admin_workers)
+        # Metrik-Zeitreihen liegen neben WAL und Snapshot, ohne state_dir nur im Speicher
+        self.metrics = node_metrics.MetricsStore(self.journal.state_dir / 'metrics.bin' if self.journal else None)
+        restored = self.metrics.load()
+        if restored:
+            logging.info(f"📈 Metriken von {restored} Nodes wiederhergestellt")
+        self.ctx.metrics = self.metrics
+        self.backend = backend
+        self.workers = workers
+        self.admin_timeout = admin_timeout
         self.server = None
         
     def start(self):
         """Starte den Handshake Server"""
+        backend = self.backend
+        if backend == 'auto':
+            backend = 'aiohttp' if aiohttp_available() else 'threads'
         try:
-            # Erstelle HTTP Server
-            self.server = HTTPServer((self.host, self.port), HandshakeHandler)
-            self.server.node_registry = self.node_registry
+            if self.forwarder:
+                self.forwarder.start()
+            if self.udp_port:
+                keyring = heartbeat_udp.KeyRing().load()
+                if keyring.keys:
+                    self.ctx.heartbeat_listener = HeartbeatListener(self.ctx, self.host, self.udp_port, keyring)
+                    self.ctx.heartbeat_listener.start()
+                else:
+                    logging.warning(f"⚠️ UDP Heartbeats deaktiviert: kein heartbeat_key in {keyring.path}")
             
-            logging.info(f"🚀 Handshake Server gestartet auf {self.host}:{self.port}")
+            logging.info(f"🚀 Handshake Server gestartet auf {self.host}:{self.port} ({backend})")
             logging.info(f"📡 Endpoints verfügbar:")
             logging.info(f"   POST /handshake               - Node Registrierung")
             logging.info(f"   GET  /status                  - Cluster Status")
             logging.info(f"   GET  /nodes                   - Aktive Nodes")
             logging.info(f"   GET  /health                  - Health Check")
+            logging.info(f"   GET  /metrics/range           - Zeitreihe eines Nodes")
+            logging.info(f"   GET  /metrics/aggregate       - Aggregate über alle Nodes")
             logging.info(f"   POST /admin/shutdown          - M1 Mac Remote Shutdown")
             logging.info(f"   POST /admin/bootup            - M1 Mac Remote Bootup (Wake-on-LAN)")
             logging.info(f"   POST /admin/rx-node/shutdown  - RX Node Remote Shutdown")
             logging.info(f"   POST /admin/rx-node/wakeup    - RX Node Wake-on-LAN")
             logging.info(f"   GET  /admin/rx-node/status    - RX Node Status Check")
+            logging.info(f"   POST /admin/cluster/<op>      - status/wakeup/shutdown parallel auf mehreren Nodes "
+                         f"({len(self.ctx.inventory)} im Inventar)")
             
             # Starte Status Monitor Thread
             status_thread = threading.Thread(target=self.status_monitor, daemon=True)
             status_thread.start()
             
             # Starte Server
-            self.server.serve_forever()
+            if backend == 'aiohttp':
+                from aiohttp import web
+                web.run_app(create_aiohttp_app(self.ctx, self.admin_timeout), host=self.host, port=self.port,
+                            print=None, access_log=None)
+            else:
+                self.server = PooledHTTPServer((self.host, self.port), HandshakeHandler, workers=self.workers)
+                self.server.ctx = self.ctx
+                self.server.admin_timeout = self.admin_timeout
+                self.server.serve_forever()
             
         except KeyboardInterrupt:
             logging.info("🛑 Server durch Benutzer gestoppt")
@@ -1102,26 +1426,42 @@ class HandshakeServer:
             logging.error(f"❌ Server Fehler: {e}")
         finally:
             if self.server:
-                self.server.shutdown()
-                logging.info("✅ Server heruntergefahren")
+                self.server.server_close()
+            self.ctx.admin_executor.shutdown(wait=False)
+            self.ctx.remote.close()
+            if self.ctx.heartbeat_listener:
+                self.ctx.heartbeat_listener.close()
+            self.save_metrics()
+            if self.journal:
+                self.journal.close()
+            logging.info("✅ Server heruntergefahren")
+    
+    def save_metrics(self):
+        try:
+            self.metrics.save()
+        except OSError as e:
+            logging.warning(f"⚠️ Metriken konnten nicht gespeichert werden: {e}")
     
     def status_monitor(self):
         """Überwache Cluster Status"""
+        ticks = 0
         while True:
             try:
                 time.sleep(60)  # Alle 60 Sekunden
-                status = self.node_registry.get_cluster_summary()
+                ticks += 1
+                if ticks % 5 == 0:
+                    self.save_metrics()
+                self.node_registry.sweep()
+                status = self.node_registry.get_cluster_summary(include_nodes=False)
                 logging.info(f"📊 Cluster Status: {status['active_nodes']}/{status['total_nodes']} Nodes aktiv")
                 
-                # Log inactive nodes
-                all_nodes = self.node_registry.nodes
-                active_nodes = status['nodes']
+                if self.ctx.heartbeat_listener:
+                    logging.info(f"💓 UDP Heartbeats: {self.ctx.heartbeat_listener.stats}")
                 
-                for node_id in all_nodes:
-                    if node_id not in active_nodes:
-                        last_seen = all_nodes[node_id]['last_seen']
-                        offline_minutes = (time.time() - last_seen) / 60
-                        logging.warning(f"⚠️ Node '{node_id}' offline seit {offline_minutes:.1f} Minuten")
+                # Log inactive nodes
+                for node_id, last_seen in self.node_registry.get_inactive_nodes().items():
+                    offline_minutes = (time.time() - last_seen) / 60
+                    logging.warning(f"⚠️ Node '{node_id}' offline seit {offline_minutes:.1f} Minuten")
                         
             except Exception as e:
                 logging.error(f"❌ Status Monitor Fehler: {e}")
@@ -1133,11 +1473,27 @@ def main():
     parser = argparse.ArgumentParser(description='GENTLEMAN M1 Handshake Server')
     parser.add_argument('--host', default='0.0.0.0', help='Server Host (default: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=8765, help='Server Port (default: 8765)')
+    parser.add_argument('--coordinator-url', default=os.getenv('MESH_COORDINATOR_URL'),
+                        help='Mesh Coordinator für Announcements (default: $MESH_COORDINATOR_URL)')
+    parser.add_argument('--backend', choices=['auto', 'aiohttp', 'threads'], default='auto',
+                        help='HTTP Backend (default: aiohttp falls installiert, sonst Thread-Pool)')
+    parser.add_argument('--workers', type=int, default=16, help='Worker-Threads des Thread-Backends (default: 16)')
+    parser.add_argument('--admin-workers', type=int, default=2,
+                        help='Gleichzeitige Admin-Operationen (default: 2)')
+    parser.add_argument('--state-dir', default=os.getenv('GENTLEMAN_STATE_DIR', '~/.gentleman/handshake'),
+                        help='Verzeichnis für Registry-WAL und Snapshot, leer = nur im Speicher '
+                             '(default: $GENTLEMAN_STATE_DIR oder ~/.gentleman/handshake)')
+    parser.add_argument('--udp-port', type=int, default=heartbeat_udp.DEFAULT_PORT,
+                        help=f'Port für UDP Heartbeats, 0 = aus (default: {heartbeat_udp.DEFAULT_PORT}; '
+                             f'Schlüssel aus $GENTLEMAN_API_KEYS oder api_keys.json)')
     
     args = parser.parse_args()
     
     # Erstelle und starte Server
-    server = HandshakeServer(host=args.host, port=args.port)
+    server = HandshakeServer(host=args.host, port=args.port, coordinator_url=args.coordinator_url,
+                             backend=args.backend, workers=args.workers, admin_workers=args.admin_workers,
+                             state_dir=args.state_dir, udp_port=args.udp_port)
     server.start()
 
 if __name__ == "__main__":
+    main()
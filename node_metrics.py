@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+GENTLEMAN Cluster - Node Metrics Store
+Zeitreihen der Messwerte aus den Handshakes (Load, Speicher, Festplatte) pro Node
+
+Pro Node spaltenweise Ringpuffer fester Größe (array('d') je Spalte) in drei Stufen:
+    raw  jeder HTTP-Handshake             2880 Werte (~1 Tag bei 30 s)
+    5m   Mittel/Maximum je 5 Minuten      2016 Werte (7 Tage)
+    1h   Mittel/Maximum je Stunde         2160 Werte (90 Tage)
+Fehlende Werte sind NaN und werden in JSON zu null.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import threading
+from array import array
+from pathlib import Path
+
+METRICS = ('load_1m', 'memory_percent', 'disk_percent')
+COLUMNS = ('ts',) + tuple(f"{metric}_{kind}" for metric in METRICS for kind in ('avg', 'max'))
+
+# (Name, Auflösung in Sekunden, Kapazität); Auflösung 0 = jeder Messwert
+TIERS = (('raw', 0, 2880), ('5m', 300, 2016), ('1h', 3600, 2160))
+
+NAN = float('nan')
+
+def extract_sample(system_info):
+    """Messwerte aus system_info eines Handshakes; ältere Clients liefern Speicher nur als Text"""
+    if not isinstance(system_info, dict):
+        return None
+
+    def number(value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return NAN
+
+    load = system_info.get('load_average')
+    memory = system_info.get('memory_usage')
+    disk = system_info.get('disk_usage')
+    values = (
+        number(load[0]) if isinstance(load, (list, tuple)) and load else NAN,
+        number(memory.get('usage_percent')) if isinstance(memory, dict) else NAN,
+        number(disk.get('usage_percent')) if isinstance(disk, dict) else NAN
+    )
+    if all(math.isnan(value) for value in values):
+        return None
+    return values
+
+def to_json(value):
+    return None if math.isnan(value) else round(value, 3)
+
+class Ring:
+    """Spaltenweiser Ringpuffer; Zeilen liegen in Einfügereihenfolge (ts aufsteigend)"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = {column: array('d', bytes(8 * capacity)) for column in COLUMNS}
+        self.head = 0
+        self.size = 0
+
+    def append(self, row):
+        for column, value in zip(COLUMNS, row):
+            self.columns[column][self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def _slot(self, position):
+        return (self.head - self.size + position) % self.capacity
+
+    def oldest(self):
+        return self.columns['ts'][self._slot(0)] if self.size else None
+
+    def covers(self, start):
+        # Solange der Puffer nicht voll ist, reicht er bis zum ersten Messwert zurück
+        return self.size < self.capacity or self.oldest() <= start
+
+    def _first_at_or_after(self, ts):
+        timestamps = self.columns['ts']
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if timestamps[self._slot(middle)] < ts:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def select(self, start, end, columns):
+        """Zeilen mit start <= ts <= end, nur die angefragten Spalten"""
+        data = [self.columns[column] for column in columns]
+        timestamps = self.columns['ts']
+        rows = []
+        for position in range(self._first_at_or_after(start), self.size):
+            slot = self._slot(position)
+            if timestamps[slot] > end:
+                break
+            rows.append([values[slot] for values in data])
+        return rows
+
+class Bucket:
+    """Offenes Zeitfenster einer Verdichtungsstufe"""
+
+    __slots__ = ('start', 'count', 'sums', 'maxima')
+
+    def __init__(self, start):
+        self.start = start
+        self.count = [0] * len(METRICS)
+        self.sums = [0.0] * len(METRICS)
+        self.maxima = [NAN] * len(METRICS)
+
+    def add(self, values):
+        for index, value in enumerate(values):
+            if math.isnan(value):
+                continue
+            self.count[index] += 1
+            self.sums[index] += value
+            if math.isnan(self.maxima[index]) or value > self.maxima[index]:
+                self.maxima[index] = value
+
+    def row(self):
+        row = [self.start]
+        for index in range(len(METRICS)):
+            row.append(self.sums[index] / self.count[index] if self.count[index] else NAN)
+            row.append(self.maxima[index])
+        return row
+
+    def to_dict(self):
+        return {'start': self.start, 'count': self.count, 'sums': self.sums,
+                'maxima': [to_json(value) for value in self.maxima]}
+
+    @classmethod
+    def from_dict(cls, data):
+        bucket = cls(data['start'])
+        bucket.count = list(data['count'])
+        bucket.sums = list(data['sums'])
+        bucket.maxima = [NAN if value is None else value for value in data['maxima']]
+        return bucket
+
+class NodeSeries:
+    """Alle Stufen eines Nodes; jeder Messwert geht in raw und in die offenen Fenster der Verdichtungsstufen"""
+
+    def __init__(self):
+        self.rings = {name: Ring(capacity) for name, _, capacity in TIERS}
+        self.buckets = {name: None for name, resolution, _ in TIERS if resolution}
+        self.last_ts = 0.0
+
+    def add(self, ts, values):
+        if ts <= self.last_ts:
+            return False
+        self.last_ts = ts
+        raw = [ts]
+        for value in values:
+            raw.extend((value, value))
+        self.rings['raw'].append(raw)
+        for name, resolution, _ in TIERS:
+            if not resolution:
+                continue
+            start = ts - ts % resolution
+            bucket = self.buckets[name]
+            if bucket is not None and bucket.start != start:
+                self.rings[name].append(bucket.row())
+                bucket = None
+            if bucket is None:
+                bucket = self.buckets[name] = Bucket(start)
+            bucket.add(values)
+        return True
+
+    def choose_tier(self, start, step=None):
+        """Feinste Stufe, die bis start zurückreicht; mit step die gröbste, die noch fein genug ist"""
+        covering = [(name, resolution) for name, resolution, _ in TIERS if self.rings[name].covers(start)]
+        if not covering:
+            return TIERS[-1][0], TIERS[-1][1]
+        if step:
+            fine_enough = [tier for tier in covering if tier[1] <= step]
+            if fine_enough:
+                return fine_enough[-1]
+        return covering[0]
+
+    def select(self, tier, start, end, columns):
+        rows = self.rings[tier].select(start, end, columns)
+        bucket = self.buckets.get(tier)
+        if bucket is not None and start <= bucket.start <= end:
+            # Laufendes Fenster mitliefern, damit die Stufe nicht bis zu einer Stunde hinterherhinkt
+            row = dict(zip(COLUMNS, bucket.row()))
+            rows.append([row[column] for column in columns])
+        return rows
+
+class MetricsStore:
+    """Zeitreihen aller Nodes mit Bereichsabfragen und Aggregaten"""
+
+    def __init__(self, path=None):
+        self.path = Path(path).expanduser() if path else None
+        self._series = {}
+        self._lock = threading.Lock()
+        self.samples = 0
+
+    def record(self, node_id, system_info, ts=None):
+        values = extract_sample(system_info)
+        if values is None or not node_id:
+            return False
+        with self._lock:
+            series = self._series.get(node_id)
+            if series is None:
+                series = self._series[node_id] = NodeSeries()
+            added = series.add(ts or time.time(), values)
+            if added:
+                self.samples += 1
+        return added
+
+    def nodes(self):
+        with self._lock:
+            return sorted(self._series)
+
+    def query(self, node_id, metrics=METRICS, start=None, end=None, step=None):
+        """Punkte [ts, avg, max] je Metrik aus der passenden Stufe, oder None für unbekannte Nodes"""
+        end = end or time.time()
+        start = start if start is not None else end - 3600
+        columns = ['ts'] + [f"{metric}_{kind}" for metric in metrics for kind in ('avg', 'max')]
+        with self._lock:
+            series = self._series.get(node_id)
+            if series is None:
+                return None
+            tier, resolution = series.choose_tier(start, step)
+            rows = series.select(tier, start, end, columns)
+        return {
+            'node_id': node_id,
+            'tier': tier,
+            'resolution': resolution,
+            'start': start,
+            'end': end,
+            'series': {
+                metric: [[row[0], to_json(row[1 + 2 * index]), to_json(row[2 + 2 * index])] for row in rows]
+                for index, metric in enumerate(metrics)
+            }
+        }
+
+    def aggregate(self, metric, start=None, end=None, node_ids=None):
+        """min/avg/max/p95 je Node über den Zeitraum plus Summen für die Kapazitätsplanung"""
+        end = end or time.time()
+        start = start if start is not None else end - 86400
+        per_node = {}
+        for node_id in node_ids or self.nodes():
+            result = self.query(node_id, (metric,), start, end)
+            if result is None:
+                continue
+            points = result['series'][metric]
+            averages = sorted(point[1] for point in points if point[1] is not None)
+            maxima = [point[2] for point in points if point[2] is not None]
+            if not averages:
+                continue
+            per_node[node_id] = {
+                'samples': len(averages),
+                'tier': result['tier'],
+                'min': round(averages[0], 3),
+                'avg': round(sum(averages) / len(averages), 3),
+                'p95': round(averages[min(len(averages) - 1, int(math.ceil(0.95 * len(averages))) - 1)], 3),
+                'max': round(max(maxima), 3) if maxima else None
+            }
+        cluster = None
+        if per_node:
+            cluster = {
+                'nodes': len(per_node),
+                'avg': round(sum(entry['avg'] for entry in per_node.values()) / len(per_node), 3),
+                'sum_avg': round(sum(entry['avg'] for entry in per_node.values()), 3),
+                'max': max((entry['max'] for entry in per_node.values() if entry['max'] is not None), default=None)
+            }
+        return {'metric': metric, 'start': start, 'end': end, 'nodes': per_node, 'cluster': cluster}
+
+    # 💾 Persistenz: JSON-Kopfzeile, danach die Spalten als Rohbytes
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            header = {'version': 1, 'tiers': [list(tier) for tier in TIERS], 'columns': list(COLUMNS), 'series': []}
+            blobs = []
+            for node_id, series in self._series.items():
+                header['series'].append({
+                    'node_id': node_id,
+                    'last_ts': series.last_ts,
+                    'rings': {name: [ring.head, ring.size] for name, ring in series.rings.items()},
+                    'buckets': {name: bucket.to_dict() for name, bucket in series.buckets.items() if bucket}
+                })
+                for name, _, _ in TIERS:
+                    for column in COLUMNS:
+                        blobs.append(series.rings[name].columns[column].tobytes())
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as tmp:
+            tmp.write(json.dumps(header, separators=(',', ':')).encode('utf-8') + b'\n')
+            for blob in blobs:
+                tmp.write(blob)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            with open(self.path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('tiers') != [list(tier) for tier in TIERS] or header.get('columns') != list(COLUMNS):
+                    logging.warning("⚠️ Metrik-Datei mit anderer Stufen-Konfiguration, beginne leer")
+                    return 0
+                loaded = {}
+                for entry in header['series']:
+                    series = NodeSeries()
+                    series.last_ts = entry['last_ts']
+                    for name, _, capacity in TIERS:
+                        ring = series.rings[name]
+                        ring.head, ring.size = entry['rings'][name]
+                        for column in COLUMNS:
+                            values = array('d')
+                            values.frombytes(f.read(8 * capacity))
+                            if len(values) != capacity:
+                                raise ValueError("truncated")
+                            ring.columns[column] = values
+                    for name, data in entry['buckets'].items():
+                        series.buckets[name] = Bucket.from_dict(data)
+                    loaded[entry['node_id']] = series
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"⚠️ Metrik-Datei {self.path} nicht lesbar, beginne leer: {e}")
+            return 0
+        with self._lock:
+            self._series = loaded
+        return len(loaded)
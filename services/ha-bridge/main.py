@@ -214,7 +214,8 @@ class GentlemanHABridge:
             # Publiziere zu TTS Topic
             tts_payload = {
                 "text": text,
-                "voice": "neural_german_female",
+                "voice": "default",
+                "language": "de",
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -9,13 +9,15 @@ import os
 import sys
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from typing import AsyncIterator, Dict, List, Optional, Any
 from datetime import datetime
 import json
 
 import torch
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
@@ -62,7 +64,8 @@ class GentlemanState:
             "requests_failed": 0,
             "average_response_time": 0.0,
             "gpu_utilization": 0.0,
-            "memory_usage": 0.0
+            "memory_usage": 0.0,
+            "in_flight": 0
         }
 
 state = GentlemanState()
@@ -181,18 +184,35 @@ async def generate_text(request: LLMRequest, background_tasks: BackgroundTasks):
         if torch.cuda.is_available():
             inputs = inputs.cuda()
         
-        # Generate response
-        with torch.no_grad():
-            outputs = state.model.generate(
-                inputs,
-                max_new_tokens=request.max_tokens,
-                temperature=request.temperature,
-                top_p=request.top_p,
-                do_sample=True,
-                pad_token_id=state.tokenizer.eos_token_id,
-                attention_mask=torch.ones_like(inputs)
+        if request.stream:
+            # Tokens als NDJSON, damit TTS schon beim ersten Satz starten kann
+            return StreamingResponse(
+                stream_generation(inputs, request, start_time),
+                media_type="application/x-ndjson"
             )
         
+        # Generate response
+        def generate():
+            with torch.no_grad():
+                return state.model.generate(
+                    inputs,
+                    max_new_tokens=request.max_tokens,
+                    temperature=request.temperature,
+                    top_p=request.top_p,
+                    do_sample=True,
+                    pad_token_id=state.tokenizer.eos_token_id,
+                    attention_mask=torch.ones_like(inputs)
+                )
+        
+        def release(_):
+            state.stats["in_flight"] -= 1
+        
+        # generate() im Executor: /health bleibt erreichbar und sieht in_flight, bis der Thread fertig ist
+        state.stats["in_flight"] += 1
+        generation = asyncio.get_running_loop().run_in_executor(None, generate)
+        generation.add_done_callback(release)
+        outputs = await asyncio.shield(generation)
+        
         # Decode response
         generated_text = state.tokenizer.decode(
             outputs[0][inputs.shape[1]:], 
@@ -216,11 +236,7 @@ async def generate_text(request: LLMRequest, background_tasks: BackgroundTasks):
             gpu_stats = await state.gpu_optimizer.get_stats()
         
         # Update stats
-        state.stats["requests_successful"] += 1
-        state.stats["average_response_time"] = (
-            (state.stats["average_response_time"] * (state.stats["requests_successful"] - 1) + processing_time) 
-            / state.stats["requests_successful"]
-        )
+        record_success(processing_time)
         
         # Background task for cleanup
         background_tasks.add_task(cleanup_gpu_memory)
@@ -238,6 +254,98 @@ async def generate_text(request: LLMRequest, background_tasks: BackgroundTasks):
         logger.error(f"❌ Generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Generation failed: {str(e)}")
 
+def record_success(processing_time: float):
+    state.stats["requests_successful"] += 1
+    state.stats["average_response_time"] = (
+        (state.stats["average_response_time"] * (state.stats["requests_successful"] - 1) + processing_time) 
+        / state.stats["requests_successful"]
+    )
+
+async def stream_generation(inputs, request: LLMRequest, start_time: datetime) -> AsyncIterator[bytes]:
+    """Run generate() in a thread and yield decoded text pieces as NDJSON lines"""
+    from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+    
+    class CancelledByClient(StoppingCriteria):
+        def __init__(self):
+            self.cancelled = False
+        
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            return self.cancelled
+    
+    streamer = TextIteratorStreamer(state.tokenizer, skip_prompt=True, skip_special_tokens=True)
+    cancel = CancelledByClient()
+    generation_error: List[Exception] = []
+    
+    def generate():
+        try:
+            with torch.no_grad():
+                state.model.generate(
+                    inputs,
+                    max_new_tokens=request.max_tokens,
+                    temperature=request.temperature,
+                    top_p=request.top_p,
+                    do_sample=True,
+                    pad_token_id=state.tokenizer.eos_token_id,
+                    attention_mask=torch.ones_like(inputs),
+                    streamer=streamer,
+                    stopping_criteria=StoppingCriteriaList([cancel])
+                )
+        except Exception as e:
+            generation_error.append(e)
+            # Streamer beenden, sonst blockiert der Leser für immer
+            streamer.end()
+    
+    thread = threading.Thread(target=generate, name="llm-generate", daemon=True)
+    thread.start()
+    state.stats["in_flight"] += 1
+    
+    loop = asyncio.get_running_loop()
+    pieces: List[str] = []
+    time_to_first_token = None
+    finished = False
+    try:
+        while True:
+            piece = await loop.run_in_executor(None, next, streamer, None)
+            if piece is None:
+                break
+            if not piece:
+                continue
+            if time_to_first_token is None:
+                time_to_first_token = (datetime.now() - start_time).total_seconds()
+            pieces.append(piece)
+            yield (json.dumps({"token": piece}) + "\n").encode("utf-8")
+        
+        if generation_error:
+            raise generation_error[0]
+        
+        processing_time = (datetime.now() - start_time).total_seconds()
+        record_success(processing_time)
+        finished = True
+        yield (json.dumps({
+            "done": True,
+            "text": "".join(pieces).strip(),
+            "processing_time": processing_time,
+            "time_to_first_token": time_to_first_token
+        }) + "\n").encode("utf-8")
+        
+    except Exception as e:
+        state.stats["requests_failed"] += 1
+        logger.error(f"❌ Streaming generation failed: {e}")
+        yield (json.dumps({"done": True, "error": str(e)}) + "\n").encode("utf-8")
+    finally:
+        if not finished:
+            # generate() bricht beim nächsten Token ab; das Stop-Signal weckt einen noch wartenden Leser
+            cancel.cancelled = True
+            streamer.text_queue.put(streamer.stop_signal)
+        # in_flight erst nach Ende des Threads senken, auch wenn dieses await beim Disconnect abgebrochen wird
+        def release(_):
+            state.stats["in_flight"] -= 1
+        
+        joined = loop.run_in_executor(None, thread.join)
+        joined.add_done_callback(release)
+        await asyncio.shield(joined)
+        await cleanup_gpu_memory()
+
 async def cleanup_gpu_memory():
     """Clean up GPU memory after generation"""
     if torch.cuda.is_available():
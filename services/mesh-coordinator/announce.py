@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Announcements
+═══════════════════════════════════════════════════════════════
+Push-based service registration: HTTP /mesh/announce and UDP datagrams
+
+Payload (JSON, same for HTTP and UDP):
+    {"node_id": "m1-mac", "ip": "192.168.68.111", "ttl": 180,
+     "services": {"stt-service": 8002, "tts-service": 8003}}
+
+"services" may also be a list of {"name", "port", "url"} objects. Handshake
+payloads carry feature flags instead ({"ssh": true, ...}); those announce
+the node only, and the coordinator probes its known service ports directly.
+
+Unsigned announcements may only describe the sender itself: "ip" and every
+service URL host must equal the source address. Announcements for other hosts
+(e.g. forwarded by the handshake server) must carry an HMAC (see auth.py).
+
+Usage as sender:
+    python announce.py --service stt-service=8002 --coordinator 192.168.100.10
+"""
+
+import json
+import time
+import socket
+import struct
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import auth
+
+logger = logging.getLogger("gentleman-mesh-announce")
+
+DEFAULT_ANNOUNCE_PORT = 4250
+DEFAULT_ANNOUNCE_GROUP = "239.255.42.42"
+DEFAULT_TTL = 180
+MAX_DATAGRAM = 8192
+
+class InvalidAnnouncement(ValueError):
+    """Raised when an announcement payload cannot be used"""
+
+def parse_announcement(payload: Dict[str, Any], source_ip: Optional[str], known_ports: Dict[str, int],
+                       source: str = "http", keys: Optional[List[bytes]] = None) -> Dict[str, Any]:
+    """Normalize an announcement into node id, address and (name, port, url) services"""
+    if not isinstance(payload, dict):
+        raise InvalidAnnouncement("Announcement must be a JSON object")
+    if auth.is_signed(payload):
+        if not auth.verify(payload, keys or []):
+            raise InvalidAnnouncement("Invalid announcement signature")
+        trusted = True
+    else:
+        trusted = False
+
+    ip = payload.get("ip") or payload.get("ip_address") or source_ip
+    if not ip:
+        raise InvalidAnnouncement("Announcement without address")
+    node_id = str(payload.get("node_id") or payload.get("hostname") or ip)
+
+    services: List[Dict[str, Any]] = []
+    raw_services = payload.get("services") or {}
+    if isinstance(raw_services, dict):
+        for name, value in raw_services.items():
+            if isinstance(value, bool):
+                # Feature-Flag aus dem Handshake: nur bekannte Services mit Standard-Port
+                if value and name in known_ports:
+                    services.append({"name": name, "port": known_ports[name]})
+            elif isinstance(value, int):
+                services.append({"name": name, "port": value})
+            elif isinstance(value, dict) and value.get("port"):
+                services.append({"name": name, "port": int(value["port"]), "url": value.get("url")})
+    elif isinstance(raw_services, list):
+        for entry in raw_services:
+            if isinstance(entry, str) and entry in known_ports:
+                services.append({"name": entry, "port": known_ports[entry]})
+            elif isinstance(entry, dict) and entry.get("name"):
+                port = entry.get("port") or known_ports.get(entry["name"])
+                if port:
+                    services.append({"name": entry["name"], "port": int(port), "url": entry.get("url")})
+
+    for service in services:
+        if not service.get("url"):
+            service["url"] = f"http://{ip}:{service['port']}"
+        url = urlsplit(service["url"])
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise InvalidAnnouncement(f"Invalid service URL {service['url']}")
+        if not trusted and url.hostname != source_ip:
+            raise InvalidAnnouncement(f"Unsigned announcement for foreign URL {service['url']}")
+
+    # Ohne Signatur darf ein Sender nur sich selbst anmelden (sonst SSRF und Übernahme fremder Service-Typen)
+    if not trusted and ip != source_ip:
+        raise InvalidAnnouncement(f"Unsigned announcement for {ip} from {source_ip}")
+
+    return {
+        "node_id": node_id,
+        "ip": ip,
+        "hardware_type": payload.get("hardware_type") or payload.get("node_type"),
+        "services": services,
+        "capabilities": payload.get("capabilities") or [],
+        "system_info": payload.get("system_info") or {},
+        "ttl": float(payload.get("ttl") or DEFAULT_TTL),
+        "source": payload.get("source") or source,
+        "received_at": time.time()
+    }
+
+class AnnounceProtocol(asyncio.DatagramProtocol):
+    """UDP listener; every valid datagram is handed to the coordinator callback"""
+
+    def __init__(self, handler: Callable[[Dict[str, Any], str], None]):
+        self.handler = handler
+        self.received = 0
+        self.rejected = 0
+
+    def datagram_received(self, data: bytes, addr):
+        try:
+            payload = json.loads(data.decode("utf-8"))
+            if not isinstance(payload, dict):
+                raise InvalidAnnouncement("Announcement must be a JSON object")
+            self.handler(payload, addr[0])
+            self.received += 1
+        except (ValueError, TypeError, AttributeError, UnicodeDecodeError) as e:
+            self.rejected += 1
+            logger.debug(f"Ignoring announcement from {addr[0]}: {e}")
+
+def create_announce_socket(port: int, group: Optional[str]) -> socket.socket:
+    """Bound UDP socket, joined to the multicast group when one is configured"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("0.0.0.0", port))
+    if group:
+        try:
+            membership = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton("0.0.0.0"))
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        except OSError as e:
+            logger.warning(f"⚠️ Multicast group {group} not joined, unicast only: {e}")
+    sock.setblocking(False)
+    return sock
+
+async def start_announce_listener(handler: Callable[[Dict[str, Any], str], None], port: int = DEFAULT_ANNOUNCE_PORT,
+                                  group: Optional[str] = DEFAULT_ANNOUNCE_GROUP):
+    loop = asyncio.get_running_loop()
+    sock = create_announce_socket(port, group)
+    transport, protocol = await loop.create_datagram_endpoint(lambda: AnnounceProtocol(handler), sock=sock)
+    logger.info(f"📡 Listening for mesh announcements on udp/{port}" + (f" (group {group})" if group else ""))
+    return transport, protocol
+
+def send_announcement(payload: Dict[str, Any], host: str = DEFAULT_ANNOUNCE_GROUP,
+                      port: int = DEFAULT_ANNOUNCE_PORT):
+    """Fire-and-forget UDP announcement (multicast group or coordinator address)"""
+    data = json.dumps(payload).encode("utf-8")
+    if len(data) > MAX_DATAGRAM:
+        raise InvalidAnnouncement("Announcement too large for a single datagram")
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP) as sock:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        sock.sendto(data, (host, port))
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Announce services to the GENTLEMAN mesh coordinator")
+    parser.add_argument("--node-id", default=socket.gethostname())
+    parser.add_argument("--ip", default=None, help="Address to announce (default: sender address)")
+    parser.add_argument("--service", action="append", default=[], help="name=port, repeatable")
+    parser.add_argument("--coordinator", default=DEFAULT_ANNOUNCE_GROUP, help="Coordinator IP or multicast group")
+    parser.add_argument("--port", type=int, default=DEFAULT_ANNOUNCE_PORT)
+    parser.add_argument("--ttl", type=int, default=DEFAULT_TTL)
+    parser.add_argument("--interval", type=float, default=0, help="Repeat every N seconds (0 = once)")
+    parser.add_argument("--sign", action="store_true",
+                        help="Sign with the mesh key (required when --ip is not the sender address)")
+    args = parser.parse_args()
+
+    services = {}
+    for item in args.service:
+        name, _, port = item.partition("=")
+        services[name] = int(port)
+
+    payload = {"node_id": args.node_id, "services": services, "ttl": args.ttl, "source": "udp"}
+    if args.ip:
+        payload["ip"] = args.ip
+
+    keys = auth.load_keys() if args.sign else []
+    while True:
+        send_announcement(auth.sign(payload, keys[0] if keys else None), args.coordinator, args.port)
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Authentication
+═══════════════════════════════════════════════════════════════
+Shared-key HMAC for payloads between mesh members (announcements, replication)
+
+The signature covers the canonical JSON of the payload without "sig"
+(sorted keys, no whitespace) and a "sent_at" timestamp, so the same check works
+for UDP datagrams and HTTP bodies:
+    {"node_id": "...", ..., "sent_at": 1718000000.5, "sig": "<hex hmac-sha256>"}
+
+Keys: GENTLEMAN_MESH_KEYS (comma-separated, the first one signs; more keys are
+accepted during a rotation) or "mesh_coordinator_key" from the rotated
+api_keys.json (key_rotation_system.py) at GENTLEMAN_API_KEYS.
+"""
+
+import os
+import hmac
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("gentleman-mesh-auth")
+
+SIGNATURE_FIELD = "sig"
+TIMESTAMP_FIELD = "sent_at"
+MAX_AGE = 300.0
+
+def load_keys() -> List[bytes]:
+    configured = os.getenv("GENTLEMAN_MESH_KEYS")
+    if configured:
+        return [key.strip().encode("utf-8") for key in configured.split(",") if key.strip()]
+    path = os.getenv("GENTLEMAN_API_KEYS", "/app/config/api_keys.json")
+    try:
+        with open(path) as f:
+            key = json.load(f).get("mesh_coordinator_key")
+    except (OSError, ValueError, AttributeError):
+        return []
+    return [key.encode("utf-8")] if key else []
+
+def canonical(payload: Dict[str, Any]) -> bytes:
+    unsigned = {key: value for key, value in payload.items() if key != SIGNATURE_FIELD}
+    return json.dumps(unsigned, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def sign(payload: Dict[str, Any], key: Optional[bytes]) -> Dict[str, Any]:
+    """Signed copy of the payload; unchanged when no key is configured"""
+    if not key:
+        return payload
+    signed = {**payload, TIMESTAMP_FIELD: time.time()}
+    signed[SIGNATURE_FIELD] = hmac.new(key, canonical(signed), hashlib.sha256).hexdigest()
+    return signed
+
+def is_signed(payload: Dict[str, Any]) -> bool:
+    return SIGNATURE_FIELD in payload
+
+def verify(payload: Dict[str, Any], keys: List[bytes], max_age: float = MAX_AGE) -> bool:
+    signature = payload.get(SIGNATURE_FIELD)
+    sent_at = payload.get(TIMESTAMP_FIELD)
+    if not keys or not isinstance(signature, str) or not isinstance(sent_at, (int, float)):
+        return False
+    if abs(time.time() - sent_at) > max_age:
+        return False
+    data = canonical(payload)
+    return any(hmac.compare_digest(hmac.new(key, data, hashlib.sha256).hexdigest(), signature) for key in keys)
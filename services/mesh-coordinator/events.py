@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Change Feed
+═══════════════════════════════════════════════════════════════
+Versioned deltas of the mesh topology for SSE/WebSocket subscribers
+
+Event: {"epoch": "66b1f2a0", "version": 42, "type": "service_down", "key": "llm-server@192.168.68.111",
+        "data": {...current view...} | null, "ts": 1718000000.0}
+
+Types: service_added, service_up, service_down, service_updated, latency_class,
+       service_removed, node_join, node_updated, node_leave; "snapshot" carries the
+       full state for (re)initialising a replica, "resync" asks the client to reconnect.
+Versions restart at 0 with every coordinator start; the epoch tells the runs apart.
+"""
+
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger("gentleman-mesh-events")
+
+# Grenzen in Sekunden (EWMA der /health-Latenz)
+LATENCY_CLASSES = ((0.05, "fast"), (0.25, "normal"))
+
+def latency_class(latency: Optional[float]) -> Optional[str]:
+    if latency is None:
+        return None
+    for limit, name in LATENCY_CLASSES:
+        if latency < limit:
+            return name
+    return "slow"
+
+def service_view(info: Dict[str, Any]) -> Dict[str, Any]:
+    """What subscribers see of a service; raw latency is left out so not every check is an event"""
+    return {
+        "name": info.get("name"),
+        "url": info.get("url"),
+        "status": info.get("status"),
+        "latency_class": latency_class(info.get("latency_ewma") or info.get("response_time") or None),
+        "hardware_type": info.get("hardware_type"),
+        "node_ip": (info.get("node_info") or {}).get("ip"),
+        "source": info.get("source")
+    }
+
+def node_view(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "hostname": info.get("hostname"),
+        "ip_address": info.get("ip_address"),
+        "hardware_type": info.get("hardware_type"),
+        "available_services": list(info.get("available_services") or [])
+    }
+
+def format_sse(event: Dict[str, Any]) -> bytes:
+    return f"id: {event['epoch']}-{event['version']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n".encode("utf-8")
+
+class Subscription:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+class ChangeFeed:
+    """Diffs published views against the last ones and keeps the newest deltas in a ring buffer"""
+
+    def __init__(self, capacity: int = 1024, subscriber_queue: int = 256):
+        self.version = 0
+        self.epoch = format(int(time.time()), "x")
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._services: Dict[str, Dict[str, Any]] = {}
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Set[Subscription] = set()
+        self.subscriber_queue = subscriber_queue
+        self.stats = {
+            "events": 0,
+            "overflows": 0
+        }
+
+    # 📝 Änderungen
+    def update_service(self, key: str, info: Optional[Dict[str, Any]]):
+        previous = self._services.get(key)
+        if info is None:
+            if previous is not None:
+                del self._services[key]
+                self._publish("service_removed", key, None)
+            return
+
+        view = service_view(info)
+        if view == previous:
+            return
+        self._services[key] = view
+        if previous is None:
+            kind = "service_added"
+        elif view["status"] != previous["status"] and "healthy" in (view["status"], previous["status"]):
+            kind = "service_up" if view["status"] == "healthy" else "service_down"
+        elif view["latency_class"] != previous["latency_class"] and view["status"] == previous["status"]:
+            kind = "latency_class"
+        else:
+            kind = "service_updated"
+        self._publish(kind, key, view)
+
+    def update_node(self, ip: str, info: Optional[Dict[str, Any]]):
+        previous = self._nodes.get(ip)
+        if info is None:
+            if previous is not None:
+                del self._nodes[ip]
+                self._publish("node_leave", ip, None)
+            return
+
+        view = node_view(info)
+        if view == previous:
+            return
+        self._nodes[ip] = view
+        self._publish("node_join" if previous is None else "node_updated", ip, view)
+
+    def _publish(self, kind: str, key: str, data: Optional[Dict[str, Any]]):
+        self.version += 1
+        event = {"epoch": self.epoch, "version": self.version, "type": kind, "key": key, "data": data, "ts": time.time()}
+        self._events.append(event)
+        self.stats["events"] += 1
+        for subscription in self._subscribers:
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Langsamer Client: nicht blockieren, er bekommt ein resync und holt per since= nach
+                subscription.overflowed = True
+                self.stats["overflows"] += 1
+
+    # 🔍 Lesen
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "epoch": self.epoch,
+            "version": self.version,
+            "type": "snapshot",
+            "key": None,
+            "data": {"services": dict(self._services), "nodes": dict(self._nodes)},
+            "ts": time.time()
+        }
+
+    def since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Deltas after version, or None when they already fell out of the ring buffer"""
+        if version > self.version:
+            return None
+        if version == self.version:
+            return []
+        oldest = self._events[0]["version"] if self._events else self.version + 1
+        if version + 1 < oldest:
+            return None
+        return [event for event in self._events if event["version"] > version]
+
+    def backlog(self, since: Optional[int], epoch: Optional[str] = None) -> List[Dict[str, Any]]:
+        """What a (re)connecting subscriber needs first: missed deltas or a full snapshot"""
+        if since is not None and epoch in (None, self.epoch):
+            events = self.since(since)
+            if events is not None:
+                return events
+        return [self.snapshot()]
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.subscriber_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    async def stream(self, since: Optional[int] = None, epoch: Optional[str] = None,
+                     keepalive: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Backlog, then live deltas; yields None every keepalive seconds without changes"""
+        subscription = self.subscribe()
+        last = since if since is not None else self.version
+        try:
+            for event in self.backlog(since, epoch):
+                last = event["version"]
+                yield event
+            while True:
+                if subscription.overflowed and subscription.queue.empty():
+                    yield {"epoch": self.epoch, "version": last, "type": "resync", "key": None, "data": None,
+                           "ts": time.time()}
+                    return
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                last = event["version"]
+                yield event
+        finally:
+            self.unsubscribe(subscription)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "epoch": self.epoch,
+            "version": self.version,
+            "buffered": len(self._events),
+            "subscribers": len(self._subscribers)
+        }
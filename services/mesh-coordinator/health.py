@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Health Monitor
+═══════════════════════════════════════════════════════════════
+Concurrent /health probing on a shared connection pool with per-service
+jittered schedules and EWMA latency
+"""
+
+import time
+import random
+import asyncio
+import logging
+import importlib.util
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+logger = logging.getLogger("gentleman-mesh-health")
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+def create_http_client(timeout: float = 5.0, max_connections: int = 64) -> httpx.AsyncClient:
+    """Long-lived client: keep-alive pool shared by health checks and discovery"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout, connect=min(timeout, 2.0)),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections // 2,
+                            keepalive_expiry=60.0),
+        http2=http2_available()
+    )
+
+class HealthRecord:
+    """EWMA latency and failure streak of one service"""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.latency_ewma: Optional[float] = None
+        self.samples = 0
+        self.consecutive_failures = 0
+        self.next_check = 0.0
+
+    def observe(self, latency: float):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = self.alpha * latency + (1 - self.alpha) * self.latency_ewma
+        self.samples += 1
+        self.consecutive_failures = 0
+
+    def fail(self):
+        self.consecutive_failures += 1
+
+class HealthMonitor:
+    """Checks each service on its own jittered schedule, many at a time"""
+
+    def __init__(self, interval: float = 30.0, jitter: float = 0.2, concurrency: int = 32,
+                 timeout: float = 5.0, alpha: float = 0.3, max_backoff: float = 300.0):
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self.alpha = alpha
+        self.max_backoff = max_backoff
+        self.concurrency = concurrency
+        self.records: Dict[str, HealthRecord] = {}
+        self.client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.stats = {
+            "checks": 0,
+            "failures": 0,
+            "sweeps": 0,
+            "last_sweep_duration": 0.0
+        }
+
+    async def start(self):
+        self.client = create_http_client(self.timeout)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        logger.info(f"🏥 Health monitor ready (concurrency {self.concurrency}, http2={http2_available()})")
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+
+    def record(self, key: str) -> HealthRecord:
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = HealthRecord(self.alpha)
+            # Erster Check zufällig im ersten Intervall verteilt, damit nicht alle gleichzeitig fällig sind
+            record.next_check = time.time() + random.uniform(0, self.interval * self.jitter)
+        return record
+
+    def forget(self, keys: Iterable[str]):
+        for key in list(self.records):
+            if key not in keys:
+                del self.records[key]
+
+    def _schedule(self, record: HealthRecord):
+        # Ausgefallene Services seltener prüfen (verdoppelt bis max_backoff)
+        base = self.interval
+        if record.consecutive_failures > 1:
+            base = min(self.max_backoff, self.interval * (2 ** (record.consecutive_failures - 1)))
+        record.next_check = time.time() + base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def due(self, keys: Iterable[str], now: Optional[float] = None) -> List[str]:
+        now = now or time.time()
+        return [key for key in keys if self.record(key).next_check <= now]
+
+    def seconds_until_next(self, default: float = 1.0) -> float:
+        if not self.records:
+            return default
+        return max(0.05, min(record.next_check for record in self.records.values()) - time.time())
+
+    async def check(self, key: str, url: str) -> Dict[str, Any]:
+        """GET {url}/health; returns status, latency, payload and HTTP code"""
+        record = self.record(key)
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                response = await self.client.get(f"{url}/health")
+                latency = time.perf_counter() - started
+            except (httpx.HTTPError, OSError) as e:
+                record.fail()
+                self.stats["failures"] += 1
+                self._schedule(record)
+                return {"status": "unreachable", "latency": None, "payload": None, "error": str(e)}
+            finally:
+                self.stats["checks"] += 1
+
+        payload = None
+        try:
+            payload = response.json()
+        except ValueError:
+            pass
+
+        if response.status_code == 200:
+            record.observe(latency)
+            status = "healthy"
+        else:
+            record.fail()
+            self.stats["failures"] += 1
+            status = "unhealthy"
+        self._schedule(record)
+        return {"status": status, "latency": latency, "payload": payload, "code": response.status_code}
+
+    async def sweep(self, targets: Dict[str, str],
+                    on_result: Callable[[str, Dict[str, Any]], None]) -> int:
+        """Check every due target concurrently; returns the number of checks run"""
+        started = time.perf_counter()
+        self.forget(targets.keys())
+        due = self.due(targets.keys())
+        if not due:
+            return 0
+
+        async def run(key: str):
+            result = await self.check(key, targets[key])
+            on_result(key, result)
+
+        await asyncio.gather(*[run(key) for key in due])
+        self.stats["sweeps"] += 1
+        self.stats["last_sweep_duration"] = round(time.perf_counter() - started, 3)
+        return len(due)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "tracked": len(self.records),
+            "interval": self.interval,
+            "concurrency": self.concurrency,
+            "http2": http2_available()
+        }
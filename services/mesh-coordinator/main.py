@@ -7,6 +7,7 @@ Intelligente Service Discovery mit automatischer Hardware-Erkennung
 """
 
 import os
+import time
 import logging
 import socket
 import ipaddress
@@ -17,12 +18,23 @@ from datetime import datetime
 import asyncio
 import yaml
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 import httpx
 
+from health import HealthMonitor
+from routing import RoutingEngine
+from events import ChangeFeed, format_sse
+from replication import Gossiper, ReplicationStore
+from snapshot import StatusSnapshot, TimedSnapshot, if_none_match
+from announce import DEFAULT_TTL, InvalidAnnouncement, parse_announcement, start_announce_listener
+from scan_state import ScanStateStore
+import auth
+from scanner import SubnetScanner, expand_targets
+
 # 🎯 Logging Setup
 logging.basicConfig(
     level=logging.INFO,
@@ -93,7 +105,30 @@ SERVICE_DISCOVERY_CONFIG = {
         "web-interface": 8080
     },
     "timeout": 2.0,
-    "max_concurrent_scans": 50
+    "min_timeout": 0.25,
+    "max_concurrent_scans": int(os.getenv("GENTLEMAN_MESH_SCAN_CONCURRENCY", "256")),
+    "scan_rate": float(os.getenv("GENTLEMAN_MESH_SCAN_RATE", "1000")),  # Verbindungen/s, 0 = unbegrenzt
+    # Announcements sind der Normalfall, Vollscans nur noch Fallback
+    "full_scan_interval": float(os.getenv("GENTLEMAN_MESH_FULL_SCAN_HOURS", "6")) * 3600,
+    # Inkrementelle Scans: nur fällige Endpunkte (lebende oft, tote mit Backoff)
+    "scan_interval": 300.0,
+    "state_db": os.getenv("GENTLEMAN_MESH_STATE_DB", "/app/config/scan_state.db"),
+    "live_refresh": 300.0,
+    "dead_backoff": 900.0,
+    "max_backoff": 86400.0,
+    "announce_grace": float(os.getenv("GENTLEMAN_MESH_ANNOUNCE_GRACE", "120")),
+    # Ohne Announcement so lange gilt Push-Discovery als ausgefallen (Sweep wie ohne Announcements)
+    "announce_silence": 3 * DEFAULT_TTL,
+    "announce_port": int(os.getenv("GENTLEMAN_MESH_ANNOUNCE_PORT", "4250")),
+    "announce_group": os.getenv("GENTLEMAN_MESH_ANNOUNCE_GROUP", "239.255.42.42") or None,
+    "node_probe_interval": 60.0,
+    "health_interval": 30.0,
+    "health_concurrency": int(os.getenv("GENTLEMAN_MESH_HEALTH_CONCURRENCY", "32")),
+    "host_refresh_interval": 300.0,
+    # Weitere Coordinators (kommagetrennte URLs); gefundene mesh-coordinator-Services kommen dazu
+    "peers": [url.strip().rstrip("/") for url in os.getenv("GENTLEMAN_MESH_PEERS", "").split(",") if url.strip()],
+    "coordinator_id": os.getenv("GENTLEMAN_MESH_COORDINATOR_ID") or socket.gethostname(),
+    "gossip_interval": float(os.getenv("GENTLEMAN_MESH_GOSSIP_INTERVAL", "5"))
 }
 
 # 📊 Global State
@@ -108,9 +143,47 @@ class MeshState:
             "health_checks_total": 0,
             "services_discovered": 0,
             "nodes_discovered": 0,
-            "network_scans": 0
+            "network_scans": 0,
+            "announcements_received": 0,
+            "announcements_rejected": 0,
+            "node_probes": 0,
+            "services_expired": 0,
+            "probes_skipped": 0,
+            "live_refreshes": 0
         }
+        self.last_announcement: Optional[float] = None
+        self.last_full_scan: Optional[float] = None
+        self.node_probe_times: Dict[str, float] = {}
+        self.scan_state = ScanStateStore(
+            SERVICE_DISCOVERY_CONFIG["state_db"],
+            live_interval=SERVICE_DISCOVERY_CONFIG["live_refresh"],
+            base_backoff=SERVICE_DISCOVERY_CONFIG["dead_backoff"],
+            max_backoff=SERVICE_DISCOVERY_CONFIG["max_backoff"]
+        )
+        self.announce_protocol = None
+        # Gemeinsamer Mesh-Schlüssel: signierte Announcements und Replikation
+        self.mesh_keys = auth.load_keys()
+        self.health = HealthMonitor(
+            interval=SERVICE_DISCOVERY_CONFIG["health_interval"],
+            concurrency=SERVICE_DISCOVERY_CONFIG["health_concurrency"]
+        )
         self.service_config = None
+        # Hardware/IP werden beim Start und periodisch ermittelt, nicht pro Request
+        self.hardware_type = "unknown"
+        self.local_ip = "127.0.0.1"
+        self.snapshot = StatusSnapshot()
+        self.stats_snapshot = TimedSnapshot(ttl=1.0)
+        self.feed = ChangeFeed()
+        self.replication = ReplicationStore(SERVICE_DISCOVERY_CONFIG["coordinator_id"])
+        self.gossip = Gossiper(self.replication, interval=SERVICE_DISCOVERY_CONFIG["gossip_interval"],
+                               keys=self.mesh_keys)
+        self.routing = RoutingEngine(os.getenv("GENTLEMAN_MESH_ROUTING", "power_of_two"))
+        self.scanner = SubnetScanner(
+            concurrency=SERVICE_DISCOVERY_CONFIG["max_concurrent_scans"],
+            rate=SERVICE_DISCOVERY_CONFIG["scan_rate"],
+            initial_timeout=SERVICE_DISCOVERY_CONFIG["timeout"],
+            min_timeout=SERVICE_DISCOVERY_CONFIG["min_timeout"]
+        )
 
 state = MeshState()
 
@@ -157,118 +230,235 @@ def get_local_ip():
     except:
         return "127.0.0.1"
 
-async def scan_port(ip: str, port: int, timeout: float = 2.0) -> bool:
-    """Scan a single port on an IP address"""
-    try:
-        future = asyncio.open_connection(ip, port)
-        reader, writer = await asyncio.wait_for(future, timeout=timeout)
-        writer.close()
-        await writer.wait_closed()
-        return True
-    except:
-        return False
+# 📣 Änderungen an Snapshot und Change-Feed melden
+def service_changed(service_key: str):
+    service_info = state.services.get(service_key)
+    state.snapshot.mark_service(service_key)
+    state.feed.update_service(service_key, service_info)
+    # Nur eigene Beobachtungen werden an andere Coordinators verteilt
+    if service_info is None or not is_replica(service_info):
+        version = state.replication.local_update(service_key, service_info)
+        if version is not None:
+            if service_info is not None:
+                service_info["version"] = version
+            state.gossip.wake()
+
+def node_changed(ip: str):
+    state.snapshot.mark_node(ip)
+    state.feed.update_node(ip, state.nodes.get(ip))
+
+# 🔄 Replikation zwischen Coordinators
+def is_replica(service_info: Dict) -> bool:
+    return str(service_info.get("source", "")).startswith("replica:")
+
+def apply_replicated(entry: Dict):
+    """Remote entry won the version comparison: mirror it into the local service table"""
+    service_key = entry["key"]
+    current = state.services.get(service_key)
+    if current is not None and not is_replica(current):
+        if entry["deleted"]:
+            # Ein anderer Coordinator hat den Service verloren, wir sehen ihn noch
+            current["version"] = state.replication.local_update(service_key, current, force=True)
+            state.gossip.wake()
+        return
+    
+    if entry["deleted"]:
+        if current is not None:
+            del state.services[service_key]
+            service_changed(service_key)
+        return
+    
+    value = entry["value"]
+    state.services[service_key] = {
+        **(current or {}),
+        **value,
+        "last_check": current["last_check"] if current else datetime.now(),
+        "response_time": value.get("response_time") or 0.0,
+        "source": f"replica:{entry['version'][1]}",
+        "version": entry["version"]
+    }
+    service_changed(service_key)
+
+def gossip_peers() -> List[str]:
+    peers = set(SERVICE_DISCOVERY_CONFIG["peers"])
+    for service_info in state.services.values():
+        if service_info["name"] == "mesh-coordinator" and not is_replica(service_info):
+            peers.add(service_info["url"].rstrip("/"))
+    return sorted(peers)
 
 async def check_service_endpoint(url: str, timeout: float = 5.0) -> Tuple[bool, Dict]:
     """Check if a service endpoint is responding and get info"""
+    client = state.health.client
+    if client is None:
+        async with httpx.AsyncClient(timeout=timeout) as temporary_client:
+            return await probe_service_endpoint(temporary_client, url, timeout)
+    return await probe_service_endpoint(client, url, timeout)
+
+async def probe_service_endpoint(client: httpx.AsyncClient, url: str, timeout: float) -> Tuple[bool, Dict]:
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            # Try health endpoint first
-            try:
-                response = await client.get(f"{url}/health")
-                if response.status_code == 200:
-                    health_data = response.json()
-                    return True, health_data
-            except:
-                pass
-            
-            # Try root endpoint
-            try:
-                response = await client.get(url)
-                if response.status_code == 200:
-                    return True, {"status": "responding", "endpoint": "root"}
-            except:
-                pass
-            
-            return False, {}
+        # Try health endpoint first
+        try:
+            response = await client.get(f"{url}/health", timeout=timeout)
+            if response.status_code == 200:
+                health_data = response.json()
+                return True, health_data
+        except:
+            pass
+        
+        # Try root endpoint
+        try:
+            response = await client.get(url, timeout=timeout)
+            if response.status_code == 200:
+                return True, {"status": "responding", "endpoint": "root"}
+        except:
+            pass
+        
+        return False, {}
     except Exception as e:
         return False, {"error": str(e)}
 
 async def discover_services_in_network():
-    """Discover services across the network"""
+    """Probe all due endpoints and merge the results into the service table"""
+    if state.scanner.running:
+        logger.info("🔍 Discovery already running, skipping")
+        return
+    
     logger.info("🔍 Starting network service discovery...")
     state.stats["network_scans"] += 1
+    state.last_full_scan = time.time()
     
     discovered_services = {}
     discovered_nodes = {}
+    failed_endpoints = []
     
     # Get local network info
-    local_ip = get_local_ip()
+    local_ip = state.local_ip
     logger.info(f"🌐 Local IP: {local_ip}")
     
-    # Scan configured networks
-    for network in SERVICE_DISCOVERY_CONFIG["scan_networks"]:
-        try:
-            network_obj = ipaddress.IPv4Network(network, strict=False)
-            logger.info(f"🔍 Scanning network: {network}")
-            
-            # Create scanning tasks
-            scan_tasks = []
-            for ip in network_obj.hosts():
-                ip_str = str(ip)
-                
-                # Skip local IP to avoid self-scanning
-                if ip_str == local_ip:
-                    continue
-                
-                # Scan all service ports on this IP
-                for service_name, port in SERVICE_DISCOVERY_CONFIG["service_ports"].items():
-                    scan_tasks.append(scan_and_check_service(ip_str, port, service_name))
-                
-                # Limit concurrent scans
-                if len(scan_tasks) >= SERVICE_DISCOVERY_CONFIG["max_concurrent_scans"]:
-                    results = await asyncio.gather(*scan_tasks, return_exceptions=True)
-                    process_scan_results(results, discovered_services, discovered_nodes)
-                    scan_tasks = []
-            
-            # Process remaining tasks
-            if scan_tasks:
-                results = await asyncio.gather(*scan_tasks, return_exceptions=True)
-                process_scan_results(results, discovered_services, discovered_nodes)
-                
-        except Exception as e:
-            logger.error(f"❌ Error scanning network {network}: {e}")
+    # Skip local IP to avoid self-scanning
+    port_names = {port: name for name, port in SERVICE_DISCOVERY_CONFIG["service_ports"].items()}
+    hosts, ports = expand_targets(SERVICE_DISCOVERY_CONFIG["scan_networks"], list(port_names), exclude=(local_ip,))
+    not_due = state.scan_state.not_due()
     
-    # Update global state
-    state.services.update(discovered_services)
-    state.nodes.update(discovered_nodes)
-    state.stats["services_discovered"] = len(state.services)
-    state.stats["nodes_discovered"] = len(state.nodes)
+    def on_probe(ip: str, port: int, is_open: bool):
+        if not is_open:
+            state.scan_state.record(ip, port, False)
+            failed_endpoints.append((ip, port))
+    
+    async def verify(ip: str, port: int) -> Optional[Dict]:
+        result = await check_discovered_service(ip, port, port_names[port])
+        # Offener Port ohne unseren Service zählt wie ein toter Endpunkt
+        state.scan_state.record(ip, port, result is not None, port_names[port])
+        if result is None:
+            failed_endpoints.append((ip, port))
+        return result
     
-    logger.info(f"✅ Discovery complete: {len(discovered_services)} services, {len(discovered_nodes)} nodes")
-
-async def scan_and_check_service(ip: str, port: int, service_name: str) -> Dict:
-    """Scan a specific IP:port for a service"""
     try:
-        # First check if port is open
-        if await scan_port(ip, port, timeout=SERVICE_DISCOVERY_CONFIG["timeout"]):
-            # Port is open, check if it's our service
-            url = f"http://{ip}:{port}"
-            is_service, service_info = await check_service_endpoint(url)
-            
-            if is_service:
-                return {
-                    "type": "service",
-                    "name": service_name,
-                    "ip": ip,
-                    "port": port,
-                    "url": url,
-                    "info": service_info,
-                    "discovered_at": datetime.now()
-                }
-        
-        return None
+        results = await state.scanner.scan(hosts, ports, verify, skip=not_due, on_probe=on_probe)
+        process_scan_results(results, discovered_services, discovered_nodes)
     except Exception as e:
-        return None
+        logger.error(f"❌ Error during network scan: {e}")
+    finally:
+        state.scan_state.flush()
+    
+    state.stats["probes_skipped"] += len(hosts) * len(ports) - state.scanner.total
+    merge_scan_results(discovered_services, discovered_nodes, failed_endpoints)
+    
+    logger.info(f"✅ Discovery complete: {state.scanner.completed} probes, {len(discovered_services)} services "
+                f"in {state.scanner.last_duration:.1f}s")
+
+async def refresh_live_endpoints():
+    """Re-verify only known-live endpoints that are due, without sweeping any range"""
+    due = state.scan_state.due_live()
+    if not due:
+        return
+    state.stats["live_refreshes"] += 1
+    port_names = {port: name for name, port in SERVICE_DISCOVERY_CONFIG["service_ports"].items()}
+    discovered_services = {}
+    discovered_nodes = {}
+    failed_endpoints = []
+    limit = asyncio.Semaphore(SERVICE_DISCOVERY_CONFIG["health_concurrency"])
+    
+    async def verify(ip: str, port: int, service_name: Optional[str]) -> Optional[Dict]:
+        service_name = service_name or port_names.get(port)
+        if service_name is None:
+            return None
+        async with limit:
+            result = await check_discovered_service(ip, port, service_name)
+        state.scan_state.record(ip, port, result is not None, service_name)
+        if result is None:
+            failed_endpoints.append((ip, port))
+        return result
+    
+    try:
+        results = await asyncio.gather(*(verify(ip, port, service) for ip, port, service in due))
+        process_scan_results(results, discovered_services, discovered_nodes)
+    finally:
+        state.scan_state.flush()
+    merge_scan_results(discovered_services, discovered_nodes, failed_endpoints)
+    logger.debug(f"🔄 Refreshed {len(due)} live endpoints, {len(failed_endpoints)} stopped answering")
+
+def merge_scan_results(discovered_services: Dict, discovered_nodes: Dict, failed_endpoints: List[Tuple[str, int]]):
+    """Upsert found services and drop scan-sourced entries whose endpoint stopped answering"""
+    now = time.time()
+    for service_key, service_info in discovered_services.items():
+        existing = state.services.get(service_key)
+        if existing is None:
+            state.services[service_key] = {**service_info, "source": "scan", "scanned_at": now}
+        else:
+            # Status/Latenz stammen aus dem Health-Check und bleiben erhalten
+            existing.update({"url": service_info["url"], "node_info": service_info["node_info"], "scanned_at": now})
+            if is_replica(existing):
+                existing["source"] = "scan"
+        service_changed(service_key)
+    
+    for ip, node_info in discovered_nodes.items():
+        node = state.nodes.setdefault(ip, node_info)
+        if node is not node_info:
+            node["last_seen"] = node_info["last_seen"]
+            for service_name in node_info["available_services"]:
+                if service_name not in node["available_services"]:
+                    node["available_services"].append(service_name)
+        node_changed(ip)
+    
+    port_names = {port: name for name, port in SERVICE_DISCOVERY_CONFIG["service_ports"].items()}
+    for ip, port in failed_endpoints:
+        service_key = f"{port_names.get(port)}@{ip}"
+        service_info = state.services.get(service_key)
+        if service_info is None or service_info.get("source", "scan") != "scan":
+            continue
+        del state.services[service_key]
+        service_changed(service_key)
+        state.stats["services_expired"] += 1
+        logger.info(f"⌛ {service_key} no longer answers, removed")
+        node = state.nodes.get(ip)
+        if node is not None:
+            if service_info["name"] in node["available_services"]:
+                node["available_services"].remove(service_info["name"])
+            if not node["available_services"] and node.get("expires_at") is None:
+                del state.nodes[ip]
+            node_changed(ip)
+    
+    state.stats["services_discovered"] = len(state.services)
+    state.stats["nodes_discovered"] = len(state.nodes)
+
+async def check_discovered_service(ip: str, port: int, service_name: str) -> Optional[Dict]:
+    """Check whether an open IP:port is one of our services"""
+    url = f"http://{ip}:{port}"
+    is_service, service_info = await check_service_endpoint(url)
+    
+    if is_service:
+        return {
+            "type": "service",
+            "name": service_name,
+            "ip": ip,
+            "port": port,
+            "url": url,
+            "info": service_info,
+            "discovered_at": datetime.now()
+        }
+    
+    return None
 
 def process_scan_results(results: List, discovered_services: Dict, discovered_nodes: Dict):
     """Process the results from network scanning"""
@@ -302,6 +492,144 @@ def process_scan_results(results: List, discovered_services: Dict, discovered_no
             
             discovered_nodes[ip]["available_services"].append(service_name)
 
+# 📡 Push-Discovery
+def handle_announcement(payload: Dict, source_ip: Optional[str], source: str = "udp") -> Dict:
+    """Register an announced node and its services (HTTP and UDP entry point)"""
+    try:
+        announcement = parse_announcement(payload, source_ip, SERVICE_DISCOVERY_CONFIG["service_ports"], source,
+                                          state.mesh_keys)
+    except (InvalidAnnouncement, TypeError, ValueError, AttributeError):
+        state.stats["announcements_rejected"] += 1
+        raise
+    
+    state.stats["announcements_received"] += 1
+    state.last_announcement = announcement["received_at"]
+    ip = announcement["ip"]
+    now = datetime.now()
+    expires_at = announcement["received_at"] + announcement["ttl"]
+    
+    node = state.nodes.setdefault(ip, {
+        "hostname": announcement["node_id"],
+        "ip_address": ip,
+        "hardware_type": "unknown",
+        "available_services": [],
+        "system_info": {}
+    })
+    node.update({
+        "hostname": announcement["node_id"],
+        "last_seen": now,
+        "expires_at": expires_at,
+        "source": announcement["source"],
+        "capabilities": announcement["capabilities"]
+    })
+    if announcement["hardware_type"]:
+        node["hardware_type"] = announcement["hardware_type"]
+    if announcement["system_info"]:
+        node["system_info"] = announcement["system_info"]
+    
+    for service in announcement["services"]:
+        service_key = f"{service['name']}@{ip}"
+        entry = state.services.setdefault(service_key, {
+            "name": service["name"],
+            "url": service["url"],
+            "status": "announced",
+            "last_check": now,
+            "response_time": 0.0,
+            "hardware_type": None,
+            "node_info": {"ip": ip, "port": service["port"]},
+            "source": announcement["source"]
+        })
+        entry.update({
+            "url": service["url"],
+            "expires_at": expires_at,
+            "node_info": {"ip": ip, "port": service["port"]}
+        })
+        if is_replica(entry):
+            entry["source"] = announcement["source"]
+        if service["name"] not in node["available_services"]:
+            node["available_services"].append(service["name"])
+        service_changed(service_key)
+        if entry["status"] != "healthy":
+            # Sofort prüfen statt auf den nächsten Health-Check-Zyklus zu warten
+            asyncio.create_task(verify_announced_service(service_key))
+    
+    node_changed(ip)
+    
+    if not announcement["services"]:
+        asyncio.create_task(probe_node_services(ip, announcement["node_id"]))
+    
+    state.stats["services_discovered"] = len(state.services)
+    state.stats["nodes_discovered"] = len(state.nodes)
+    return announcement
+
+async def verify_announced_service(service_key: str):
+    service_info = state.services.get(service_key)
+    if service_info is None:
+        return
+    start_time = time.time()
+    is_service, health_data = await check_service_endpoint(service_info["url"])
+    service_info.update({
+        "status": "healthy" if is_service else "unreachable",
+        "last_check": datetime.now(),
+        "response_time": time.time() - start_time if is_service else 0.0
+    })
+    service_changed(service_key)
+
+async def probe_node_services(ip: str, node_id: str):
+    """Targeted discovery: only the known service ports of one announced node"""
+    now = time.time()
+    if now - state.node_probe_times.get(ip, 0.0) < SERVICE_DISCOVERY_CONFIG["node_probe_interval"]:
+        return
+    state.node_probe_times[ip] = now
+    state.stats["node_probes"] += 1
+    
+    discovered_services = {}
+    discovered_nodes = {}
+    failed_endpoints = []
+    results = []
+    for service_name, port in SERVICE_DISCOVERY_CONFIG["service_ports"].items():
+        result = None
+        if await state.scanner.probe(ip, port):
+            result = await check_discovered_service(ip, port, service_name)
+        state.scan_state.record(ip, port, result is not None, service_name)
+        if result:
+            results.append(result)
+        else:
+            failed_endpoints.append((ip, port))
+    state.scan_state.flush()
+    
+    process_scan_results(results, discovered_services, discovered_nodes)
+    for service_key in discovered_services:
+        if service_key not in state.services:
+            logger.info(f"📡 {service_key} found on announced node {node_id}")
+    merge_scan_results(discovered_services, discovered_nodes, failed_endpoints)
+
+def expire_announcements():
+    """Drop announced or scanned services that timed out and no longer answer"""
+    now = time.time()
+    for service_key, service_info in list(state.services.items()):
+        expires_at = service_info.get("expires_at")
+        if expires_at is not None and expires_at < now and service_info["status"] != "healthy":
+            del state.services[service_key]
+            service_changed(service_key)
+            state.stats["services_expired"] += 1
+            logger.info(f"⌛ Announcement for {service_key} expired")
+            continue
+        # Gescannte Services ohne Bestätigung durch spätere Scans
+        scanned_at = service_info.get("scanned_at")
+        stale_after = 3 * SERVICE_DISCOVERY_CONFIG["live_refresh"] + SERVICE_DISCOVERY_CONFIG["scan_interval"]
+        if scanned_at is not None and now - scanned_at > stale_after and service_info["status"] != "healthy":
+            del state.services[service_key]
+            service_changed(service_key)
+            state.stats["services_expired"] += 1
+            logger.info(f"⌛ Scan result for {service_key} is stale")
+    for ip, node in list(state.nodes.items()):
+        expires_at = node.get("expires_at")
+        if expires_at is not None and expires_at < now:
+            if not any(s.get("node_info", {}).get("ip") == ip for s in state.services.values()):
+                del state.nodes[ip]
+                node_changed(ip)
+
 # 🚀 Startup Event
 @app.on_event("startup")
 async def startup_event():
@@ -315,104 +643,210 @@ async def startup_event():
             with open(config_path, 'r') as f:
                 state.service_config = yaml.safe_load(f)
                 logger.info("📋 Loaded service discovery configuration")
+        state.routing.load_config(state.service_config)
+        
+        # Shared HTTP pool for health checks and discovery
+        await state.health.start()
         
         # Detect local hardware
-        hardware_type = detect_hardware_type()
-        local_ip = get_local_ip()
-        logger.info(f"🔧 Detected hardware: {hardware_type} on {local_ip}")
+        await refresh_host_info()
+        logger.info(f"🔧 Detected hardware: {state.hardware_type} on {state.local_ip}")
         
-        # Discover services in network
-        await discover_services_in_network()
+        # Push-Discovery über UDP (HTTP: POST /mesh/announce)
+        try:
+            _, state.announce_protocol = await start_announce_listener(
+                lambda payload, ip: handle_announcement(payload, ip, "udp"),
+                port=SERVICE_DISCOVERY_CONFIG["announce_port"],
+                group=SERVICE_DISCOVERY_CONFIG["announce_group"]
+            )
+        except OSError as e:
+            logger.warning(f"⚠️ UDP announce listener not started: {e}")
         
         # Start background tasks
         asyncio.create_task(health_check_loop())
         asyncio.create_task(periodic_discovery_loop())
+        asyncio.create_task(host_info_loop())
+        state.replication.on_apply = apply_replicated
+        asyncio.create_task(state.gossip.run(gossip_peers, lambda: state.health.client))
         
         state.is_ready = True
+        state.snapshot.invalidate()
         logger.info("✅ Intelligent Gentleman Mesh Coordinator ready!")
         
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
         state.is_ready = True  # Continue for testing
+        state.snapshot.invalidate()
+
+async def refresh_host_info():
+    """Hardware detection runs lspci/nvidia-smi, so it stays off the request path"""
+    loop = asyncio.get_running_loop()
+    hardware_type = await loop.run_in_executor(None, detect_hardware_type)
+    local_ip = await loop.run_in_executor(None, get_local_ip)
+    if (hardware_type, local_ip) != (state.hardware_type, state.local_ip):
+        if state.is_ready:
+            logger.info(f"🔧 Host changed: {hardware_type} on {local_ip}")
+        state.hardware_type = hardware_type
+        state.local_ip = local_ip
+        state.snapshot.invalidate()
+
+async def host_info_loop():
+    while True:
+        await asyncio.sleep(SERVICE_DISCOVERY_CONFIG["host_refresh_interval"])
+        try:
+            await refresh_host_info()
+        except Exception as e:
+            logger.warning(f"⚠️ Host info refresh failed: {e}")
 
 async def periodic_discovery_loop():
-    """Periodically rediscover services"""
+    """Announce-first discovery: refresh known-live endpoints, sweep ranges only as a rare fallback"""
+    await asyncio.sleep(SERVICE_DISCOVERY_CONFIG["announce_grace"])
     while True:
         try:
-            await asyncio.sleep(300)  # Every 5 minutes
-            await discover_services_in_network()
+            now = time.time()
+            announcements_flowing = (state.last_announcement is not None and
+                                     now - state.last_announcement < SERVICE_DISCOVERY_CONFIG["announce_silence"])
+            # Ohne bisherigen Sweep zählt der Start des Coordinators als letzter Vollscan
+            last_full_scan = state.last_full_scan or state.start_time.timestamp()
+            if not announcements_flowing:
+                logger.info("🔍 No recent announcements, running fallback network scan")
+                await discover_services_in_network()
+            elif now - last_full_scan >= SERVICE_DISCOVERY_CONFIG["full_scan_interval"]:
+                # Backoff-Sweep über tote und unbekannte Bereiche
+                await discover_services_in_network()
+            else:
+                await refresh_live_endpoints()
+            await asyncio.sleep(SERVICE_DISCOVERY_CONFIG["scan_interval"])
         except Exception as e:
             logger.error(f"❌ Periodic discovery error: {e}")
             await asyncio.sleep(600)  # Wait longer on error
 
 async def health_check_loop():
-    """Background task to check service health"""
+    """Background task to check service health (each service on its own schedule)"""
     while True:
         try:
             await check_all_services()
-            await asyncio.sleep(30)  # Check every 30 seconds
+            expire_announcements()
+            await asyncio.sleep(min(5.0, state.health.seconds_until_next()))
         except Exception as e:
             logger.error(f"❌ Health check loop error: {e}")
             await asyncio.sleep(60)
 
 async def check_all_services():
-    """Check health of all known services"""
-    state.stats["health_checks_total"] += 1
+    """Check all services that are due, concurrently on the shared pool"""
+    targets = {service_key: service_info["url"] for service_key, service_info in state.services.items()}
+    state.routing.forget(targets)
+    if await state.health.sweep(targets, apply_health_result):
+        state.stats["health_checks_total"] += 1
+
+def apply_health_result(service_key: str, result: Dict):
+    service_info = state.services.get(service_key)
+    if service_info is None:
+        return
     
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for service_key, service_info in state.services.items():
-            try:
-                start_time = datetime.now()
-                response = await client.get(f"{service_info['url']}/health")
-                response_time = (datetime.now() - start_time).total_seconds()
-                
-                if response.status_code == 200:
-                    state.services[service_key].update({
-                        "status": "healthy",
-                        "last_check": datetime.now(),
-                        "response_time": response_time
-                    })
-                else:
-                    state.services[service_key].update({
-                        "status": "unhealthy",
-                        "last_check": datetime.now(),
-                        "response_time": response_time
-                    })
-                    
-            except Exception as e:
-                state.services[service_key].update({
-                    "status": "unreachable",
-                    "last_check": datetime.now(),
-                    "response_time": 0.0
-                })
+    record = state.health.records.get(service_key)
+    service_info.update({
+        "status": result["status"],
+        "last_check": datetime.now(),
+        "response_time": result["latency"] or 0.0,
+        "latency_ewma": record.latency_ewma if record else None,
+        "consecutive_failures": record.consecutive_failures if record else 0
+    })
+    if isinstance(result.get("payload"), dict):
+        service_info["health"] = result["payload"]
+    service_changed(service_key)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await state.health.close()
+    state.scan_state.close()
 
 # 🌐 Enhanced Endpoints
 @app.get("/mesh/status", response_model=MeshStatus)
-async def get_mesh_status():
-    """Get comprehensive mesh network status"""
+async def get_mesh_status(request: Request):
+    """Get comprehensive mesh network status (cached snapshot, supports If-None-Match)"""
     state.stats["requests_total"] += 1
-    
-    services_list = [
-        ServiceInfo(**service_info) for service_info in state.services.values()
-    ]
-    
-    nodes_list = [
-        NodeInfo(**node_info) for node_info in state.nodes.values()
-    ]
-    
-    return MeshStatus(
-        coordinator_status="healthy" if state.is_ready else "starting",
-        services=services_list,
-        nodes=nodes_list,
-        network_info={
+    body, etag = state.snapshot.render(state.services, state.nodes, mesh_status_header)
+    return cached_json_response(request, body, etag)
+
+def mesh_status_header() -> Dict:
+    return {
+        "coordinator_status": "healthy" if state.is_ready else "starting",
+        "network_info": {
             "total_services": len(state.services),
             "healthy_services": len([s for s in state.services.values() if s["status"] == "healthy"]),
             "total_nodes": len(state.nodes),
-            "coordinator_uptime": (datetime.now() - state.start_time).total_seconds(),
-            "local_ip": get_local_ip(),
-            "hardware_type": detect_hardware_type()
+            # Startzeit statt Uptime, sonst wäre jeder Snapshot sofort veraltet
+            "coordinator_started_at": state.start_time.isoformat(),
+            "local_ip": state.local_ip,
+            "hardware_type": state.hardware_type
         }
-    )
+    }
+
+def cached_json_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/mesh/events")
+async def mesh_events(request: Request, since: Optional[int] = None, epoch: Optional[str] = None):
+    """Server-Sent Events: topology deltas after ?since= / Last-Event-ID, else a snapshot first"""
+    last_event_id = request.headers.get("last-event-id", "")
+    if since is None and "-" in last_event_id:
+        epoch, _, version = last_event_id.partition("-")
+        since = int(version) if version.isdigit() else None
+    
+    async def event_stream():
+        async for event in state.feed.stream(since, epoch):
+            if event is None:
+                yield b": keepalive\n\n"
+            else:
+                yield format_sse(event)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/mesh/ws/events")
+async def mesh_events_ws(websocket: WebSocket, since: Optional[int] = None, epoch: Optional[str] = None):
+    """Same feed as /mesh/events as JSON messages"""
+    await websocket.accept()
+    try:
+        async for event in state.feed.stream(since, epoch):
+            await websocket.send_json(event or {"type": "keepalive", "version": state.feed.version})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+@app.post("/mesh/replication/sync")
+async def replication_sync(request: Request):
+    """Anti-entropy round from a peer coordinator"""
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Sync payload must be an object")
+    if not auth.verify(payload, state.mesh_keys):
+        raise HTTPException(status_code=401, detail="Invalid or missing sync signature")
+    return auth.sign(state.replication.handle_sync(payload), state.mesh_keys[0])
+
+@app.post("/mesh/announce")
+async def announce_service(request: Request):
+    """Push registration from nodes, services or the handshake server"""
+    try:
+        payload = await request.json()
+        announcement = handle_announcement(payload, request.client.host if request.client else None, "http")
+    except (InvalidAnnouncement, TypeError, ValueError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid announcement: {e}")
+    
+    return {
+        "status": "registered",
+        "node_id": announcement["node_id"],
+        "ip": announcement["ip"],
+        "services": [service["name"] for service in announcement["services"]],
+        "ttl": announcement["ttl"]
+    }
 
 @app.post("/mesh/discover")
 async def trigger_discovery():
@@ -424,6 +858,11 @@ async def trigger_discovery():
         "nodes_found": len(state.nodes)
     }
 
+@app.get("/mesh/scan/progress")
+async def get_scan_progress():
+    """Progress, throughput and ETA of the current (or last) network scan"""
+    return state.scanner.get_progress()
+
 @app.get("/mesh/services")
 async def list_services():
     """List all discovered services"""
@@ -446,7 +885,7 @@ async def get_service_info(service_name: str):
 
 @app.get("/mesh/find/{service_type}")
 async def find_best_service(service_type: str):
-    """Find the best available instance of a service type"""
+    """Find the best available instance of a service type (latency, load and hardware aware)"""
     matching_services = [
         (k, v) for k, v in state.services.items() 
         if v["name"] == service_type and v["status"] == "healthy"
@@ -455,13 +894,20 @@ async def find_best_service(service_type: str):
     if not matching_services:
         raise HTTPException(status_code=404, detail=f"No healthy {service_type} services found")
     
-    # Sort by response time (best first)
-    matching_services.sort(key=lambda x: x[1]["response_time"])
+    candidates = []
+    for service_key, service_info in matching_services:
+        node = state.nodes.get((service_info.get("node_info") or {}).get("ip"), {})
+        candidates.append((service_key, service_info, service_info.get("hardware_type") or node.get("hardware_type")))
+    
+    ranked = state.routing.rank(service_type, candidates)
+    chosen = state.routing.choose(ranked)
+    others = [entry for entry in ranked if entry is not chosen]
     
-    best_service = matching_services[0][1]
     return {
-        "service": best_service,
-        "alternatives": [s[1] for s in matching_services[1:]]
+        "service": state.services[chosen["key"]],
+        "alternatives": [state.services[entry["key"]] for entry in others],
+        "candidates": [chosen] + others,
+        "strategy": state.routing.strategy
     }
 
 # 🏥 Health Check
@@ -478,15 +924,27 @@ async def health_check():
     )
 
 @app.get("/stats")
-async def get_stats():
-    """Get coordinator statistics"""
+async def get_stats(request: Request):
+    """Get coordinator statistics (rebuilt at most once per second)"""
+    body, etag = state.stats_snapshot.render(build_stats)
+    return cached_json_response(request, body, etag)
+
+def build_stats() -> Dict:
     return {
         "stats": state.stats,
         "uptime": (datetime.now() - state.start_time).total_seconds(),
+        "last_announcement": state.last_announcement,
+        "last_full_scan": state.last_full_scan,
+        "scan_state": state.scan_state.get_stats(),
+        "health_monitor": state.health.get_status(),
+        "routing": state.routing.get_status(),
+        "snapshot": state.snapshot.get_status(),
+        "events": state.feed.get_status(),
+        "replication": state.gossip.get_status(),
         "services": len(state.services),
         "nodes": len(state.nodes),
-        "hardware_type": detect_hardware_type(),
-        "local_ip": get_local_ip()
+        "hardware_type": state.hardware_type,
+        "local_ip": state.local_ip
     }
 
 # 🚀 Main
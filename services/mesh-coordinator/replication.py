@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Replication
+═══════════════════════════════════════════════════════════════
+Gossip of the service table between coordinators (last-writer-wins entries,
+anti-entropy by digest)
+
+Entry: {"key": "llm-server@192.168.68.111", "value": {...} | null, "deleted": false,
+        "version": [1718000000123, "coordinator-m1"]}
+
+Versions are hybrid clocks (ms timestamp, never behind anything seen from a peer,
+origin id as tie breaker). A sync round is one POST /mesh/replication/sync with
+the digest hash and the per-key versions; the peer answers with its newer entries
+and the keys it wants, which follow in a second push-only POST.
+
+Requests and responses are signed with the shared mesh key (auth.py). Versions more
+than max_skew ahead of the local clock are rejected. Owners re-version their entries
+every origin_ttl / 3, so entries of a coordinator that stopped doing that expire
+after origin_ttl on every peer.
+"""
+
+import time
+import random
+import asyncio
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import httpx
+
+import auth
+
+logger = logging.getLogger("gentleman-mesh-replication")
+
+# Felder, die andere Coordinators von einem Service sehen
+REPLICATED_FIELDS = ("name", "url", "status", "latency_ewma", "response_time", "hardware_type", "node_info")
+LATENCY_FIELDS = ("latency_ewma", "response_time")
+
+def newer(a: List, b: Optional[List]) -> bool:
+    return b is None or (a[0], a[1]) > (b[0], b[1])
+
+def latency_moved(new: Optional[float], old: Optional[float], tolerance: float) -> bool:
+    if not new or not old:
+        return bool(new) != bool(old)
+    return abs(new - old) > tolerance * old
+
+class ReplicationStore:
+    """Converged service table; only the coordinator that observed a service writes its entry"""
+
+    def __init__(self, node_id: str, tombstone_ttl: float = 3600.0, latency_tolerance: float = 0.2,
+                 max_skew: float = 60.0, origin_ttl: float = 600.0):
+        self.node_id = node_id
+        self.tombstone_ttl = tombstone_ttl
+        self.latency_tolerance = latency_tolerance
+        self.max_skew = max_skew
+        self.origin_ttl = origin_ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.owned: Set[str] = set()
+        self.on_apply: Optional[Callable[[Dict[str, Any]], None]] = None
+        self._clock = 0
+        self._hash: Optional[str] = None
+        self.stats = {
+            "rejected_future": 0,
+            "expired": 0,
+            "refreshed": 0
+        }
+
+    def _next_version(self) -> List:
+        self._clock = max(int(time.time() * 1000), self._clock + 1)
+        return [self._clock, self.node_id]
+
+    def _changed(self):
+        self._hash = None
+
+    # 📝 Lokale Beobachtungen
+    def local_update(self, key: str, info: Optional[Dict[str, Any]], force: bool = False) -> Optional[List]:
+        """Publish the local view of a service; returns the new version or None if nothing worth sending changed"""
+        current = self.entries.get(key)
+        if info is None:
+            if key not in self.owned:
+                return None
+            self.owned.discard(key)
+            if current is not None and current["deleted"]:
+                return None
+            entry = {"key": key, "value": None, "deleted": True, "version": self._next_version()}
+        else:
+            value = {field: info.get(field) for field in REPLICATED_FIELDS}
+            self.owned.add(key)
+            if not force and current is not None and not current["deleted"] and not self._differs(value, current["value"]):
+                return None
+            entry = {"key": key, "value": value, "deleted": False, "version": self._next_version()}
+        self.entries[key] = entry
+        self._changed()
+        return entry["version"]
+
+    def _differs(self, value: Dict[str, Any], previous: Dict[str, Any]) -> bool:
+        # Latenz schwankt bei jedem Check; erst eine deutliche Änderung ist eine neue Version wert
+        for field in REPLICATED_FIELDS:
+            if field in LATENCY_FIELDS:
+                if latency_moved(value.get(field), previous.get(field), self.latency_tolerance):
+                    return True
+            elif value.get(field) != previous.get(field):
+                return True
+        return False
+
+    # 🔄 Anti-Entropy
+    def digest(self) -> Dict[str, List]:
+        return {key: entry["version"] for key, entry in self.entries.items()}
+
+    def digest_hash(self) -> str:
+        if self._hash is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            for key in sorted(self.entries):
+                version = self.entries[key]["version"]
+                hasher.update(f"{key}\0{version[0]}\0{version[1]}\n".encode("utf-8"))
+            self._hash = hasher.hexdigest()
+        return self._hash
+
+    def diff(self, peer_digest: Dict[str, List]) -> Dict[str, Any]:
+        """Entries the peer lacks or has older, and keys where the peer is ahead"""
+        send = [entry for key, entry in self.entries.items() if newer(entry["version"], peer_digest.get(key))]
+        request = [key for key, version in peer_digest.items()
+                   if newer(version, (self.entries.get(key) or {}).get("version"))]
+        return {"entries": send, "request": request}
+
+    def merge(self, entries: List[Dict[str, Any]]) -> int:
+        applied = 0
+        # Versionen weit in der Zukunft würden die Uhr aller Coordinators dauerhaft vorstellen
+        horizon = (time.time() + self.max_skew) * 1000
+        for entry in entries:
+            try:
+                key, version = entry["key"], entry["version"]
+                if not isinstance(version[0], int) or not isinstance(version[1], str):
+                    continue
+                if version[0] > horizon:
+                    self.stats["rejected_future"] += 1
+                    continue
+                if not newer(version, (self.entries.get(key) or {}).get("version")):
+                    continue
+            except (KeyError, TypeError, IndexError):
+                continue
+            self._clock = max(self._clock, version[0])
+            self.entries[key] = entry
+            # Eine fremde Version ersetzt die eigene; die eigene Sicht gilt erst nach der nächsten Änderung wieder
+            if version[1] != self.node_id:
+                self.owned.discard(key)
+            applied += 1
+            if self.on_apply is not None:
+                self.on_apply(entry)
+        if applied:
+            self._changed()
+        return applied
+
+    def handle_sync(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Peer side of a sync round"""
+        applied = self.merge(payload.get("entries") or [])
+        if payload.get("push_only"):
+            return {"from": self.node_id, "applied": applied}
+        if payload.get("hash") == self.digest_hash():
+            return {"from": self.node_id, "in_sync": True}
+        return {"from": self.node_id, "hash": self.digest_hash(), **self.diff(payload.get("digest") or {})}
+
+    def gc(self, now: Optional[float] = None):
+        now = now or time.time()
+        cutoff = (now - self.tombstone_ttl) * 1000
+        expired = [key for key, entry in self.entries.items() if entry["deleted"] and entry["version"][0] < cutoff]
+        for key in expired:
+            del self.entries[key]
+        if expired:
+            self._changed()
+        self.expire_origins(now)
+
+    def expire_origins(self, now: Optional[float] = None):
+        """Renew own entries; remote entries not renewed within origin_ttl belong to a dead coordinator"""
+        now = now or time.time()
+        renew_before = (now - self.origin_ttl / 3) * 1000
+        expire_before = (now - self.origin_ttl) * 1000
+        for key, entry in list(self.entries.items()):
+            if entry["deleted"] or entry["version"][0] >= renew_before:
+                continue
+            if key in self.owned:
+                self.entries[key] = {**entry, "version": self._next_version()}
+                self.stats["refreshed"] += 1
+                self._changed()
+            elif entry["version"][0] < expire_before:
+                # Tombstone mit derselben Version: Peers schicken den alten Stand nicht erneut
+                tombstone = {"key": key, "value": None, "deleted": True, "version": entry["version"]}
+                self.entries[key] = tombstone
+                self.stats["expired"] += 1
+                self._changed()
+                if self.on_apply is not None:
+                    self.on_apply(tombstone)
+
+class Gossiper:
+    """Periodic push-pull rounds with a few random peers, sooner after local changes"""
+
+    def __init__(self, store: ReplicationStore, interval: float = 5.0, fanout: int = 2, timeout: float = 5.0,
+                 keys: Optional[List[bytes]] = None):
+        self.store = store
+        self.keys = keys or []
+        self.interval = interval
+        self.fanout = fanout
+        self.timeout = timeout
+        self.self_urls: Set[str] = set()
+        self.peer_status: Dict[str, Dict[str, Any]] = {}
+        self._wake: Optional[asyncio.Event] = None
+        self.stats = {
+            "rounds": 0,
+            "in_sync": 0,
+            "entries_received": 0,
+            "entries_sent": 0,
+            "failures": 0
+        }
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _signed(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return auth.sign(payload, self.keys[0])
+
+    async def sync_with(self, client: httpx.AsyncClient, peer_url: str) -> int:
+        url = f"{peer_url}/mesh/replication/sync"
+        response = await client.post(url, timeout=self.timeout, json=self._signed({
+            "from": self.store.node_id,
+            "hash": self.store.digest_hash(),
+            "digest": self.store.digest()
+        }))
+        response.raise_for_status()
+        data = response.json()
+        if not isinstance(data, dict) or not auth.verify(data, self.keys):
+            raise ValueError(f"Unsigned or invalid sync response from {peer_url}")
+        if data.get("from") == self.store.node_id:
+            # Eigene Adresse (z.B. aus GENTLEMAN_MESH_PEERS oder Discovery)
+            self.self_urls.add(peer_url)
+            return 0
+        if data.get("in_sync"):
+            self.stats["in_sync"] += 1
+            return 0
+
+        received = self.store.merge(data.get("entries") or [])
+        self.stats["entries_received"] += received
+        wanted = [self.store.entries[key] for key in data.get("request") or [] if key in self.store.entries]
+        if wanted:
+            response = await client.post(url, timeout=self.timeout, json=self._signed(
+                {"from": self.store.node_id, "entries": wanted, "push_only": True}))
+            response.raise_for_status()
+            self.stats["entries_sent"] += len(wanted)
+        return received
+
+    async def run(self, peers: Callable[[], List[str]], client: Callable[[], Optional[httpx.AsyncClient]]):
+        self._wake = asyncio.Event()
+        if not self.keys:
+            logger.warning("⚠️ No mesh key configured, replication disabled")
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval * random.uniform(0.8, 1.2))
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            # Auch ohne Peers: eigene Einträge erneuern, verwaiste fremde auslaufen lassen
+            self.store.gc()
+            http = client()
+            candidates = [url for url in peers() if url not in self.self_urls]
+            if http is None or not candidates or not self.keys:
+                continue
+            self.stats["rounds"] += 1
+            for peer_url in random.sample(candidates, min(self.fanout, len(candidates))):
+                status = self.peer_status.setdefault(peer_url, {"last_sync": None, "failures": 0})
+                try:
+                    await self.sync_with(http, peer_url)
+                    status.update({"last_sync": time.time(), "failures": 0})
+                except (httpx.HTTPError, ValueError) as e:
+                    status["failures"] += 1
+                    self.stats["failures"] += 1
+                    logger.debug(f"Gossip with {peer_url} failed: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            **self.store.stats,
+            "node_id": self.store.node_id,
+            "entries": len(self.store.entries),
+            "owned": len(self.store.owned),
+            "digest": self.store.digest_hash(),
+            "peers": self.peer_status
+        }
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Routing
+═══════════════════════════════════════════════════════════════
+Latency- and load-aware instance selection for /mesh/find
+
+Score (lower is better) = EWMA latency * (1 + outstanding work) * hardware penalty
+    outstanding work = in_flight + queue_depth from the service's /health
+                       + assignments handed out since (decaying)
+"""
+
+import math
+import time
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_LATENCY = 0.05
+HARDWARE_STEP = 1.0
+
+STRATEGIES = ("power_of_two", "least_outstanding")
+
+# detect_hardware_type() meldet "linux_cpu", service-discovery.yml spricht von "cpu"
+HARDWARE_ALIASES = {"linux_cpu": "cpu"}
+
+def normalize_hardware(hardware_type: Optional[str]) -> Optional[str]:
+    return HARDWARE_ALIASES.get(hardware_type, hardware_type)
+
+def reported_load(health: Optional[Dict[str, Any]]) -> float:
+    """in_flight (TTS: busy_workers) + queue_depth as reported by the service; LLM nests it under stats"""
+    if not isinstance(health, dict):
+        return 0.0
+    load = 0.0
+    for source in (health, health.get("stats")):
+        if not isinstance(source, dict):
+            continue
+        for field in ("in_flight", "busy_workers", "queue_depth"):
+            value = source.get(field)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                load += value
+    return load
+
+class RoutingEngine:
+    """Ranks healthy instances and picks one per request"""
+
+    def __init__(self, strategy: str = "power_of_two", assignment_decay: float = 10.0):
+        self.strategy = strategy if strategy in STRATEGIES else "power_of_two"
+        self.assignment_decay = assignment_decay
+        self.preferences: Dict[str, List[str]] = {}
+        # key -> (decaying count, updated_at)
+        self._assignments: Dict[str, Tuple[float, float]] = {}
+        self.stats = {
+            "decisions": 0,
+            "p2c_samples": 0
+        }
+
+    def load_config(self, service_config: Optional[Dict[str, Any]]):
+        """service_preferences and load_balancing.strategy from service-discovery.yml"""
+        if not service_config:
+            return
+        for name, rules in (service_config.get("service_preferences") or {}).items():
+            if isinstance(rules, dict):
+                self.preferences[name] = [normalize_hardware(hardware) for hardware in rules.get("preferred_hardware") or []]
+        # least_connections aus der Config entspricht least_outstanding, alles andere nutzt P2C
+        configured = (service_config.get("load_balancing") or {}).get("strategy")
+        if configured == "least_connections":
+            self.strategy = "least_outstanding"
+
+    # 📊 Bewertung
+    def hardware_penalty(self, service_type: str, hardware_type: Optional[str]) -> float:
+        preferred = self.preferences.get(service_type)
+        if not preferred or "any" in preferred:
+            return 1.0
+        hardware_type = normalize_hardware(hardware_type)
+        if hardware_type in preferred:
+            return 1.0 + HARDWARE_STEP * preferred.index(hardware_type)
+        # Unbekannte Hardware wie der letzte Fallback behandeln, fremde noch dahinter
+        fallback = len(preferred) - (1 if hardware_type in (None, "unknown") else 0)
+        return 1.0 + HARDWARE_STEP * fallback
+
+    def assignments(self, key: str, now: Optional[float] = None) -> float:
+        entry = self._assignments.get(key)
+        if entry is None:
+            return 0.0
+        count, updated_at = entry
+        return count * math.exp(-((now or time.time()) - updated_at) / self.assignment_decay)
+
+    def note_assignment(self, key: str):
+        now = time.time()
+        self._assignments[key] = (self.assignments(key, now) + 1.0, now)
+
+    def forget(self, keys):
+        for key in list(self._assignments):
+            if key not in keys:
+                del self._assignments[key]
+
+    def score(self, service_type: str, key: str, info: Dict[str, Any], hardware_type: Optional[str]) -> Dict[str, Any]:
+        latency = info.get("latency_ewma") or info.get("response_time") or DEFAULT_LATENCY
+        outstanding = reported_load(info.get("health")) + self.assignments(key)
+        penalty = self.hardware_penalty(service_type, hardware_type)
+        return {
+            "key": key,
+            "score": latency * (1.0 + outstanding) * penalty,
+            "latency": latency,
+            "outstanding": round(outstanding, 2),
+            "hardware_type": hardware_type,
+            "hardware_penalty": penalty
+        }
+
+    def rank(self, service_type: str,
+             candidates: List[Tuple[str, Dict[str, Any], Optional[str]]]) -> List[Dict[str, Any]]:
+        """Candidates by ascending score, each with a selection weight (inverse score, sums to 1)"""
+        scored = [self.score(service_type, key, info, hardware) for key, info, hardware in candidates]
+        scored.sort(key=lambda entry: entry["score"])
+        total = sum(1.0 / max(entry["score"], 1e-6) for entry in scored)
+        for entry in scored:
+            entry["weight"] = round((1.0 / max(entry["score"], 1e-6)) / total, 4) if total else 0.0
+            entry["score"] = round(entry["score"], 5)
+        return scored
+
+    def choose(self, ranked: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Power of two choices: two random instances, the less loaded one wins"""
+        if len(ranked) < 2 or self.strategy == "least_outstanding":
+            chosen = ranked[0]
+        else:
+            self.stats["p2c_samples"] += 1
+            first, second = random.sample(ranked, 2)
+            chosen = first if first["score"] <= second["score"] else second
+        self.stats["decisions"] += 1
+        self.note_assignment(chosen["key"])
+        return chosen
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            **self.stats,
+            "strategy": self.strategy,
+            "preferences": self.preferences,
+            "assignments": {key: round(self.assignments(key, now), 2) for key in self._assignments}
+        }
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Scan State
+═══════════════════════════════════════════════════════════════
+Persistent per-IP:port probe history with exponential backoff (SQLite)
+"""
+
+import time
+import random
+import sqlite3
+import logging
+import ipaddress
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger("gentleman-mesh-state")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS endpoints (
+    ip INTEGER NOT NULL,
+    port INTEGER NOT NULL,
+    service TEXT,
+    last_seen REAL,
+    last_probe REAL NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    next_probe REAL NOT NULL,
+    PRIMARY KEY (ip, port)
+);
+CREATE INDEX IF NOT EXISTS endpoints_next_probe ON endpoints (next_probe);
+"""
+
+class ScanStateStore:
+    """Remembers which endpoints answered so dead ranges are probed ever more rarely"""
+
+    def __init__(self, path: Optional[str] = None, live_interval: float = 300.0,
+                 base_backoff: float = 900.0, max_backoff: float = 86400.0, flush_every: int = 2000):
+        self.live_interval = live_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.flush_every = flush_every
+        self.path = path or ":memory:"
+
+        if path and path != ":memory:":
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"⚠️ Scan state directory unavailable, using memory: {e}")
+                self.path = ":memory:"
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._pending: List[Tuple] = []
+
+    # 📝 Probe-Ergebnisse (gepuffert, ein executemany pro Batch)
+    def record(self, ip: str, port: int, alive: bool, service: Optional[str] = None,
+               now: Optional[float] = None):
+        now = now or time.time()
+        self._pending.append((int(ipaddress.IPv4Address(ip)), port, service, alive, now))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        rows = []
+        for ip, port, service, alive, now in pending:
+            if alive:
+                rows.append((ip, port, service, now, now, 0, now + self.live_interval))
+            else:
+                # Erster Fehlschlag: base_backoff mit Jitter; das Upsert verdoppelt ab dann pro Fehlschlag
+                rows.append((ip, port, service, None, now, 1, now + self.base_backoff * random.uniform(0.9, 1.1)))
+
+        with self._conn:
+            self._conn.executemany("""
+                INSERT INTO endpoints (ip, port, service, last_seen, last_probe, failures, next_probe)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (ip, port) DO UPDATE SET
+                    service = COALESCE(excluded.service, endpoints.service),
+                    last_seen = COALESCE(excluded.last_seen, endpoints.last_seen),
+                    last_probe = excluded.last_probe,
+                    failures = CASE WHEN excluded.failures = 0 THEN 0 ELSE endpoints.failures + 1 END,
+                    next_probe = CASE WHEN excluded.failures = 0 THEN excluded.next_probe
+                        ELSE excluded.last_probe + MIN(?, (excluded.next_probe - excluded.last_probe)
+                                                          * (1 << MIN(endpoints.failures, 20))) END
+            """, [row + (self.max_backoff,) for row in rows])
+
+    # 🔍 Abfragen
+    def not_due(self, now: Optional[float] = None) -> Set[Tuple[int, int]]:
+        """Endpoints still inside their backoff/refresh window"""
+        self.flush()
+        now = now or time.time()
+        return {(ip, port) for ip, port in self._conn.execute(
+            "SELECT ip, port FROM endpoints WHERE next_probe > ?", (now,))}
+
+    def is_known(self) -> bool:
+        self.flush()
+        return self._conn.execute("SELECT 1 FROM endpoints LIMIT 1").fetchone() is not None
+
+    def live_endpoints(self, max_age: float, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        self.flush()
+        now = now or time.time()
+        return [
+            {"ip": str(ipaddress.IPv4Address(ip)), "port": port, "service": service, "last_seen": last_seen}
+            for ip, port, service, last_seen in self._conn.execute(
+                "SELECT ip, port, service, last_seen FROM endpoints "
+                "WHERE last_seen IS NOT NULL AND last_seen >= ? AND failures = 0", (now - max_age,))
+        ]
+
+    def due_live(self, now: Optional[float] = None) -> List[Tuple[str, int, Optional[str]]]:
+        """Endpoints that answered last time and whose refresh window has passed"""
+        self.flush()
+        now = now or time.time()
+        return [
+            (str(ipaddress.IPv4Address(ip)), port, service)
+            for ip, port, service in self._conn.execute(
+                "SELECT ip, port, service FROM endpoints "
+                "WHERE last_seen IS NOT NULL AND failures = 0 AND next_probe <= ?", (now,))
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        self.flush()
+        now = time.time()
+        total, live, due, backed_off = self._conn.execute("""
+            SELECT COUNT(*),
+                   COALESCE(SUM(failures = 0 AND last_seen IS NOT NULL), 0),
+                   COALESCE(SUM(next_probe <= ?), 0),
+                   COALESCE(SUM(failures > 0), 0)
+            FROM endpoints
+        """, (now,)).fetchone()
+        return {
+            "path": self.path,
+            "endpoints": total,
+            "live": live,
+            "due": due,
+            "backed_off": backed_off,
+            "live_interval": self.live_interval,
+            "max_backoff": self.max_backoff
+        }
+
+    def close(self):
+        self.flush()
+        self._conn.close()
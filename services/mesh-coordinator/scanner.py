@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Scanner
+═══════════════════════════════════════════════════════════════
+Pipelined, rate-limited TCP port scanner with adaptive timeouts
+"""
+
+import time
+import random
+import asyncio
+import logging
+import ipaddress
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger("gentleman-mesh-scanner")
+
+VerifyCallback = Callable[[str, int], Awaitable[Optional[Dict[str, Any]]]]
+ProbeCallback = Callable[[str, int, bool], None]
+
+class RTTEstimator:
+    """Smoothed RTT and variance (RFC 6298) -> connect timeout of srtt + 4 * rttvar"""
+
+    ALPHA = 0.125
+    BETA = 0.25
+
+    def __init__(self, initial_timeout: float = 2.0, min_timeout: float = 0.25, max_timeout: float = 2.0):
+        self.initial_timeout = initial_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.srtt: Optional[float] = None
+        self.rttvar: Optional[float] = None
+        self.samples = 0
+
+    def observe(self, rtt: float):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        self.samples += 1
+
+    @property
+    def timeout(self) -> float:
+        if self.srtt is None:
+            return self.initial_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.srtt + 4 * self.rttvar))
+
+class TokenBucket:
+    """Global connection-rate limit shared by all scan workers"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate / 10)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def expand_targets(networks: List[str], ports: List[int], exclude: Tuple[str, ...] = ()) -> Tuple[List[int], List[int]]:
+    """Host addresses (as ints, to keep /16 ranges cheap) and ports to probe"""
+    hosts = set()
+    for network in networks:
+        try:
+            network_obj = ipaddress.IPv4Network(network, strict=False)
+        except ValueError as e:
+            logger.error(f"❌ Invalid scan network {network}: {e}")
+            continue
+        hosts.update(int(ip) for ip in network_obj.hosts())
+    for address in exclude:
+        try:
+            hosts.discard(int(ipaddress.IPv4Address(address)))
+        except ValueError:
+            pass
+    return list(hosts), list(ports)
+
+def shuffled_targets(hosts: List[int], ports: List[int],
+                     skip: Optional[Set[Tuple[int, int]]] = None) -> Iterator[Tuple[str, int]]:
+    """Random host order, so no single subnet or node is hammered in sequence"""
+    random.shuffle(hosts)
+    for host in hosts:
+        ip = str(ipaddress.IPv4Address(host))
+        for port in random.sample(ports, len(ports)):
+            if skip and (host, port) in skip:
+                continue
+            yield ip, port
+
+class SubnetScanner:
+    """Worker pool that keeps a constant number of probes in flight"""
+
+    def __init__(self, concurrency: int = 256, rate: float = 1000.0, initial_timeout: float = 2.0,
+                 min_timeout: float = 0.25, max_verifications: int = 16):
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.rtt = RTTEstimator(initial_timeout, min_timeout, initial_timeout)
+        self.max_verifications = max_verifications
+
+        self.running = False
+        self.total = 0
+        self.completed = 0
+        self.open_ports = 0
+        self.found = 0
+        self.timeouts = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+
+    async def probe(self, ip: str, port: int) -> bool:
+        """TCP connect; RST and successful connects both feed the RTT estimator"""
+        started = time.monotonic()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout=self.rtt.timeout)
+        except asyncio.TimeoutError:
+            # Karn: Timeouts liefern keine RTT-Probe
+            self.timeouts += 1
+            return False
+        except ConnectionRefusedError:
+            self.rtt.observe(time.monotonic() - started)
+            return False
+        except OSError:
+            return False
+
+        self.rtt.observe(time.monotonic() - started)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+        return True
+
+    async def scan(self, hosts: List[int], ports: List[int], verify: VerifyCallback,
+                   skip: Optional[Set[Tuple[int, int]]] = None,
+                   on_probe: Optional[ProbeCallback] = None) -> List[Dict[str, Any]]:
+        """Probe every host:port not in skip once; open ports are handed to verify() concurrently"""
+        if self.running:
+            raise RuntimeError("Scan already in progress")
+
+        self.running = True
+        self.total = len(hosts) * len(ports)
+        if skip:
+            host_set, port_set = set(hosts), set(ports)
+            self.total -= sum(1 for host, port in skip if host in host_set and port in port_set)
+        self.completed = self.open_ports = self.found = self.timeouts = 0
+        self.started_at = time.time()
+        self.finished_at = None
+
+        targets = shuffled_targets(hosts, ports, skip)
+        bucket = TokenBucket(self.rate)
+        verify_slots = asyncio.Semaphore(self.max_verifications)
+        verifications: List[asyncio.Task] = []
+        results: List[Dict[str, Any]] = []
+
+        async def run_verify(ip: str, port: int):
+            async with verify_slots:
+                try:
+                    result = await verify(ip, port)
+                except Exception as e:
+                    logger.debug(f"Verification of {ip}:{port} failed: {e}")
+                    return
+            if result:
+                self.found += 1
+                results.append(result)
+
+        async def worker():
+            # Gemeinsamer Iterator: jeder Worker holt sich das nächste Ziel, sobald er frei ist
+            for ip, port in targets:
+                await bucket.acquire()
+                is_open = await self.probe(ip, port)
+                if is_open:
+                    self.open_ports += 1
+                    verifications.append(asyncio.create_task(run_verify(ip, port)))
+                if on_probe is not None:
+                    on_probe(ip, port, is_open)
+                self.completed += 1
+
+        try:
+            await asyncio.gather(*[worker() for _ in range(min(self.concurrency, max(1, self.total)))])
+            if verifications:
+                await asyncio.gather(*verifications)
+        finally:
+            for task in verifications:
+                if not task.done():
+                    task.cancel()
+            self.running = False
+            self.finished_at = time.time()
+            self.last_duration = self.finished_at - self.started_at
+
+        return results
+
+    def get_progress(self) -> Dict[str, Any]:
+        elapsed = None
+        eta = None
+        probes_per_second = 0.0
+        if self.started_at is not None:
+            elapsed = (time.time() if self.running else self.finished_at) - self.started_at
+            if elapsed > 0:
+                probes_per_second = self.completed / elapsed
+            if self.running and probes_per_second > 0:
+                eta = (self.total - self.completed) / probes_per_second
+
+        return {
+            "running": self.running,
+            "total": self.total,
+            "completed": self.completed,
+            "percent": round(100.0 * self.completed / self.total, 2) if self.total else 0.0,
+            "open_ports": self.open_ports,
+            "services_found": self.found,
+            "timeouts": self.timeouts,
+            "probes_per_second": round(probes_per_second, 1),
+            "elapsed_seconds": round(elapsed, 1) if elapsed is not None else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "connect_timeout": round(self.rtt.timeout, 3),
+            "srtt": round(self.rtt.srtt, 4) if self.rtt.srtt is not None else None,
+            "concurrency": self.concurrency,
+            "rate_limit": self.rate,
+            "last_duration": round(self.last_duration, 1) if self.last_duration is not None else None
+        }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+🌐 GENTLEMAN Mesh Status Snapshots
+═══════════════════════════════════════════════════════════════
+Pre-serialized JSON bodies with ETags, so status polling never rebuilds
+models or re-encodes unchanged entries
+"""
+
+import json
+import time
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+SERVICE_FIELDS = ("name", "url", "status", "last_check", "response_time", "hardware_type", "node_info")
+NODE_FIELDS = ("hostname", "ip_address", "hardware_type", "available_services", "system_info")
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def encode(value: Any) -> bytes:
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    return bool(header) and (header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")])
+
+class StatusSnapshot:
+    """/mesh/status body; mutations mark single services/nodes dirty, reads reuse the cached bytes"""
+
+    def __init__(self):
+        self.version = 0
+        # Neustart ändert das ETag, auch wenn die Versionsnummer wieder bei 0 beginnt
+        self._boot = format(int(time.time()), "x")
+        self._service_fragments: Dict[str, bytes] = {}
+        self._node_fragments: Dict[str, bytes] = {}
+        self._dirty_services: Set[str] = set()
+        self._dirty_nodes: Set[str] = set()
+        self._full = True
+        self._body: Optional[bytes] = None
+        self._etag = ""
+        self.stats = {
+            "builds": 0,
+            "fragments_encoded": 0,
+            "hits": 0
+        }
+
+    def mark_service(self, key: str):
+        self._dirty_services.add(key)
+        self._changed()
+
+    def mark_node(self, ip: str):
+        self._dirty_nodes.add(ip)
+        self._changed()
+
+    def invalidate(self):
+        """Header data changed (readiness, hardware, IP) or too much to track"""
+        self._full = True
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._body = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self._boot}-{self.version}"'
+
+    def _refresh(self, fragments: Dict[str, bytes], dirty: Set[str], entries: Dict[str, Dict],
+                 fields: Tuple[str, ...]) -> List[bytes]:
+        if self._full:
+            fragments.clear()
+            keys = list(entries)
+        else:
+            keys = list(dirty)
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None:
+                fragments.pop(key, None)
+            else:
+                fragments[key] = encode({field: entry.get(field) for field in fields})
+                self.stats["fragments_encoded"] += 1
+        dirty.clear()
+        # Reihenfolge wie im State (Einfügereihenfolge), Einträge ohne Fragment nachziehen
+        for key in entries:
+            if key not in fragments:
+                fragments[key] = encode({field: entries[key].get(field) for field in fields})
+                self.stats["fragments_encoded"] += 1
+        if len(fragments) > len(entries):
+            for key in [key for key in fragments if key not in entries]:
+                del fragments[key]
+        return [fragments[key] for key in entries]
+
+    def render(self, services: Dict[str, Dict], nodes: Dict[str, Dict],
+               header: Callable[[], Dict[str, Any]]) -> Tuple[bytes, str]:
+        if self._body is not None:
+            self.stats["hits"] += 1
+            return self._body, self._etag
+
+        service_parts = self._refresh(self._service_fragments, self._dirty_services, services, SERVICE_FIELDS)
+        node_parts = self._refresh(self._node_fragments, self._dirty_nodes, nodes, NODE_FIELDS)
+        self._full = False
+
+        head = header()
+        self._body = b"".join([
+            b'{"coordinator_status":', encode(head["coordinator_status"]),
+            b',"services":[', b",".join(service_parts),
+            b'],"nodes":[', b",".join(node_parts),
+            b'],"network_info":', encode(head["network_info"]), b"}"
+        ])
+        self._etag = self.etag
+        self.stats["builds"] += 1
+        return self._body, self._etag
+
+    def get_status(self) -> Dict[str, Any]:
+        return {**self.stats, "version": self.version, "cached_bytes": len(self._body or b"")}
+
+class TimedSnapshot:
+    """Body rebuilt at most every ttl seconds; ETag is a content hash"""
+
+    def __init__(self, ttl: float = 1.0):
+        self.ttl = ttl
+        self._body = b""
+        self._etag = ""
+        self._built_at = 0.0
+
+    def render(self, build: Callable[[], Dict[str, Any]]) -> Tuple[bytes, str]:
+        now = time.monotonic()
+        if not self._body or now - self._built_at >= self.ttl:
+            self._body = encode(build())
+            self._etag = '"' + hashlib.blake2b(self._body, digest_size=8).hexdigest() + '"'
+            self._built_at = now
+        return self._body, self._etag
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+🎤 GENTLEMAN STT Audio Utilities
+═══════════════════════════════════════════════════════════════
+PCM decoding helpers shared by cache and pre-processing stages
+"""
+
+import io
+import wave
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("gentleman-stt-audio")
+
+# Whisper arbeitet intern mit 16 kHz Mono
+WHISPER_SAMPLE_RATE = 16000
+
+def decode_wav(content: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    """Decode WAV bytes into mono float32 samples in [-1, 1]
+
+    Returns None for anything that is not a PCM WAV file (mp3, ogg, ...),
+    callers then fall back to handing the raw file to Whisper/ffmpeg.
+    """
+    try:
+        with wave.open(io.BytesIO(content), "rb") as wav_file:
+            channels = wav_file.getnchannels()
+            sample_width = wav_file.getsampwidth()
+            sample_rate = wav_file.getframerate()
+            frames = wav_file.readframes(wav_file.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    if sample_width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        logger.debug(f"Unsupported sample width: {sample_width}")
+        return None
+
+    if channels > 1:
+        usable = len(samples) - (len(samples) % channels)
+        samples = samples[:usable].reshape(-1, channels).mean(axis=1)
+
+    return samples, sample_rate
+
+def resample(samples: np.ndarray, source_rate: int, target_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """Linear resampling, good enough for speech recognition input"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+
+    duration = len(samples) / source_rate
+    target_length = max(1, int(round(duration * target_rate)))
+    source_positions = np.arange(len(samples), dtype=np.float64)
+    target_positions = np.linspace(0, len(samples) - 1, target_length)
+    return np.interp(target_positions, source_positions, samples).astype(np.float32)
@@ -6,6 +6,8 @@ FastAPI Server für Speech-to-Text mit Whisper
 """
 
 import os
+import time
+import asyncio
 import logging
 from typing import Dict, Optional
 from datetime import datetime
@@ -16,6 +18,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
+from audio_utils import decode_wav
+from model_manager import ModelUnavailableError, WhisperModelManager
+from transcription_cache import TranscriptionCache
+from vad import VoiceActivityDetector
+
 # 🎯 Logging Setup
 logging.basicConfig(
     level=logging.INFO,
@@ -48,21 +55,50 @@ class STTResponse(BaseModel):
     processing_time: float
     language: str
     segments: Optional[list] = None
+    cached: bool = False
+    vad: Optional[Dict] = None
 
 class HealthResponse(BaseModel):
     status: str
     whisper_loaded: bool
     uptime: float
+    model_state: str
+    last_used: Optional[float] = None
+    loaded_at: Optional[float] = None
+    load_error: Optional[str] = None
+    idle_unload_seconds: float
+    in_flight: int = 0
 
 # 📊 Global State
 class STTState:
     def __init__(self):
-        self.whisper_model = None
+        self.model = WhisperModelManager(
+            model_name=os.getenv("GENTLEMAN_WHISPER_MODEL", "base"),
+            idle_unload_seconds=float(os.getenv("GENTLEMAN_WHISPER_IDLE_MINUTES", "15")) * 60,
+            warmup=os.getenv("GENTLEMAN_WHISPER_WARMUP", "true").lower() == "true"
+        )
         self.is_ready = False
+        self.start_time = time.time()
+        self.in_flight = 0
+        self.idle_watch_task: Optional[asyncio.Task] = None
+        self.cache = TranscriptionCache(
+            max_entries=int(os.getenv("GENTLEMAN_STT_CACHE_MAX_ENTRIES", "256")),
+            max_bytes=int(os.getenv("GENTLEMAN_STT_CACHE_MAX_BYTES", str(8 * 1024 * 1024))),
+            use_fingerprint=os.getenv("GENTLEMAN_STT_CACHE_FINGERPRINT", "true").lower() == "true"
+        )
+        self.vad = None
+        if os.getenv("GENTLEMAN_STT_VAD", "true").lower() == "true":
+            self.vad = VoiceActivityDetector(
+                max_pause_ms=int(os.getenv("GENTLEMAN_STT_VAD_MAX_PAUSE_MS", "600"))
+            )
         self.stats = {
             "requests_total": 0,
             "requests_successful": 0,
             "requests_failed": 0,
+            "cache_hits": 0,
+            "silent_requests_skipped": 0,
+            "audio_seconds_received": 0.0,
+            "audio_seconds_removed": 0.0,
             "average_processing_time": 0.0
         }
 
@@ -74,23 +110,40 @@ async def startup_event():
     """Initialize STT Service"""
     logger.info("🎤 Starting Gentleman STT Service...")
     
-    try:
-        # Import whisper here to avoid startup delays
-        import whisper
-        
-        # Load Whisper model
-        model_name = os.getenv("GENTLEMAN_WHISPER_MODEL", "base")
-        logger.info(f"🧠 Loading Whisper model: {model_name}")
-        
-        state.whisper_model = whisper.load_model(model_name)
-        state.is_ready = True
-        
-        logger.info("✅ Gentleman STT Service ready!")
-        
-    except Exception as e:
-        logger.error(f"❌ Startup failed: {e}")
-        # Continue without Whisper for testing
-        state.is_ready = True
+    # Modell wird erst beim ersten Request geladen und nach Leerlauf wieder freigegeben
+    state.idle_watch_task = asyncio.create_task(state.model.idle_watch_loop())
+    
+    if os.getenv("GENTLEMAN_WHISPER_PRELOAD", "false").lower() == "true":
+        try:
+            await state.model.ensure_loaded()
+        except ModelUnavailableError as e:
+            logger.error(f"❌ Whisper preload failed: {e}")
+    
+    state.is_ready = True
+    logger.info("✅ Gentleman STT Service ready!")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the idle watcher before the event loop goes away"""
+    if state.idle_watch_task is not None:
+        state.idle_watch_task.cancel()
+        try:
+            await state.idle_watch_task
+        except asyncio.CancelledError:
+            pass
+        state.idle_watch_task = None
+
+def prepare_audio(content: bytes):
+    """Cache-Lookup, bei einem Miss zusätzlich VAD -> (Treffer, Schlüssel, Fingerprint, VAD-Ergebnis)
+    
+    Stille wird vor der Inferenz entfernt; das geht nur für PCM WAV, sonst bleibt das VAD-Ergebnis None.
+    """
+    cached_result, cache_key, fingerprint = state.cache.lookup(content)
+    if cached_result is not None:
+        return cached_result, cache_key, fingerprint, None
+    decoded = decode_wav(content) if state.vad else None
+    vad_result = state.vad.process(*decoded) if decoded is not None else None
+    return None, cache_key, fingerprint, vad_result
 
 # 🎤 Main STT Endpoint
 @app.post("/transcribe", response_model=STTResponse)
@@ -101,28 +154,71 @@ async def transcribe_audio(audio: UploadFile = File(...)):
     
     start_time = datetime.now()
     state.stats["requests_total"] += 1
+    state.in_flight += 1
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
+        content = await audio.read()
         
-        # Transcribe with Whisper (if available)
-        if state.whisper_model:
-            result = state.whisper_model.transcribe(temp_path)
+        # Hash, Fingerprint und VAD rechnen im Executor, nicht auf dem Event-Loop
+        loop = asyncio.get_running_loop()
+        cached_result, cache_key, fingerprint, vad_result = await loop.run_in_executor(
+            None, prepare_audio, content
+        )
+        
+        # Wiederholte Clips direkt aus dem Cache beantworten
+        if cached_result is not None:
+            processing_time = (datetime.now() - start_time).total_seconds()
+            state.stats["requests_successful"] += 1
+            state.stats["cache_hits"] += 1
+            return STTResponse(
+                **cached_result,
+                confidence=0.95,
+                processing_time=processing_time,
+                cached=True
+            )
+        
+        if vad_result is not None:
+            state.stats["audio_seconds_received"] += vad_result.original_duration
+            state.stats["audio_seconds_removed"] += vad_result.original_duration - vad_result.output_duration
+        
+        if vad_result is not None and vad_result.is_silent:
+            # Reine Stille: keine Whisper-Inferenz nötig
+            state.stats["silent_requests_skipped"] += 1
+            text = ""
+            language = "unknown"
+            segments = []
+            state.cache.put(cache_key, {
+                "text": text,
+                "language": language,
+                "segments": segments,
+                "vad": vad_result.to_dict()
+            }, fingerprint)
+        else:
+            if vad_result is not None:
+                result = await state.model.transcribe(vad_result.samples)
+                segments = result.get("segments", [])
+                for segment in segments:
+                    segment["start"] = vad_result.map_time(segment["start"])
+                    segment["end"] = vad_result.map_time(segment["end"])
+            else:
+                # Save uploaded file temporarily (non-WAV formats go through ffmpeg)
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+                    temp_file.write(content)
+                    temp_path = temp_file.name
+                try:
+                    result = await state.model.transcribe(temp_path)
+                finally:
+                    os.unlink(temp_path)
+                segments = result.get("segments", [])
+            
             text = result["text"].strip()
             language = result.get("language", "unknown")
-            segments = result.get("segments", [])
-        else:
-            # Fallback for testing
-            text = "STT Service is running but Whisper model not loaded"
-            language = "en"
-            segments = []
-        
-        # Clean up temp file
-        os.unlink(temp_path)
+            state.cache.put(cache_key, {
+                "text": text,
+                "language": language,
+                "segments": segments,
+                "vad": vad_result.to_dict() if vad_result else None
+            }, fingerprint)
         
         # Calculate processing time
         processing_time = (datetime.now() - start_time).total_seconds()
@@ -139,29 +235,66 @@ async def transcribe_audio(audio: UploadFile = File(...)):
             confidence=0.95,  # Simplified confidence
             processing_time=processing_time,
             language=language,
-            segments=segments
+            segments=segments,
+            vad=vad_result.to_dict() if vad_result else None
         )
         
+    except ModelUnavailableError as e:
+        state.stats["requests_failed"] += 1
+        raise HTTPException(status_code=503, detail=f"Whisper model unavailable: {e}")
     except Exception as e:
         state.stats["requests_failed"] += 1
         logger.error(f"❌ Transcription failed: {e}")
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
+    finally:
+        state.in_flight -= 1
 
 # 🏥 Health Check
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
+    if not state.is_ready:
+        status = "starting"
+    elif state.model.state == "failed":
+        status = "degraded"
+    else:
+        status = "healthy"
+    
     return HealthResponse(
-        status="healthy" if state.is_ready else "starting",
-        whisper_loaded=state.whisper_model is not None,
-        uptime=0.0  # Simplified
+        status=status,
+        whisper_loaded=state.model.is_loaded,
+        uptime=time.time() - state.start_time,
+        model_state=state.model.state,
+        last_used=state.model.last_used,
+        loaded_at=state.model.loaded_at,
+        load_error=state.model.load_error,
+        idle_unload_seconds=state.model.idle_unload_seconds,
+        in_flight=state.in_flight
     )
 
 # 📊 Stats Endpoint
 @app.get("/stats")
 async def get_stats():
     """Get service statistics"""
-    return state.stats
+    received = state.stats["audio_seconds_received"]
+    return {
+        **state.stats,
+        "audio_fraction_removed": state.stats["audio_seconds_removed"] / received if received else 0.0,
+        "cache": state.cache.get_stats(),
+        "model": state.model.get_status()
+    }
+
+@app.post("/model/unload")
+async def unload_model():
+    """Release the Whisper model immediately"""
+    await state.model.unload()
+    return state.model.get_status()
+
+@app.delete("/cache")
+async def clear_cache():
+    """Drop all cached transcriptions"""
+    state.cache.clear()
+    return {"message": "Transcription cache cleared"}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+🎤 GENTLEMAN STT Model Manager
+═══════════════════════════════════════════════════════════════
+Lazy Whisper loading, warm-up and idle unload for shared M1 nodes
+"""
+
+import gc
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from audio_utils import WHISPER_SAMPLE_RATE
+
+logger = logging.getLogger("gentleman-stt-model")
+
+class ModelUnavailableError(Exception):
+    """Raised when the Whisper model could not be loaded"""
+
+class WhisperModelManager:
+    """Owns the Whisper model and its load/unload lifecycle"""
+
+    def __init__(self, model_name: str = "base", idle_unload_seconds: float = 900.0,
+                 warmup: bool = True, retry_after_seconds: float = 60.0):
+        self.model_name = model_name
+        self.idle_unload_seconds = idle_unload_seconds
+        self.warmup = warmup
+        self.retry_after_seconds = retry_after_seconds
+
+        self.model = None
+        self.state = "unloaded"
+        self.load_error: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.last_load_duration: Optional[float] = None
+        self.in_use = 0
+        self.load_count = 0
+        self.unload_count = 0
+
+        self._failed_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+        # Ein Worker: Inferenz läuft serialisiert außerhalb des Event Loops
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Lazy, damit der Lock am Event Loop von uvicorn hängt
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def ensure_loaded(self):
+        """Load the model if needed and return it"""
+        if self.model is not None:
+            return self.model
+
+        async with self.lock:
+            if self.model is not None:
+                return self.model
+
+            if (self.state == "failed" and self._failed_at is not None
+                    and time.time() - self._failed_at < self.retry_after_seconds):
+                raise ModelUnavailableError(self.load_error or "Whisper model failed to load")
+
+            self.state = "loading"
+            start_time = time.time()
+            try:
+                loop = asyncio.get_running_loop()
+                self.model = await loop.run_in_executor(self._executor, self._load_blocking)
+            except Exception as e:
+                self.state = "failed"
+                self.load_error = str(e)
+                self._failed_at = time.time()
+                logger.error(f"❌ Whisper model load failed: {e}")
+                raise ModelUnavailableError(self.load_error) from e
+
+            self.state = "loaded"
+            self.load_error = None
+            self._failed_at = None
+            self.loaded_at = time.time()
+            self.last_used = self.loaded_at
+            self.last_load_duration = self.loaded_at - start_time
+            self.load_count += 1
+            logger.info(f"✅ Whisper model '{self.model_name}' ready in {self.last_load_duration:.1f}s")
+            return self.model
+
+    def _load_blocking(self):
+        # Import whisper here to avoid startup delays
+        import whisper
+
+        logger.info(f"🧠 Loading Whisper model: {self.model_name}")
+        model = whisper.load_model(self.model_name)
+
+        if self.warmup:
+            # Eine kurze Inferenz kompiliert/initialisiert die Kernel vor dem ersten Request
+            warmup_start = time.time()
+            model.transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), fp16=False)
+            logger.info(f"🔥 Whisper warm-up took {time.time() - warmup_start:.2f}s")
+
+        return model
+
+    async def transcribe(self, audio: Any, **options) -> Dict[str, Any]:
+        """Run Whisper on a file path or 16 kHz float32 samples"""
+        model = await self.ensure_loaded()
+        self.in_use += 1
+        self.last_used = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, lambda: model.transcribe(audio, **options))
+        finally:
+            self.in_use -= 1
+            self.last_used = time.time()
+
+    async def unload(self):
+        """Free the model and return its memory"""
+        async with self.lock:
+            if self.model is None or self.in_use:
+                return
+
+            self.model = None
+            self.state = "unloaded"
+            self.loaded_at = None
+            self.unload_count += 1
+            gc.collect()
+
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                elif hasattr(torch, "mps") and torch.backends.mps.is_available():
+                    torch.mps.empty_cache()
+            except Exception:
+                pass
+
+            logger.info("💤 Whisper model unloaded after idle period")
+
+    async def idle_watch_loop(self):
+        """Background task that unloads the model when voice is idle"""
+        if self.idle_unload_seconds <= 0:
+            return
+
+        interval = max(5.0, min(60.0, self.idle_unload_seconds / 4))
+        while True:
+            try:
+                await asyncio.sleep(interval)
+                if (self.model is not None and not self.in_use and self.last_used is not None
+                        and time.time() - self.last_used >= self.idle_unload_seconds):
+                    await self.unload()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Idle watch error: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "state": self.state,
+            "loaded": self.is_loaded,
+            "in_use": self.in_use,
+            "loaded_at": self.loaded_at,
+            "last_used": self.last_used,
+            "last_load_duration": self.last_load_duration,
+            "load_error": self.load_error,
+            "idle_unload_seconds": self.idle_unload_seconds,
+            "load_count": self.load_count,
+            "unload_count": self.unload_count
+        }
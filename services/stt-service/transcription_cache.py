@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+🎤 GENTLEMAN STT Transcription Cache
+═══════════════════════════════════════════════════════════════
+Content-addressed LRU cache for Whisper results (exact + perceptual)
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from audio_utils import decode_wav, resample
+
+logger = logging.getLogger("gentleman-stt-cache")
+
+# 🔍 Fingerprint Parameter
+FINGERPRINT_SAMPLE_RATE = 8000
+FINGERPRINT_FRAME = 1024          # ~128 ms pro Frame bei 8 kHz
+FINGERPRINT_HOP = 512
+FINGERPRINT_BANDS = 17            # 16 Bit pro Frame (Differenzen benachbarter Bänder)
+FINGERPRINT_MIN_ENERGY = 1e-6     # Stille erzeugt keinen sinnvollen Fingerprint
+FINGERPRINT_MARGIN_DB = 12.0      # Frames unter Rauschboden + Marge zählen nicht (wie in vad.py)
+FINGERPRINT_MIN_ACTIVE = 0.5      # Mindestanteil gemeinsam aktiver Frames für einen Vergleich
+
+class AudioFingerprint:
+    """Coarse spectral fingerprint (Haitsma/Kalker style energy-difference bits)"""
+
+    __slots__ = ("bits", "active", "duration")
+
+    def __init__(self, bits: np.ndarray, duration: float, active: Optional[np.ndarray] = None):
+        self.bits = bits
+        self.duration = duration
+        # Pro Bit-Zeile: beide beteiligten Frames liegen über dem Energie-Boden
+        self.active = active if active is not None else np.ones(bits.shape[0], dtype=bool)
+
+    @classmethod
+    def from_wav(cls, content: bytes) -> Optional["AudioFingerprint"]:
+        decoded = decode_wav(content)
+        if decoded is None:
+            return None
+
+        samples, sample_rate = decoded
+        samples = resample(samples, sample_rate, FINGERPRINT_SAMPLE_RATE)
+        if len(samples) < FINGERPRINT_FRAME or float(np.mean(samples ** 2)) < FINGERPRINT_MIN_ENERGY:
+            return None
+
+        frame_count = 1 + (len(samples) - FINGERPRINT_FRAME) // FINGERPRINT_HOP
+        frames = np.lib.stride_tricks.as_strided(
+            samples,
+            shape=(frame_count, FINGERPRINT_FRAME),
+            strides=(samples.strides[0] * FINGERPRINT_HOP, samples.strides[0])
+        )
+        spectrum = np.abs(np.fft.rfft(frames * np.hanning(FINGERPRINT_FRAME), axis=1)) ** 2
+
+        # Logarithmisch verteilte Bänder zwischen 300 Hz und 3 kHz (Sprachbereich)
+        freqs = np.fft.rfftfreq(FINGERPRINT_FRAME, 1.0 / FINGERPRINT_SAMPLE_RATE)
+        edges = np.geomspace(300.0, 3000.0, FINGERPRINT_BANDS + 1)
+        band_index = np.clip(np.digitize(freqs, edges) - 1, -1, FINGERPRINT_BANDS)
+        energies = np.zeros((frame_count, FINGERPRINT_BANDS), dtype=np.float64)
+        for band in range(FINGERPRINT_BANDS):
+            mask = band_index == band
+            if mask.any():
+                energies[:, band] = spectrum[:, mask].sum(axis=1)
+
+        band_diff = np.diff(energies, axis=1)
+        bits = (band_diff[1:] - band_diff[:-1]) > 0
+        if bits.shape[0] == 0:
+            return None
+
+        # Stille Frames maskieren: dort bestimmt nur das Rauschen die Bits.
+        # Schwelle wie im VAD: Rauschboden + Marge, aber nie über Peak - 15 dB
+        frame_db = 10.0 * np.log10(energies.sum(axis=1) + 1e-10)
+        threshold_db = min(float(np.percentile(frame_db, 10)) + FINGERPRINT_MARGIN_DB, float(frame_db.max()) - 15.0)
+        loud = frame_db > threshold_db
+        active = loud[1:] & loud[:-1]
+        if not active.any():
+            return None
+        return cls(np.packbits(bits, axis=1), len(samples) / FINGERPRINT_SAMPLE_RATE, active)
+
+    def bucket(self) -> int:
+        """Duration bucket (100 ms) used to limit candidate comparisons"""
+        return int(round(self.duration * 10))
+
+    def bit_error_rate(self, other: "AudioFingerprint") -> float:
+        if self.bits.shape != other.bits.shape:
+            frames = min(self.bits.shape[0], other.bits.shape[0])
+            longest = max(self.bits.shape[0], other.bits.shape[0])
+            # Mehr als 5% Längenunterschied -> verschiedene Clips
+            if frames == 0 or (longest - frames) > 0.05 * longest:
+                return 1.0
+            a, b = self.bits[:frames], other.bits[:frames]
+            active_a, active_b = self.active[:frames], other.active[:frames]
+        else:
+            a, b = self.bits, other.bits
+            active_a, active_b = self.active, other.active
+
+        # Nur Zeilen vergleichen, die in beiden Clips Signal enthalten; kaum Überschneidung -> verschiedene Clips
+        both = active_a & active_b
+        either = active_a | active_b
+        if not either.any() or both.sum() < FINGERPRINT_MIN_ACTIVE * either.sum():
+            return 1.0
+        differing = np.unpackbits(np.bitwise_xor(a[both], b[both])).sum()
+        return float(differing) / float(both.sum() * a.shape[1] * 8)
+
+class TranscriptionCache:
+    """LRU cache bounded by entry count and bytes"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 8 * 1024 * 1024,
+                 use_fingerprint: bool = True, max_bit_error_rate: float = 0.08):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.use_fingerprint = use_fingerprint
+        self.max_bit_error_rate = max_bit_error_rate
+
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._fingerprints: Dict[str, AudioFingerprint] = {}
+        self._buckets: Dict[int, List[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits_exact": 0,
+            "hits_fingerprint": 0,
+            "misses": 0,
+            "evictions": 0
+        }
+
+    @staticmethod
+    def content_key(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def fingerprint(self, content: bytes) -> Optional[AudioFingerprint]:
+        if not self.use_fingerprint:
+            return None
+        try:
+            return AudioFingerprint.from_wav(content)
+        except Exception as e:
+            logger.debug(f"Fingerprint failed: {e}")
+            return None
+
+    def lookup(self, content: bytes) -> Tuple[Optional[Dict[str, Any]], str, Optional[AudioFingerprint]]:
+        """Exact lookup first; the fingerprint is only computed on an exact miss"""
+        key = self.content_key(content)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits_exact"] += 1
+                return entry[0], key, None
+
+        fingerprint = self.fingerprint(content)
+        return self.match(fingerprint), key, fingerprint
+
+    def match(self, fingerprint: Optional[AudioFingerprint]) -> Optional[Dict[str, Any]]:
+        """Perceptual lookup after an exact miss; counts the miss if nothing is close enough"""
+        with self._lock:
+            if fingerprint is not None:
+                for bucket in (fingerprint.bucket() - 1, fingerprint.bucket(), fingerprint.bucket() + 1):
+                    for candidate_key in self._buckets.get(bucket, ()):
+                        candidate = self._fingerprints[candidate_key]
+                        if fingerprint.bit_error_rate(candidate) <= self.max_bit_error_rate:
+                            self._entries.move_to_end(candidate_key)
+                            self.stats["hits_fingerprint"] += 1
+                            return self._entries[candidate_key][0]
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any], fingerprint: Optional[AudioFingerprint] = None):
+        size = len(json.dumps(result, default=str).encode("utf-8"))
+        if fingerprint is not None:
+            size += fingerprint.bits.nbytes + fingerprint.active.nbytes
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (result, size)
+            self._bytes += size
+            if fingerprint is not None:
+                self._fingerprints[key] = fingerprint
+                self._buckets.setdefault(fingerprint.bucket(), []).append(key)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+        fingerprint = self._fingerprints.pop(key, None)
+        if fingerprint is not None:
+            bucket = self._buckets.get(fingerprint.bucket(), [])
+            if key in bucket:
+                bucket.remove(key)
+            if not bucket:
+                self._buckets.pop(fingerprint.bucket(), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+            self._buckets.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "fingerprint_enabled": self.use_fingerprint
+            }
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+🎤 GENTLEMAN STT Voice Activity Detection
+═══════════════════════════════════════════════════════════════
+Vectorized energy/zero-crossing VAD that trims silence before Whisper
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from audio_utils import WHISPER_SAMPLE_RATE, resample
+
+logger = logging.getLogger("gentleman-stt-vad")
+
+class VADResult:
+    """Speech-only audio plus the mapping back to the original timeline"""
+
+    def __init__(self, samples: np.ndarray, regions: List[Tuple[int, int]],
+                 original_samples: int, gap_samples: int, sample_rate: int = WHISPER_SAMPLE_RATE):
+        self.samples = samples
+        self.regions = regions
+        self.sample_rate = sample_rate
+        self.original_duration = original_samples / sample_rate
+        self.output_duration = len(samples) / sample_rate
+
+        # (Start im getrimmten Audio, Start im Original, Länge) in Sekunden
+        self._time_map: List[Tuple[float, float, float]] = []
+        offset = 0
+        for start, end in regions:
+            self._time_map.append((offset / sample_rate, start / sample_rate, (end - start) / sample_rate))
+            offset += (end - start) + gap_samples
+
+    @property
+    def is_silent(self) -> bool:
+        return not self.regions
+
+    @property
+    def removed_fraction(self) -> float:
+        if self.original_duration <= 0:
+            return 0.0
+        return max(0.0, 1.0 - self.output_duration / self.original_duration)
+
+    def map_time(self, t: float) -> float:
+        """Map a timestamp in the trimmed audio back to the uploaded clip"""
+        for out_start, src_start, length in reversed(self._time_map):
+            if t >= out_start:
+                return src_start + min(t - out_start, length)
+        return self._time_map[0][1] if self._time_map else t
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "original_duration": round(self.original_duration, 3),
+            "speech_duration": round(self.output_duration, 3),
+            "removed_fraction": round(self.removed_fraction, 4),
+            "speech_regions": [
+                [round(start / self.sample_rate, 3), round(end / self.sample_rate, 3)]
+                for start, end in self.regions
+            ]
+        }
+
+class VoiceActivityDetector:
+    """Frame-based VAD on log energy with a zero-crossing assist for fricatives"""
+
+    def __init__(self, frame_ms: int = 30, margin_db: float = 12.0, silence_floor_db: float = -50.0,
+                 min_speech_ms: int = 90, hangover_ms: int = 240, max_pause_ms: int = 600,
+                 padding_ms: int = 150, gap_ms: int = 200):
+        self.frame_ms = frame_ms
+        self.margin_db = margin_db
+        self.silence_floor_db = silence_floor_db
+        self.min_speech_ms = min_speech_ms
+        self.hangover_ms = hangover_ms
+        self.max_pause_ms = max_pause_ms
+        self.padding_ms = padding_ms
+        self.gap_ms = gap_ms
+
+    def _frames(self, ms: int) -> int:
+        return max(1, int(round(ms / self.frame_ms)))
+
+    def process(self, samples: np.ndarray, sample_rate: int) -> VADResult:
+        """Trim leading/trailing silence and shorten long pauses"""
+        samples = resample(samples, sample_rate, WHISPER_SAMPLE_RATE)
+        frame_length = WHISPER_SAMPLE_RATE * self.frame_ms // 1000
+        gap_samples = WHISPER_SAMPLE_RATE * self.gap_ms // 1000
+        frame_count = len(samples) // frame_length
+
+        if frame_count == 0:
+            return VADResult(np.zeros(0, dtype=np.float32), [], len(samples), gap_samples)
+
+        frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+        energy_db = 10.0 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        peak_db = float(energy_db.max())
+        if peak_db < self.silence_floor_db:
+            return VADResult(np.zeros(0, dtype=np.float32), [], len(samples), gap_samples)
+
+        # Adaptiver Schwellwert: Rauschboden + Marge, aber nie über Peak - 15 dB
+        noise_floor_db = float(np.percentile(energy_db, 10))
+        threshold_db = min(max(noise_floor_db + self.margin_db, self.silence_floor_db), peak_db - 15.0)
+
+        speech = (energy_db > threshold_db) | ((energy_db > threshold_db - 6.0) & (zcr > 0.3))
+
+        # Kurze Ausreißer entfernen, danach Hangover anwenden
+        speech = self._remove_short_runs(speech, self._frames(self.min_speech_ms))
+        hangover = self._frames(self.hangover_ms)
+        speech = np.convolve(speech.astype(np.int32), np.ones(hangover, dtype=np.int32), mode="full")[:frame_count] > 0
+
+        regions = self._regions(speech, frame_length, len(samples))
+        if not regions:
+            return VADResult(np.zeros(0, dtype=np.float32), [], len(samples), gap_samples)
+
+        gap = np.zeros(gap_samples, dtype=np.float32)
+        parts = []
+        for index, (start, end) in enumerate(regions):
+            if index:
+                parts.append(gap)
+            parts.append(samples[start:end])
+
+        return VADResult(np.concatenate(parts).astype(np.float32), regions, len(samples), gap_samples)
+
+    @staticmethod
+    def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        padded = np.concatenate(([False], mask, [False]))
+        changes = np.flatnonzero(padded[1:] != padded[:-1])
+        return changes[0::2], changes[1::2]
+
+    def _remove_short_runs(self, mask: np.ndarray, min_length: int) -> np.ndarray:
+        starts, ends = self._runs(mask)
+        cleaned = mask.copy()
+        for start, end in zip(starts, ends):
+            if end - start < min_length:
+                cleaned[start:end] = False
+        return cleaned
+
+    def _regions(self, speech: np.ndarray, frame_length: int, total_samples: int) -> List[Tuple[int, int]]:
+        starts, ends = self._runs(speech)
+        max_pause = self._frames(self.max_pause_ms)
+        padding = WHISPER_SAMPLE_RATE * self.padding_ms // 1000
+
+        merged: List[List[int]] = []
+        for start, end in zip(starts, ends):
+            if merged and start - merged[-1][1] < max_pause:
+                merged[-1][1] = end
+            else:
+                merged.append([start, end])
+
+        regions = []
+        for start, end in merged:
+            region_start = int(max(0, start * frame_length - padding))
+            region_end = int(min(total_samples, end * frame_length + padding))
+            if regions and region_start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], region_end)
+            else:
+                regions.append((region_start, region_end))
+        return regions
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+🗣️ GENTLEMAN TTS Audio Cache
+═══════════════════════════════════════════════════════════════
+Phrase-level cache for synthesized PCM: memory LRU + mmap'd disk tier
+"""
+
+import os
+import mmap
+import struct
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from tts_pool import RenderedAudio
+
+logger = logging.getLogger("gentleman-tts-cache")
+
+# 📦 Disk-Format: Magic, Sample Rate, Channels, Sample Width, Frame-Bytes
+DISK_MAGIC = b"GTTS"
+DISK_HEADER = struct.Struct("<4sIHHQ")
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC + collapsed whitespace, so trivially different inputs share an entry"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def make_cache_key(text: str, voice: str, speed: float, audio_format: str) -> str:
+    raw = "\x1f".join([normalize_text(text), voice, f"{speed:.2f}", audio_format])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class SynthesisCache:
+    """Two-tier cache: in-memory LRU bounded by bytes, then memory-mapped files"""
+
+    def __init__(self, max_memory_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+
+        self._memory: "OrderedDict[str, RenderedAudio]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "evictions_memory": 0,
+            "evictions_disk": 0
+        }
+
+        if self.disk_dir is not None:
+            try:
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+                self._disk_bytes = sum(entry.stat().st_size for entry in self.disk_dir.glob("*.pcm"))
+            except OSError as e:
+                logger.warning(f"⚠️ TTS disk cache disabled: {e}")
+                self.disk_dir = None
+
+    # 🔍 Lookup
+    def get(self, key: str) -> Optional[RenderedAudio]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.stats["hits_memory"] += 1
+                return audio
+
+        audio = self._read_disk(key)
+        if audio is not None:
+            self.stats["hits_disk"] += 1
+            self._put_memory(key, audio)
+            return audio
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, audio: RenderedAudio):
+        self._put_memory(key, audio)
+        self._write_disk(key, audio)
+
+    # 🧠 Memory Tier
+    def _put_memory(self, key: str, audio: RenderedAudio):
+        size = len(audio.frames)
+        if size > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous.frames)
+            self._memory[key] = audio
+            self._memory_bytes += size
+
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted.frames)
+                self.stats["evictions_memory"] += 1
+
+    # 💾 Disk Tier
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pcm"
+
+    def _read_disk(self, key: str) -> Optional[RenderedAudio]:
+        if self.disk_dir is None:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, sample_rate, channels, sample_width, length = DISK_HEADER.unpack_from(mapped, 0)
+                if magic != DISK_MAGIC or DISK_HEADER.size + length > len(mapped):
+                    raise ValueError("corrupt cache entry")
+                frames = mapped[DISK_HEADER.size:DISK_HEADER.size + length]
+            os.utime(path)  # LRU-Reihenfolge für die Disk-Eviction
+            return RenderedAudio(sample_rate, channels, sample_width, frames)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"⚠️ Dropping unreadable cache entry {key[:12]}: {e}")
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+
+    def _write_disk(self, key: str, audio: RenderedAudio):
+        if self.disk_dir is None:
+            return
+
+        path = self._path(key)
+        if path.exists():
+            return
+
+        size = DISK_HEADER.size + len(audio.frames)
+        temp_path = path.with_suffix(f".tmp{os.getpid()}")
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(DISK_HEADER.pack(DISK_MAGIC, audio.sample_rate, audio.channels,
+                                         audio.sample_width, len(audio.frames)))
+                f.write(audio.frames)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write TTS cache entry: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._disk_bytes += size
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        entries = []
+        for entry in self.disk_dir.glob("*.pcm"):
+            try:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry))
+            except OSError:
+                continue
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        # Bis auf 90% des Budgets räumen, damit nicht bei jedem Write evicted wird
+        target = int(self.max_disk_bytes * 0.9)
+        for _, size, entry in entries:
+            if total <= target:
+                break
+            try:
+                entry.unlink()
+                total -= size
+                self.stats["evictions_disk"] += 1
+            except OSError:
+                continue
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "max_memory_bytes": self.max_memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "disk_dir": str(self.disk_dir) if self.disk_dir else None
+            }
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+🗣️ GENTLEMAN TTS Audio Encoders
+═══════════════════════════════════════════════════════════════
+Incremental WAV/PCM/FLAC/Opus encoding and sample-rate negotiation
+"""
+
+import time
+import shutil
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from streaming import wav_stream_header
+
+logger = logging.getLogger("gentleman-tts-encoders")
+
+# 🎵 Unterstützte Formate
+MEDIA_TYPES = {
+    "wav": "audio/wav",
+    "pcm": "audio/L16",
+    "flac": "audio/flac",
+    "opus": "audio/ogg"
+}
+
+ACCEPT_MAP = {
+    "audio/ogg": "opus",
+    "audio/opus": "opus",
+    "audio/flac": "flac",
+    "audio/x-flac": "flac",
+    "audio/l16": "pcm",
+    "audio/pcm": "pcm",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav"
+}
+
+SUPPORTED_SAMPLE_RATES = (8000, 12000, 16000, 22050, 24000, 44100, 48000)
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+FFMPEG_ARGS = {
+    "flac": ["-c:a", "flac", "-f", "flac"],
+    "opus": ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-f", "ogg"]
+}
+
+class UnsupportedFormatError(Exception):
+    """Raised when a requested output format cannot be produced"""
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+def available_formats() -> Tuple[str, ...]:
+    if ffmpeg_available():
+        return tuple(MEDIA_TYPES)
+    return ("wav", "pcm")
+
+def negotiate_format(requested: Optional[str], accept_header: Optional[str]) -> str:
+    """Explicit request field wins, then the Accept header, then WAV"""
+    if requested:
+        fmt = requested.lower()
+        if fmt == "ogg":
+            fmt = "opus"
+        if fmt not in MEDIA_TYPES:
+            raise UnsupportedFormatError(f"Unknown audio format '{requested}'")
+        if fmt not in available_formats():
+            raise UnsupportedFormatError(f"Audio format '{fmt}' requires ffmpeg")
+        return fmt
+
+    for item in (accept_header or "").split(","):
+        media_type = item.split(";")[0].strip().lower()
+        fmt = ACCEPT_MAP.get(media_type)
+        if fmt and fmt in available_formats():
+            return fmt
+    return "wav"
+
+def negotiate_sample_rate(fmt: str, requested: Optional[int], source_rate: int) -> int:
+    """Pick the output rate: requested (snapped to a supported value) or the engine rate"""
+    target = requested or source_rate
+    allowed = OPUS_SAMPLE_RATES if fmt == "opus" else SUPPORTED_SAMPLE_RATES
+    if target in allowed:
+        return target
+    # Nächsthöhere unterstützte Rate, sonst die höchste
+    higher = [rate for rate in allowed if rate >= target]
+    return higher[0] if higher else allowed[-1]
+
+def resample_pcm16(frames: bytes, channels: int, source_rate: int, target_rate: int) -> bytes:
+    """Linear resampling of interleaved signed 16-bit PCM"""
+    if source_rate == target_rate or not frames:
+        return frames
+
+    samples = np.frombuffer(frames, dtype="<i2").reshape(-1, channels).astype(np.float32)
+    source_length = samples.shape[0]
+    target_length = max(1, int(round(source_length * target_rate / source_rate)))
+    positions = np.linspace(0, source_length - 1, target_length)
+    resampled = np.empty((target_length, channels), dtype=np.float32)
+    for channel in range(channels):
+        resampled[:, channel] = np.interp(positions, np.arange(source_length), samples[:, channel])
+    return np.clip(np.round(resampled), -32768, 32767).astype("<i2").tobytes()
+
+class StreamEncoder:
+    """Base class: feed PCM chunks, receive encoded bytes as they become available"""
+
+    def __init__(self, fmt: str, sample_rate: int, channels: int, sample_width: int = 2):
+        self.format = fmt
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.encode_seconds = 0.0
+
+    @property
+    def media_type(self) -> str:
+        if self.format == "pcm":
+            return f"audio/L16;rate={self.sample_rate};channels={self.channels}"
+        return MEDIA_TYPES[self.format]
+
+    @property
+    def audio_seconds(self) -> float:
+        return self.bytes_in / float(self.sample_rate * self.channels * self.sample_width)
+
+    async def start(self) -> bytes:
+        return b""
+
+    async def feed(self, pcm: bytes) -> bytes:
+        return b""
+
+    async def finish(self) -> bytes:
+        return b""
+
+    def _account(self, started: float, pcm: bytes, output: bytes) -> bytes:
+        self.encode_seconds += time.perf_counter() - started
+        self.bytes_in += len(pcm)
+        self.bytes_out += len(output)
+        return output
+
+class WavStreamEncoder(StreamEncoder):
+    """WAV with open-ended header, followed by raw frames"""
+
+    async def start(self) -> bytes:
+        header = wav_stream_header(self.sample_rate, self.channels, self.sample_width)
+        self.bytes_out += len(header)
+        return header
+
+    async def feed(self, pcm: bytes) -> bytes:
+        return self._account(time.perf_counter(), pcm, pcm)
+
+class RawPCMEncoder(StreamEncoder):
+    """Headerless signed 16-bit little-endian PCM"""
+
+    async def feed(self, pcm: bytes) -> bytes:
+        return self._account(time.perf_counter(), pcm, pcm)
+
+class FFmpegStreamEncoder(StreamEncoder):
+    """FLAC/Opus via a long-running ffmpeg process fed through stdin"""
+
+    def __init__(self, fmt: str, sample_rate: int, channels: int, sample_width: int = 2):
+        super().__init__(fmt, sample_rate, channels, sample_width)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._output: Optional[asyncio.Queue] = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> bytes:
+        self._output = asyncio.Queue()
+        self._process = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(self.sample_rate), "-ac", str(self.channels), "-i", "pipe:0",
+            *FFMPEG_ARGS[self.format], "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self._reader = asyncio.create_task(self._read_output())
+        return b""
+
+    async def _read_output(self):
+        while True:
+            chunk = await self._process.stdout.read(16384)
+            if not chunk:
+                break
+            await self._output.put(chunk)
+
+    def _drain_output(self) -> bytes:
+        chunks = []
+        while not self._output.empty():
+            chunks.append(self._output.get_nowait())
+        return b"".join(chunks)
+
+    async def feed(self, pcm: bytes) -> bytes:
+        started = time.perf_counter()
+        self._process.stdin.write(pcm)
+        await self._process.stdin.drain()
+        # Dem Encoder kurz Zeit geben, fertige Pages auszugeben
+        await asyncio.sleep(0)
+        return self._account(started, pcm, self._drain_output())
+
+    async def finish(self) -> bytes:
+        started = time.perf_counter()
+        self._process.stdin.close()
+        await self._reader
+        await self._process.wait()
+        return self._account(started, b"", self._drain_output())
+
+    def abort(self):
+        if self._process and self._process.returncode is None:
+            self._process.kill()
+
+def create_encoder(fmt: str, sample_rate: int, channels: int, sample_width: int = 2) -> StreamEncoder:
+    if sample_width != 2:
+        raise UnsupportedFormatError("Only 16-bit PCM input is supported")
+    if fmt == "wav":
+        return WavStreamEncoder(fmt, sample_rate, channels, sample_width)
+    if fmt == "pcm":
+        return RawPCMEncoder(fmt, sample_rate, channels, sample_width)
+    if fmt in FFMPEG_ARGS:
+        return FFmpegStreamEncoder(fmt, sample_rate, channels, sample_width)
+    raise UnsupportedFormatError(f"Unknown audio format '{fmt}'")
+
+class FormatStats:
+    """Per-format transfer and encode cost counters for /stats"""
+
+    def __init__(self):
+        self._formats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, encoder: StreamEncoder):
+        entry = self._formats.setdefault(encoder.format, {
+            "requests": 0,
+            "bytes_out": 0,
+            "audio_seconds": 0.0,
+            "encode_seconds": 0.0
+        })
+        entry["requests"] += 1
+        entry["bytes_out"] += encoder.bytes_out
+        entry["audio_seconds"] += encoder.audio_seconds
+        entry["encode_seconds"] += encoder.encode_seconds
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for fmt, entry in self._formats.items():
+            audio_seconds = entry["audio_seconds"]
+            result[fmt] = {
+                **entry,
+                "bytes_per_second": entry["bytes_out"] / audio_seconds if audio_seconds else 0.0,
+                "encode_realtime_factor": entry["encode_seconds"] / audio_seconds if audio_seconds else 0.0
+            }
+        return result
@@ -6,18 +6,31 @@ FastAPI Server für Text-to-Speech
 """
 
 import os
+import time
+import asyncio
 import logging
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional
 from datetime import datetime
-import tempfile
-import io
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
+from audio_cache import SynthesisCache, make_cache_key
+from encoders import (
+    FFmpegStreamEncoder, FormatStats, StreamEncoder, UnsupportedFormatError,
+    available_formats, create_encoder, negotiate_format, negotiate_sample_rate, resample_pcm16
+)
+from streaming import split_sentences
+from tts_pool import (
+    PoolFullError, RenderedAudio, SynthesisTimeoutError, TTSWorkerPool
+)
+
+# Format der gecachten Satz-Audios (Rohdaten vor jeglichem Encoding)
+CACHE_AUDIO_FORMAT = "pcm"
+
 # 🎯 Logging Setup
 logging.basicConfig(
     level=logging.INFO,
@@ -49,6 +62,9 @@ class TTSRequest(BaseModel):
     voice: str = "default"
     speed: float = 1.0
     emotion: Optional[str] = None
+    language: Optional[str] = None      # mit voice="default": passende Stimme wählen
+    format: Optional[str] = None        # wav, pcm, flac, opus (sonst Accept-Header)
+    sample_rate: Optional[int] = None   # Ziel-Samplerate, Standard: Engine-Rate
 
 class TTSResponse(BaseModel):
     success: bool
@@ -60,17 +76,34 @@ class HealthResponse(BaseModel):
     status: str
     tts_engine_loaded: bool
     uptime: float
+    workers: int
+    busy_workers: int
+    queue_depth: int
 
 # 📊 Global State
 class TTSState:
     def __init__(self):
-        self.tts_engine = None
+        self.pool = TTSWorkerPool(
+            size=int(os.getenv("GENTLEMAN_TTS_WORKERS", str(min(4, os.cpu_count() or 1)))),
+            max_queue=int(os.getenv("GENTLEMAN_TTS_MAX_QUEUE", "32")),
+            timeout=float(os.getenv("GENTLEMAN_TTS_TIMEOUT", "30"))
+        )
+        self.cache = SynthesisCache(
+            max_memory_bytes=int(float(os.getenv("GENTLEMAN_TTS_CACHE_MEMORY_MB", "64")) * 1024 * 1024),
+            disk_dir=os.getenv("GENTLEMAN_TTS_CACHE_DIR", "/app/audio/cache") or None,
+            max_disk_bytes=int(float(os.getenv("GENTLEMAN_TTS_CACHE_DISK_MB", "512")) * 1024 * 1024)
+        )
+        self.format_stats = FormatStats()
         self.is_ready = False
+        self.start_time = time.time()
         self.stats = {
             "requests_total": 0,
             "requests_successful": 0,
             "requests_failed": 0,
-            "average_processing_time": 0.0
+            "average_processing_time": 0.0,
+            "average_time_to_first_audio": 0.0,
+            "sentences_synthesized": 0,
+            "sentences_from_cache": 0
         }
 
 state = TTSState()
@@ -82,122 +115,238 @@ async def startup_event():
     logger.info("🗣️ Starting Gentleman TTS Service...")
     
     try:
-        # Try to import and initialize TTS engine
-        try:
-            import pyttsx3
-            state.tts_engine = pyttsx3.init()
-            logger.info("✅ pyttsx3 TTS engine loaded")
-        except Exception as e:
-            logger.warning(f"⚠️ pyttsx3 not available: {e}")
-            state.tts_engine = None
+        # Jeder Worker-Prozess initialisiert seine eigene pyttsx3 Engine
+        await state.pool.start()
+        if not state.pool.engines_loaded:
+            logger.warning(f"⚠️ pyttsx3 not available: {state.pool.engine_error}")
         
         state.is_ready = True
         logger.info("✅ Gentleman TTS Service ready!")
         
+        asyncio.create_task(prewarm_cache())
+        
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
-        state.is_ready = True  # Continue for testing
+
+async def prewarm_cache():
+    """Synthesize frequently used phrases into the cache in the background"""
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prewarm_phrases.txt")
+    phrase_file = os.getenv("GENTLEMAN_TTS_PREWARM_FILE", default_path)
+    if not phrase_file or not os.path.exists(phrase_file):
+        return
+    
+    with open(phrase_file, "r", encoding="utf-8") as f:
+        phrases = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    
+    # Dieselbe Stimme wie bei echten Requests (ha-bridge: voice="default", language="de"), sonst trifft der Cache-Key nie
+    languages = [lang.strip() for lang in os.getenv("GENTLEMAN_TTS_PREWARM_LANGUAGES", "de").split(",") if lang.strip()]
+    voices = list(dict.fromkeys(state.pool.catalog.resolve("default", lang) for lang in languages)) or ["default"]
+    
+    warmed = 0
+    for phrase in phrases:
+        for sentence in split_sentences(phrase):
+            for voice in voices:
+                try:
+                    await render_sentence(sentence, voice, 1.0)
+                    warmed += 1
+                except Exception as e:
+                    logger.warning(f"⚠️ Prewarm failed for '{sentence[:30]}' ({voice}): {e}")
+    logger.info(f"🔥 TTS cache prewarmed with {warmed} sentence(s) for voice(s) {', '.join(voices)}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop TTS worker processes"""
+    await state.pool.shutdown()
+
+# 🔊 Sentence Rendering
+async def render_sentence(text: str, voice: str, speed: float) -> RenderedAudio:
+    """Synthesize a single sentence, served from the phrase cache when possible"""
+    key = make_cache_key(text, voice, speed, CACHE_AUDIO_FORMAT)
+    cached = state.cache.get(key)
+    if cached is not None:
+        state.stats["sentences_from_cache"] += 1
+        return cached
+    
+    rendered = await state.pool.synthesize(text, voice=voice, speed=speed)
+    # Stille-Fallback ohne Engine nicht cachen
+    if state.pool.engines_loaded:
+        state.cache.put(key, rendered)
+        state.pool.catalog.note_sample_rate(voice, rendered.sample_rate)
+    return rendered
+
+def record_request_stats(processing_time: float, time_to_first_audio: float):
+    """Update running averages after a request finished streaming"""
+    state.stats["requests_successful"] += 1
+    count = state.stats["requests_successful"]
+    state.stats["average_processing_time"] = (
+        (state.stats["average_processing_time"] * (count - 1) + processing_time) / count
+    )
+    state.stats["average_time_to_first_audio"] = (
+        (state.stats["average_time_to_first_audio"] * (count - 1) + time_to_first_audio) / count
+    )
+
+async def stream_sentences(first: RenderedAudio, remaining: list, request: TTSRequest,
+                           encoder: StreamEncoder, start_time: float,
+                           time_to_first_audio: float) -> AsyncIterator[bytes]:
+    """Yield encoded audio, rendering the next sentence while the current one is sent"""
+    pending = None
+    finished = False
+    
+    def encode_input(rendered: RenderedAudio) -> bytes:
+        return resample_pcm16(rendered.frames, rendered.channels, rendered.sample_rate, encoder.sample_rate)
+    
+    try:
+        header = await encoder.start()
+        chunk = header + await encoder.feed(encode_input(first))
+        if chunk:
+            yield chunk
+        
+        def prefetch(index: int):
+            if index >= len(remaining):
+                return None
+            return asyncio.ensure_future(render_sentence(remaining[index], request.voice, request.speed))
+        
+        pending = prefetch(0)
+        for index in range(len(remaining)):
+            rendered = await pending
+            pending = prefetch(index + 1)
+            if (rendered.channels, rendered.sample_width) != (first.channels, first.sample_width):
+                logger.warning("⚠️ Sentence audio format changed mid-stream, skipping chunk")
+                continue
+            state.stats["sentences_synthesized"] += 1
+            chunk = await encoder.feed(encode_input(rendered))
+            if chunk:
+                yield chunk
+        
+        tail = await encoder.finish()
+        finished = True
+        if tail:
+            yield tail
+        
+        state.format_stats.record(encoder)
+        record_request_stats(time.time() - start_time, time_to_first_audio)
+        
+    except Exception as e:
+        # Header ist bereits gesendet, Fehler kann nur noch geloggt werden
+        state.stats["requests_failed"] += 1
+        logger.error(f"❌ Streaming synthesis failed: {e}")
+    finally:
+        # Client hat die Verbindung getrennt: vorgerenderten Satz verwerfen
+        if pending is not None and not pending.done():
+            pending.cancel()
+        if not finished and isinstance(encoder, FFmpegStreamEncoder):
+            encoder.abort()
 
 # 🗣️ Main TTS Endpoint
 @app.post("/synthesize")
-async def synthesize_speech(request: TTSRequest):
-    """Convert text to speech"""
+async def synthesize_speech(request: TTSRequest, http_request: Request):
+    """Convert text to speech, streaming audio sentence by sentence"""
     if not state.is_ready:
         raise HTTPException(status_code=503, detail="Service not ready")
     
-    start_time = datetime.now()
+    start_time = time.time()
     state.stats["requests_total"] += 1
     
+    request.voice = state.pool.catalog.resolve(request.voice, request.language)
+    sentences = split_sentences(request.text)
+    if not sentences:
+        state.stats["requests_failed"] += 1
+        raise HTTPException(status_code=400, detail="No text to synthesize")
+    
     try:
-        # Generate speech audio
-        if state.tts_engine:
-            # Use pyttsx3 for local TTS
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                state.tts_engine.save_to_file(request.text, temp_file.name)
-                state.tts_engine.runAndWait()
-                
-                # Read the generated audio file
-                with open(temp_file.name, "rb") as audio_file:
-                    audio_data = audio_file.read()
-                
-                os.unlink(temp_file.name)
-        else:
-            # Fallback: Generate silence for testing
-            import wave
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-                with wave.open(temp_file.name, 'wb') as wav_file:
-                    wav_file.setnchannels(1)  # Mono
-                    wav_file.setsampwidth(2)  # 16-bit
-                    wav_file.setframerate(22050)  # Sample rate
-                    # Generate 1 second of silence
-                    silence = b'\x00\x00' * 22050
-                    wav_file.writeframes(silence)
-                
-                with open(temp_file.name, "rb") as audio_file:
-                    audio_data = audio_file.read()
-                
-                os.unlink(temp_file.name)
-        
-        # Calculate processing time
-        processing_time = (datetime.now() - start_time).total_seconds()
-        
-        # Update stats
-        state.stats["requests_successful"] += 1
-        state.stats["average_processing_time"] = (
-            (state.stats["average_processing_time"] * (state.stats["requests_successful"] - 1) + processing_time) 
-            / state.stats["requests_successful"]
-        )
+        output_format = negotiate_format(request.format, http_request.headers.get("accept"))
+    except UnsupportedFormatError as e:
+        state.stats["requests_failed"] += 1
+        raise HTTPException(status_code=415, detail=str(e))
+    
+    try:
+        # Erster Satz wird vor der Response gerendert, damit Fehler noch als HTTP-Status ankommen
+        first = await render_sentence(sentences[0], request.voice, request.speed)
+        state.stats["sentences_synthesized"] += 1
+        time_to_first_audio = time.time() - start_time
         
-        # Return audio as streaming response
-        return StreamingResponse(
-            io.BytesIO(audio_data),
-            media_type="audio/wav",
-            headers={
-                "Content-Disposition": "attachment; filename=speech.wav",
-                "X-Processing-Time": str(processing_time),
-                "X-Voice-Used": request.voice
-            }
-        )
+        sample_rate = negotiate_sample_rate(output_format, request.sample_rate, first.sample_rate)
+        encoder = create_encoder(output_format, sample_rate, first.channels, first.sample_width)
         
+    except PoolFullError as e:
+        state.stats["requests_failed"] += 1
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except SynthesisTimeoutError as e:
+        state.stats["requests_failed"] += 1
+        raise HTTPException(status_code=504, detail=str(e))
+    except UnsupportedFormatError as e:
+        state.stats["requests_failed"] += 1
+        raise HTTPException(status_code=415, detail=str(e))
     except Exception as e:
         state.stats["requests_failed"] += 1
         logger.error(f"❌ Speech synthesis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Speech synthesis failed: {str(e)}")
+    
+    logger.info(f"🔊 First audio after {time_to_first_audio:.3f}s ({len(sentences)} sentence(s), {output_format})")
+    
+    extension = "ogg" if output_format == "opus" else output_format
+    return StreamingResponse(
+        stream_sentences(first, sentences[1:], request, encoder, start_time, time_to_first_audio),
+        media_type=encoder.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=speech.{extension}",
+            "X-Time-To-First-Audio": f"{time_to_first_audio:.4f}",
+            "X-Sentence-Count": str(len(sentences)),
+            "X-Sample-Rate": str(sample_rate),
+            "X-Voice-Used": request.voice
+        }
+    )
 
 # 🏥 Health Check
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
+    pool_status = state.pool.get_status()
     return HealthResponse(
         status="healthy" if state.is_ready else "starting",
-        tts_engine_loaded=state.tts_engine is not None,
-        uptime=0.0  # Simplified
+        tts_engine_loaded=state.pool.engines_loaded > 0,
+        uptime=time.time() - state.start_time,
+        workers=pool_status["workers"],
+        busy_workers=pool_status["busy"],
+        queue_depth=pool_status["queue_depth"]
     )
 
 # 📊 Stats Endpoint
 @app.get("/stats")
 async def get_stats():
     """Get service statistics"""
-    return state.stats
+    return {
+        **state.stats,
+        "pool": state.pool.get_status(),
+        "cache": state.cache.get_stats(),
+        "formats": state.format_stats.to_dict(),
+        "available_formats": list(available_formats())
+    }
 
 # 🎵 Available Voices
 @app.get("/voices")
-async def get_voices():
-    """Get available TTS voices"""
-    if state.tts_engine:
-        try:
-            voices = state.tts_engine.getProperty('voices')
-            return {
-                "voices": [{"id": voice.id, "name": voice.name} for voice in voices] if voices else [],
-                "default": "default"
-            }
-        except:
-            pass
+async def get_voices(http_request: Request, language: Optional[str] = None):
+    """Get available TTS voices (cached catalog, supports If-None-Match)"""
+    catalog = state.pool.catalog
+    # Gefilterte Listen sind eigene Repräsentationen und brauchen ein eigenes ETag
+    etag = catalog.etag if not language else f'{catalog.etag[:-1]}-{language.lower()}"'
+    headers = {"ETag": etag, "Cache-Control": "max-age=300"}
     
-    return {
-        "voices": [{"id": "default", "name": "Default Voice"}],
-        "default": "default"
-    }
+    if_none_match = http_request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    voices = catalog.list(language)
+    if not len(catalog):
+        voices = [{"id": "default", "name": "Default Voice", "languages": [], "gender": None,
+                   "age": None, "sample_rate": None}]
+    
+    return JSONResponse({
+        "voices": voices,
+        "default": "default",
+        "default_voice_id": catalog.default_voice,
+        "language": language
+    }, headers=headers)
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
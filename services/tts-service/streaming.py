@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+🗣️ GENTLEMAN TTS Streaming Helpers
+═══════════════════════════════════════════════════════════════
+Sentence chunking and streamable WAV framing for incremental synthesis
+"""
+
+import re
+import struct
+from typing import List
+
+# Satzende: . ! ? … (auch mit schließenden Anführungszeichen) oder Zeilenumbruch
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])["\'»”)]*\s+|\n+')
+CLAUSE_BOUNDARY = re.compile(r'(?<=[,;:])\s+')
+
+MIN_CHUNK_CHARS = 20
+MAX_CHUNK_CHARS = 200
+
+# Platzhalter-Größe für Streaming-WAV (Länge ist beim Senden des Headers unbekannt)
+STREAMING_DATA_SIZE = 0xFFFFFFFF
+
+def split_sentences(text: str, min_chars: int = MIN_CHUNK_CHARS, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """Split text into synthesis chunks of roughly one sentence each
+
+    Very short fragments are merged with their successor so prosody does not
+    break after "Ja." or "Okay.", overlong sentences are split at clause
+    boundaries so the first audio chunk is not delayed by a run-on sentence.
+    """
+    parts = [p.strip() for p in SENTENCE_BOUNDARY.split(text.strip()) if p and p.strip()]
+
+    chunks: List[str] = []
+    for part in parts:
+        if len(part) > max_chars:
+            current = ""
+            for clause in CLAUSE_BOUNDARY.split(part):
+                if current and len(current) + len(clause) + 1 > max_chars:
+                    chunks.append(current)
+                    current = clause
+                else:
+                    current = f"{current} {clause}".strip()
+            if current:
+                chunks.append(current)
+        else:
+            chunks.append(part)
+
+    merged: List[str] = []
+    carry = ""
+    for chunk in chunks:
+        candidate = f"{carry} {chunk}".strip()
+        if len(candidate) < min_chars:
+            carry = candidate
+            continue
+        merged.append(candidate)
+        carry = ""
+
+    if carry:
+        if merged:
+            merged[-1] = f"{merged[-1]} {carry}"
+        else:
+            merged.append(carry)
+
+    return merged
+
+def wav_stream_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """RIFF/WAVE header with open-ended sizes for progressive playback"""
+    byte_rate = sample_rate * channels * sample_width
+    block_align = channels * sample_width
+    return b"".join([
+        b"RIFF",
+        struct.pack("<I", STREAMING_DATA_SIZE),
+        b"WAVE",
+        b"fmt ",
+        struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8),
+        b"data",
+        struct.pack("<I", STREAMING_DATA_SIZE),
+    ])
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+🗣️ GENTLEMAN TTS Worker Pool
+═══════════════════════════════════════════════════════════════
+Process pool where every worker owns its own pyttsx3 engine
+"""
+
+import os
+import wave
+import asyncio
+import logging
+import tempfile
+import itertools
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from voice_catalog import VoiceCatalog, describe_voice
+
+logger = logging.getLogger("gentleman-tts-pool")
+
+# Fallback ohne Engine: Stille in diesem Format
+FALLBACK_SAMPLE_RATE = 22050
+
+class PoolFullError(Exception):
+    """Raised when the job queue is at capacity"""
+
+class SynthesisTimeoutError(Exception):
+    """Raised when a worker does not answer within the request timeout"""
+
+class WorkerCrashedError(Exception):
+    """Raised when a worker process died while handling a job"""
+
+class RenderedAudio:
+    """PCM frames for one synthesized sentence"""
+
+    def __init__(self, sample_rate: int, channels: int, sample_width: int, frames: bytes):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frames = frames
+
+    @property
+    def duration(self) -> float:
+        return len(self.frames) / float(self.sample_rate * self.channels * self.sample_width)
+
+# ═══════════════════════════════════════════════════════════════
+# Worker-Prozess
+# ═══════════════════════════════════════════════════════════════
+
+def _describe_voices(engine) -> List[Dict[str, Any]]:
+    try:
+        voices = engine.getProperty('voices') or []
+        return [describe_voice(voice) for voice in voices]
+    except Exception:
+        return []
+
+def _synthesize(engine, base_rate, job: Dict[str, Any]) -> Dict[str, Any]:
+    if engine is None:
+        # Fallback: Generate silence for testing (1 second per sentence)
+        return {
+            "sample_rate": FALLBACK_SAMPLE_RATE,
+            "channels": 1,
+            "sample_width": 2,
+            "frames": b'\x00\x00' * FALLBACK_SAMPLE_RATE
+        }
+
+    voice = job.get("voice")
+    if voice and voice != "default":
+        engine.setProperty('voice', voice)
+    if base_rate:
+        engine.setProperty('rate', int(base_rate * job.get("speed", 1.0)))
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+        temp_path = temp_file.name
+    try:
+        engine.save_to_file(job["text"], temp_path)
+        engine.runAndWait()
+        with wave.open(temp_path, "rb") as wav_file:
+            return {
+                "sample_rate": wav_file.getframerate(),
+                "channels": wav_file.getnchannels(),
+                "sample_width": wav_file.getsampwidth(),
+                "frames": wav_file.readframes(wav_file.getnframes())
+            }
+    finally:
+        os.unlink(temp_path)
+
+def _worker_main(conn, worker_id: int):
+    """Entry point of a TTS worker process"""
+    engine = None
+    base_rate = None
+    error = None
+    default_voice = None
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+        base_rate = engine.getProperty('rate')
+        default_voice = engine.getProperty('voice')
+    except Exception as e:
+        error = str(e)
+
+    conn.send(("ready", {
+        "engine_loaded": engine is not None,
+        "error": error,
+        "voices": _describe_voices(engine) if engine else [],
+        "default_voice": default_voice
+    }))
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+
+        try:
+            result = _synthesize(engine, base_rate, job)
+            conn.send(("ok", result))
+        except Exception as e:
+            conn.send(("error", str(e)))
+        finally:
+            if engine is not None and default_voice:
+                try:
+                    engine.setProperty('voice', default_voice)
+                except Exception:
+                    pass
+
+# ═══════════════════════════════════════════════════════════════
+# Pool (Event-Loop-Seite)
+# ═══════════════════════════════════════════════════════════════
+
+class TTSWorker:
+    """Handle to one worker process"""
+
+    def __init__(self, worker_id: int, process, conn, info: Dict[str, Any]):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.info = info
+        self.jobs_done = 0
+
+    def kill(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+class TTSWorkerPool:
+    """Bounded pool of synthesis processes with timeouts and crash isolation"""
+
+    def __init__(self, size: int = 2, max_queue: int = 32, timeout: float = 30.0,
+                 start_timeout: float = 30.0):
+        self.size = max(1, size)
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+
+        self.workers: Dict[int, TTSWorker] = {}
+        self.catalog = VoiceCatalog()
+        self.engine_error: Optional[str] = None
+        self.engines_loaded = 0
+
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: Optional[asyncio.Queue] = None
+        self._io_executor = ThreadPoolExecutor(max_workers=self.size + 1, thread_name_prefix="tts-io")
+        # Spawns laufen parallel im Executor; next() auf itertools.count ist unter dem GIL atomar
+        self._worker_ids = itertools.count()
+        self._waiting = 0
+        self._busy = 0
+        self.stats = {
+            "jobs_completed": 0,
+            "jobs_failed": 0,
+            "jobs_rejected": 0,
+            "timeouts": 0,
+            "worker_restarts": 0
+        }
+
+    # 🚀 Lifecycle
+    async def start(self):
+        self._idle = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        workers = await asyncio.gather(*[
+            loop.run_in_executor(self._io_executor, self._spawn_worker) for _ in range(self.size)
+        ])
+        for worker in workers:
+            self._add_worker(worker)
+        logger.info(f"✅ TTS worker pool started ({self.size} workers, {self.engines_loaded} with engine)")
+
+    def _spawn_worker(self) -> TTSWorker:
+        worker_id = next(self._worker_ids)
+
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, worker_id),
+            name=f"tts-worker-{worker_id}", daemon=True
+        )
+        process.start()
+        child_conn.close()
+
+        try:
+            if not parent_conn.poll(self.start_timeout):
+                raise WorkerCrashedError(f"TTS worker {worker_id} did not start")
+            status, info = parent_conn.recv()
+        except (EOFError, OSError) as e:
+            process.kill()
+            raise WorkerCrashedError(f"TTS worker {worker_id} exited during startup: {e}")
+        except WorkerCrashedError:
+            process.kill()
+            raise
+        return TTSWorker(worker_id, process, parent_conn, info)
+
+    def _add_worker(self, worker: TTSWorker):
+        self.workers[worker.worker_id] = worker
+        if worker.info.get("engine_loaded"):
+            self.engines_loaded += 1
+            # Alle Worker nutzen dieselbe Engine: ein Katalog reicht
+            if not len(self.catalog):
+                self.catalog.load(worker.info.get("voices", []), worker.info.get("default_voice"))
+        else:
+            self.engine_error = worker.info.get("error")
+        self._idle.put_nowait(worker)
+
+    async def _replace_worker(self, worker: TTSWorker):
+        worker.kill()
+        self.workers.pop(worker.worker_id, None)
+        if worker.info.get("engine_loaded"):
+            self.engines_loaded -= 1
+        self.stats["worker_restarts"] += 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            replacement = await loop.run_in_executor(self._io_executor, self._spawn_worker)
+            self._add_worker(replacement)
+            logger.warning(f"♻️ TTS worker {worker.worker_id} replaced by {replacement.worker_id}")
+        except Exception as e:
+            logger.error(f"❌ Could not restart TTS worker: {e}")
+
+    async def shutdown(self):
+        for worker in list(self.workers.values()):
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+            worker.kill()
+        self.workers.clear()
+        self._io_executor.shutdown(wait=False)
+
+    # 🗣️ Jobs
+    def _roundtrip(self, worker: TTSWorker, job: Dict[str, Any], timeout: float):
+        worker.conn.send(job)
+        if not worker.conn.poll(timeout):
+            raise SynthesisTimeoutError(f"TTS worker {worker.worker_id} timed out after {timeout:.0f}s")
+        return worker.conn.recv()
+
+    def _finish(self, worker: TTSWorker, future) -> Optional[Exception]:
+        """Return the worker to the pool or schedule its replacement"""
+        self._busy -= 1
+        error = future.exception()
+        if error is None:
+            worker.jobs_done += 1
+            self._idle.put_nowait(worker)
+            return None
+
+        if isinstance(error, SynthesisTimeoutError):
+            self.stats["timeouts"] += 1
+        else:
+            error = WorkerCrashedError(f"TTS worker {worker.worker_id} crashed: {error}")
+        asyncio.ensure_future(self._replace_worker(worker))
+        return error
+
+    async def synthesize(self, text: str, voice: str = "default", speed: float = 1.0,
+                         timeout: Optional[float] = None) -> RenderedAudio:
+        """Render one text chunk on the next free worker"""
+        if self._waiting >= self.max_queue:
+            self.stats["jobs_rejected"] += 1
+            raise PoolFullError(f"TTS queue full ({self.max_queue} waiting)")
+
+        self._waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._waiting -= 1
+
+        self._busy += 1
+        job = {"text": text, "voice": voice, "speed": speed}
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            self._io_executor, self._roundtrip, worker, job, timeout or self.timeout
+        )
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Client weg: Worker erst nach Ende des laufenden Jobs freigeben
+            future.add_done_callback(lambda f: self._finish(worker, f))
+            raise
+        except Exception:
+            pass
+
+        error = self._finish(worker, future)
+        if error is not None:
+            self.stats["jobs_failed"] += 1
+            raise error
+
+        status, payload = future.result()
+        if status != "ok":
+            self.stats["jobs_failed"] += 1
+            raise RuntimeError(payload)
+
+        self.stats["jobs_completed"] += 1
+        return RenderedAudio(**payload)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": len(self.workers),
+            "busy": self._busy,
+            "idle": self._idle.qsize() if self._idle else 0,
+            "queue_depth": self._waiting,
+            "max_queue": self.max_queue,
+            "engines_loaded": self.engines_loaded,
+            "timeout": self.timeout
+        }
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+🗣️ GENTLEMAN TTS Voice Catalog
+═══════════════════════════════════════════════════════════════
+Voice metadata enumerated once per worker and served from memory
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("gentleman-tts-voices")
+
+def normalize_language(language: Any) -> Optional[str]:
+    """Turn pyttsx3/espeak language tags into lowercase BCP-47-ish strings
+
+    espeak reports languages as bytes with a leading priority byte
+    (b"\\x05en-us"), NSSpeechSynthesizer and SAPI5 as "en_US" strings.
+    """
+    if language is None:
+        return None
+    if isinstance(language, bytes):
+        language = language.lstrip(bytes(range(32))).decode("utf-8", errors="ignore")
+    language = str(language).strip().replace("_", "-").lower()
+    return language or None
+
+def describe_voice(voice) -> Dict[str, Any]:
+    """Metadata for one pyttsx3 voice object (runs inside the worker process)"""
+    languages = []
+    for language in getattr(voice, "languages", None) or []:
+        normalized = normalize_language(language)
+        if normalized and normalized not in languages:
+            languages.append(normalized)
+
+    gender = getattr(voice, "gender", None)
+    age = getattr(voice, "age", None)
+    return {
+        "id": str(voice.id),
+        "name": str(getattr(voice, "name", None) or voice.id),
+        "languages": languages,
+        "gender": str(gender).lower() if gender else None,
+        "age": age if isinstance(age, int) else None,
+        "sample_rate": None
+    }
+
+def language_matches(voice_languages: List[str], language: str) -> bool:
+    """'de' matches 'de-de' and 'de-at', 'de-de' only matches 'de-de' or plain 'de'"""
+    wanted = normalize_language(language)
+    if not wanted:
+        return True
+    for candidate in voice_languages:
+        if candidate == wanted or candidate.split("-")[0] == wanted or wanted.split("-")[0] == candidate:
+            return True
+    return False
+
+class VoiceCatalog:
+    """In-memory voice list with a content ETag for conditional GETs"""
+
+    def __init__(self):
+        self._voices: Dict[str, Dict[str, Any]] = {}
+        self._default_voice: Optional[str] = None
+        self._etag = ""
+        self._lock = threading.Lock()
+        self._refresh_etag()
+
+    def load(self, voices: List[Dict[str, Any]], default_voice: Optional[str] = None):
+        """Replace the catalog with a worker's enumeration (keeps learned sample rates)"""
+        with self._lock:
+            previous = self._voices
+            self._voices = {}
+            for voice in voices:
+                entry = dict(voice)
+                known = previous.get(entry["id"])
+                if known and known.get("sample_rate") and not entry.get("sample_rate"):
+                    entry["sample_rate"] = known["sample_rate"]
+                self._voices[entry["id"]] = entry
+            self._default_voice = default_voice if default_voice in self._voices else None
+            self._refresh_etag()
+        logger.info(f"🎵 Voice catalog loaded: {len(voices)} voices")
+
+    def note_sample_rate(self, voice_id: str, sample_rate: int):
+        """Sample rate is only known after a voice rendered once"""
+        if voice_id == "default":
+            voice_id = self._default_voice
+        with self._lock:
+            entry = self._voices.get(voice_id) if voice_id else None
+            if entry is None or entry.get("sample_rate") == sample_rate:
+                return
+            entry["sample_rate"] = sample_rate
+            self._refresh_etag()
+
+    def _refresh_etag(self):
+        payload = json.dumps(
+            [self._default_voice, sorted(self._voices.items())], sort_keys=True, default=str
+        )
+        self._etag = '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16] + '"'
+
+    @property
+    def etag(self) -> str:
+        return self._etag
+
+    @property
+    def default_voice(self) -> Optional[str]:
+        return self._default_voice
+
+    def __len__(self) -> int:
+        return len(self._voices)
+
+    def list(self, language: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            voices = [dict(voice) for voice in self._voices.values()]
+        if language:
+            voices = [voice for voice in voices if language_matches(voice["languages"], language)]
+        return voices
+
+    def resolve(self, voice: str, language: Optional[str] = None) -> str:
+        """Map a request's voice/language pair to a concrete engine voice id"""
+        if voice != "default" or not language:
+            return voice
+
+        with self._lock:
+            default = self._voices.get(self._default_voice) if self._default_voice else None
+            if default is not None and language_matches(default["languages"], language):
+                return "default"
+            wanted = normalize_language(language)
+            # Exakte Sprache vor Sprachfamilie ("de-de" vor "de-at")
+            for entry in self._voices.values():
+                if wanted in entry["languages"]:
+                    return entry["id"]
+            for entry in self._voices.values():
+                if language_matches(entry["languages"], language):
+                    return entry["id"]
+        return "default"
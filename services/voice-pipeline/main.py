@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+🎙️ GENTLEMAN Voice Pipeline - STT → LLM → TTS
+═══════════════════════════════════════════════════════════════
+WebSocket Orchestrator, der die drei Stufen überlappend ausführt
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel
+import uvicorn
+
+# 🎯 Logging Setup
+logging.basicConfig(
+    level=logging.INFO,
+    format='🎙️ %(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("gentleman-voice-pipeline")
+
+# 🎙️ FastAPI App
+app = FastAPI(
+    title="🎙️ Gentleman Voice Pipeline",
+    description="Streaming STT → LLM → TTS orchestrator",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc"
+)
+
+# 🌐 CORS Middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# 🔧 Configuration
+STT_ENDPOINT = os.getenv("GENTLEMAN_STT_ENDPOINT", "http://stt-service:8000")
+LLM_ENDPOINT = os.getenv("GENTLEMAN_LLM_ENDPOINT", "http://192.168.100.10:8001")
+TTS_ENDPOINT = os.getenv("GENTLEMAN_TTS_ENDPOINT", "http://tts-service:8000")
+SYSTEM_PROMPT = os.getenv(
+    "GENTLEMAN_VOICE_SYSTEM_PROMPT",
+    "Du bist Gentleman, ein höflicher Sprachassistent. Antworte kurz und gesprochen."
+)
+STT_CONCURRENCY = int(os.getenv("GENTLEMAN_VOICE_STT_CONCURRENCY", "2"))
+TTS_CONCURRENCY = int(os.getenv("GENTLEMAN_VOICE_TTS_CONCURRENCY", "2"))
+REQUEST_TIMEOUT = float(os.getenv("GENTLEMAN_VOICE_TIMEOUT", "60"))
+
+LATENCY_KEYS = (
+    "stt_tail", "stt_busy", "llm_first_token", "llm_total",
+    "first_audio", "tts_busy", "total", "overlap_saved"
+)
+
+# ✂️ Satz-Chunking des Token-Streams
+SENTENCE_END = re.compile(r'[.!?…]["\'»”)]*\s+|\n+')
+
+class SentenceChunker:
+    """Collect streamed LLM tokens and emit complete sentences for TTS
+
+    Fragments shorter than min_chars are held back and merged with the next
+    sentence, like the TTS service does for full texts, so "Ja." is not
+    synthesized on its own.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text
+        sentences = []
+        search_from = 0
+        while True:
+            match = SENTENCE_END.search(self.buffer, search_from)
+            if not match:
+                break
+            candidate = self.buffer[:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                search_from = match.end()
+                continue
+            sentences.append(candidate)
+            self.buffer = self.buffer[match.end():]
+            search_from = 0
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        rest = self.buffer.strip()
+        self.buffer = ""
+        return rest or None
+
+# 📝 Models
+class HealthResponse(BaseModel):
+    status: str
+    uptime: float
+    active_sessions: int
+    endpoints: Dict[str, str]
+
+# 📊 Global State
+class PipelineState:
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self.start_time = time.time()
+        self.active_sessions = 0
+        self.stats = {
+            "sessions_total": 0,
+            "turns_total": 0,
+            "turns_failed": 0,
+            "turns_cancelled": 0,
+            "segments_transcribed": 0,
+            "sentences_synthesized": 0
+        }
+        self.latency_totals = {key: 0.0 for key in LATENCY_KEYS}
+
+    def record_turn(self, latency: Dict[str, float]):
+        self.stats["turns_total"] += 1
+        for key in LATENCY_KEYS:
+            self.latency_totals[key] += latency.get(key) or 0.0
+
+    def average_latency(self) -> Dict[str, float]:
+        turns = self.stats["turns_total"]
+        if not turns:
+            return {key: 0.0 for key in LATENCY_KEYS}
+        return {key: round(total / turns, 2) for key, total in self.latency_totals.items()}
+
+state = PipelineState()
+
+# 🚀 Lifecycle
+@app.on_event("startup")
+async def startup_event():
+    """Create the shared HTTP client for downstream services"""
+    state.client = httpx.AsyncClient(
+        timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=5.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    )
+    logger.info(f"✅ Voice pipeline ready (STT {STT_ENDPOINT}, LLM {LLM_ENDPOINT}, TTS {TTS_ENDPOINT})")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if state.client:
+        await state.client.aclose()
+
+def elapsed_ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+# ═══════════════════════════════════════════════════════════════
+# Sitzung: ein WebSocket, beliebig viele Gesprächsrunden
+# ═══════════════════════════════════════════════════════════════
+
+class VoiceSession:
+    """One WebSocket client; audio segments are transcribed while the user is still talking"""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.options: Dict[str, Any] = {
+            "voice": "default",
+            "language": None,
+            "format": "wav",
+            "sample_rate": None,
+            "max_tokens": 256,
+            "temperature": 0.7,
+            "system_prompt": SYSTEM_PROMPT
+        }
+        self._send_lock = asyncio.Lock()
+        self._stt_semaphore = asyncio.Semaphore(STT_CONCURRENCY)
+        self._tts_semaphore = asyncio.Semaphore(TTS_CONCURRENCY)
+        self.turn_task: Optional[asyncio.Task] = None
+        self._reset_turn()
+
+    def _reset_turn(self):
+        self.segments: List[asyncio.Task] = []
+        self.typed_text: List[str] = []
+
+    async def send_json(self, payload: Dict[str, Any]):
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(payload))
+
+    async def send_audio(self, header: Dict[str, Any], audio: bytes):
+        # Beschreibung und Binärframe dürfen nicht von anderen Nachrichten getrennt werden
+        async with self._send_lock:
+            await self.websocket.send_text(json.dumps(header))
+            await self.websocket.send_bytes(audio)
+
+    # 🎤 STT
+    def add_segment(self, audio: bytes):
+        index = len(self.segments)
+        self.segments.append(asyncio.create_task(self._transcribe(index, audio)))
+
+    async def _transcribe(self, index: int, audio: bytes) -> Tuple[str, float]:
+        """Transcript of one segment and the time spent in STT"""
+        async with self._stt_semaphore:
+            started = time.perf_counter()
+            response = await state.client.post(
+                f"{STT_ENDPOINT}/transcribe",
+                files={"audio": (f"segment_{index}.wav", audio, "audio/wav")}
+            )
+            response.raise_for_status()
+            busy = elapsed_ms(started)
+
+        text = response.json().get("text", "").strip()
+        state.stats["segments_transcribed"] += 1
+        await self.send_json({"type": "transcript", "index": index, "text": text, "partial": True})
+        return text, busy
+
+    # 🧠 LLM
+    async def _stream_llm(self, prompt: str):
+        """Yield text pieces; falls back to one piece for servers without streaming"""
+        payload = {
+            "prompt": prompt,
+            "max_tokens": self.options["max_tokens"],
+            "temperature": self.options["temperature"],
+            "system_prompt": self.options["system_prompt"],
+            "stream": True
+        }
+        async with state.client.stream("POST", f"{LLM_ENDPOINT}/generate", json=payload) as response:
+            response.raise_for_status()
+            if "ndjson" not in response.headers.get("content-type", ""):
+                body = json.loads(await response.aread())
+                yield body.get("text", "")
+                return
+
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event.get("error"):
+                    raise RuntimeError(event["error"])
+                if "token" in event:
+                    yield event["token"]
+
+    # 🔊 TTS
+    async def _synthesize(self, index: int, sentence: str) -> Dict[str, Any]:
+        async with self._tts_semaphore:
+            started = time.perf_counter()
+            response = await state.client.post(f"{TTS_ENDPOINT}/synthesize", json={
+                "text": sentence,
+                "voice": self.options["voice"],
+                "language": self.options["language"],
+                "format": self.options["format"],
+                "sample_rate": self.options["sample_rate"]
+            })
+            response.raise_for_status()
+            duration = elapsed_ms(started)
+
+        state.stats["sentences_synthesized"] += 1
+        return {
+            "index": index,
+            "text": sentence,
+            "audio": response.content,
+            "media_type": response.headers.get("content-type", "audio/wav"),
+            "duration_ms": duration
+        }
+
+    async def _send_audio_in_order(self, queue: asyncio.Queue, turn_started: float,
+                                   timings: Dict[str, float]):
+        """Await synthesis tasks in sentence order and forward their audio"""
+        while True:
+            task = await queue.get()
+            if task is None:
+                return
+            result = await task
+            timings["tts_busy"] += result["duration_ms"]
+            if "first_audio" not in timings:
+                timings["first_audio"] = elapsed_ms(turn_started)
+            await self.send_audio({
+                "type": "audio",
+                "index": result["index"],
+                "text": result["text"],
+                "media_type": result["media_type"],
+                "bytes": len(result["audio"])
+            }, result["audio"])
+
+    # 🔁 Gesprächsrunde
+    def start_turn(self):
+        """Hand the collected input to a background turn; segments arriving meanwhile belong to the next one"""
+        segments, typed_text = self.segments, self.typed_text
+        self._reset_turn()
+        self.turn_task = asyncio.create_task(self.run_turn(segments, typed_text))
+
+    def cancel_turn(self) -> bool:
+        if self.turn_task is None or self.turn_task.done():
+            return False
+        self.turn_task.cancel()
+        return True
+
+    async def interrupt(self):
+        """Barge-in: stop the running answer and tell the client"""
+        if self.cancel_turn():
+            state.stats["turns_cancelled"] += 1
+            await self.send_json({"type": "cancelled"})
+
+    async def run_turn(self, segments: List[asyncio.Task], typed_text: List[str]):
+        """Finish STT, stream the LLM answer and pipe each sentence into TTS"""
+        turn_started = time.perf_counter()
+        timings: Dict[str, float] = {"tts_busy": 0.0}
+        stage = "stt"
+        tts_queue: asyncio.Queue = asyncio.Queue()
+        sender: Optional[asyncio.Task] = None
+        synth_tasks: List[asyncio.Task] = []
+
+        try:
+            results = await asyncio.gather(*segments)
+            transcript = " ".join([text for text, _ in results if text] + typed_text).strip()
+            timings["stt_tail"] = elapsed_ms(turn_started)
+            timings["stt_busy"] = sum(busy for _, busy in results)
+            await self.send_json({"type": "transcript", "text": transcript, "partial": False})
+
+            if not transcript:
+                await self.send_json({"type": "done", "transcript": "", "response": "",
+                                      "latency": timings})
+                return
+
+            stage = "llm"
+            sender = asyncio.create_task(self._send_audio_in_order(tts_queue, turn_started, timings))
+            chunker = SentenceChunker()
+            pieces: List[str] = []
+
+            def dispatch(sentence: str):
+                index = len(synth_tasks)
+                task = asyncio.create_task(self._synthesize(index, sentence))
+                synth_tasks.append(task)
+                tts_queue.put_nowait(task)
+
+            llm_started = time.perf_counter()
+            async for piece in self._stream_llm(transcript):
+                if "llm_first_token" not in timings:
+                    timings["llm_first_token"] = elapsed_ms(turn_started)
+                pieces.append(piece)
+                for sentence in chunker.feed(piece):
+                    await self.send_json({"type": "sentence", "index": len(synth_tasks), "text": sentence})
+                    dispatch(sentence)
+
+            rest = chunker.flush()
+            if rest:
+                await self.send_json({"type": "sentence", "index": len(synth_tasks), "text": rest})
+                dispatch(rest)
+            timings["llm_total"] = elapsed_ms(llm_started)
+
+            stage = "tts"
+            tts_queue.put_nowait(None)
+            await sender
+
+            timings["total"] = elapsed_ms(turn_started)
+            # Summe der Einzelstufen minus tatsächliche Dauer = durch Überlappung gespart
+            sequential = timings["stt_busy"] + timings["llm_total"] + timings["tts_busy"]
+            timings["overlap_saved"] = round(max(0.0, sequential - timings["total"]), 1)
+            state.record_turn(timings)
+
+            await self.send_json({
+                "type": "done",
+                "transcript": transcript,
+                "response": "".join(pieces).strip(),
+                "sentences": len(synth_tasks),
+                "latency": timings
+            })
+
+        except (httpx.HTTPError, RuntimeError, ValueError) as e:
+            state.stats["turns_failed"] += 1
+            logger.error(f"❌ Voice turn failed in {stage}: {e}")
+            await self.send_json({"type": "error", "stage": stage, "detail": str(e), "latency": timings})
+        finally:
+            for task in synth_tasks + segments:
+                if not task.done():
+                    task.cancel()
+            if sender is not None and not sender.done():
+                sender.cancel()
+
+    async def handle_control(self, message: Dict[str, Any]) -> bool:
+        """Process a JSON control message, return False to close the session"""
+        kind = message.get("type")
+        if kind == "start":
+            for key in self.options:
+                if key in message:
+                    self.options[key] = message[key]
+            await self.send_json({"type": "ready", "options": self.options})
+        elif kind == "text":
+            # Tastatureingabe oder Client-seitiges STT: Stufe 1 überspringen
+            self.typed_text.append(str(message.get("text", "")))
+        elif kind == "end":
+            # Neue Eingabe während einer Antwort überholt diese; die Runde läuft im Hintergrund,
+            # damit währenddessen weiter Nachrichten gelesen werden
+            await self.interrupt()
+            self.start_turn()
+        elif kind == "cancel":
+            await self.interrupt()
+        elif kind == "close":
+            return False
+        else:
+            await self.send_json({"type": "error", "stage": "protocol", "detail": f"Unknown message type '{kind}'"})
+        return True
+
+# 🔌 WebSocket Endpoint
+@app.websocket("/ws/voice")
+async def voice_websocket(websocket: WebSocket):
+    """Binary frames are WAV segments, JSON frames control the session
+
+    Client → {"type": "start", ...options}, <wav segment>*, {"type": "end"}
+             {"type": "cancel"} bricht die laufende Antwort ab (Barge-in)
+    Server → transcript*, sentence*, audio (JSON header + binary frame)*, done | cancelled
+    """
+    await websocket.accept()
+    session = VoiceSession(websocket)
+    state.active_sessions += 1
+    state.stats["sessions_total"] += 1
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                session.add_segment(message["bytes"])
+                continue
+            try:
+                control = json.loads(message.get("text") or "{}")
+            except json.JSONDecodeError:
+                await session.send_json({"type": "error", "stage": "protocol", "detail": "Invalid JSON"})
+                continue
+            if not await session.handle_control(control):
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        session.cancel_turn()
+        for task in session.segments:
+            task.cancel()
+        state.active_sessions -= 1
+
+# 🏥 Health Check
+@app.get("/health", response_model=HealthResponse)
+async def health_check():
+    """Health check endpoint"""
+    return HealthResponse(
+        status="healthy",
+        uptime=time.time() - state.start_time,
+        active_sessions=state.active_sessions,
+        endpoints={"stt": STT_ENDPOINT, "llm": LLM_ENDPOINT, "tts": TTS_ENDPOINT}
+    )
+
+# 📊 Stats Endpoint
+@app.get("/stats")
+async def get_stats():
+    """Turn counts and average per-stage latency in milliseconds"""
+    return {
+        **state.stats,
+        "active_sessions": state.active_sessions,
+        "average_latency_ms": state.average_latency()
+    }
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8000)
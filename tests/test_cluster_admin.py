@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Cluster Admin Tests
+═══════════════════════════════════════════════════════════════
+Parallele Admin-Läufe, Fertigstellungs-Reihenfolge und Deadlines pro Node (cluster_admin.py)
+"""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cluster_admin  # noqa: E402
+from cluster_admin import ClusterNode, RemoteExecutor, load_inventory  # noqa: E402
+
+class FakeSSH:
+    """subprocess.run-Ersatz: Master legt den Control-Socket an, Befehle dauern durations[ip]"""
+
+    def __init__(self, durations=None):
+        self.durations = durations or {}
+        self.masters = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, command, timeout=None, **kwargs):
+        control_path = next(arg.split("=", 1)[1] for arg in command if arg.startswith("ControlPath="))
+        if "-N" in command:
+            with self.lock:
+                self.masters += 1
+            time.sleep(0.05)
+            Path(control_path).touch()
+            return SimpleNamespace(returncode=0)
+        duration = self.durations.get(command[-2].split("@")[1], 0.0)
+        if duration > timeout:
+            time.sleep(timeout)
+            raise subprocess.TimeoutExpired(command, timeout)
+        time.sleep(duration)
+        return SimpleNamespace(returncode=0, stdout="up 3 days\n", stderr="")
+
+@pytest.fixture
+def executor(tmp_path):
+    executor = RemoteExecutor(max_parallel=8, control_dir=tmp_path)
+    yield executor
+    executor.close()
+
+def nodes(*ips):
+    return [ClusterNode(f"node-{ip}", ip, user="gentleman") for ip in ips]
+
+def test_results_arrive_in_completion_order(executor):
+    delays = {"10.0.0.1": 0.3, "10.0.0.2": 0.0, "10.0.0.3": 0.15}
+
+    def operation(executor, node, deadline, params):
+        time.sleep(delays[node.ip])
+        return {"node": node.name, "ok": True}
+
+    started = time.monotonic()
+    results = [result["node"] for result in executor.run(nodes(*delays), operation, deadline=1.0)]
+    assert results == ["node-10.0.0.2", "node-10.0.0.3", "node-10.0.0.1"]
+    # Parallel: so lange wie der langsamste Node, nicht wie die Summe
+    assert time.monotonic() - started < 0.45
+
+def test_slow_node_hits_its_own_deadline(executor, monkeypatch):
+    fake = FakeSSH({"10.0.0.1": 5.0, "10.0.0.2": 0.01})
+    monkeypatch.setattr(cluster_admin.subprocess, "run", fake)
+
+    started = time.monotonic()
+    results = {result["node"]: result
+               for result in executor.run(nodes("10.0.0.1", "10.0.0.2"), cluster_admin.op_status, deadline=0.6)}
+    assert time.monotonic() - started < 1.5
+
+    assert results["node-10.0.0.2"]["status"] == "online" and results["node-10.0.0.2"]["stdout"] == "up 3 days"
+    slow = results["node-10.0.0.1"]
+    assert slow["status"] == "offline" and "Deadline" in slow["error"]
+    assert slow["duration"] <= 0.6 + 0.2
+    assert executor.stats["timeouts"] == 1
+
+def test_master_connection_is_started_once_per_node(executor, monkeypatch):
+    fake = FakeSSH()
+    monkeypatch.setattr(cluster_admin.subprocess, "run", fake)
+
+    same_node = nodes("10.0.0.1") * 5
+    results = list(executor.run(same_node, cluster_admin.op_status, deadline=1.0))
+    assert all(result["ok"] for result in results)
+    assert fake.masters == executor.stats["masters_started"] == 1
+    assert executor.stats["ssh_commands"] == 5
+
+def test_failures_become_results(executor):
+    def operation(executor, node, deadline, params):
+        raise RuntimeError("kaputt")
+
+    [crashed] = executor.run(nodes("10.0.0.1"), operation, deadline=1.0)
+    assert crashed["ok"] is False and crashed["error"] == "kaputt"
+
+    [no_user] = executor.run([ClusterNode("rx-node", "10.0.0.2")], cluster_admin.op_status, deadline=1.0)
+    assert no_user["status"] == "offline" and "SSH-User" in no_user["error"]
+
+    [no_mac] = executor.run(nodes("10.0.0.3"), cluster_admin.op_wakeup, deadline=1.0)
+    assert no_mac["ok"] is False and "MAC" in no_mac["error"]
+
+def test_inventory_keeps_known_defaults(tmp_path):
+    config = tmp_path / "key_rotation_config.json"
+    config.write_text('{"nodes": {"i7-node": {"ip": "192.168.68.105"}, "rx-node": {"ip": "192.168.68.117", '
+                      '"ssh_user": "amo9n11"}, "kaputt": {"ssh_user": "x"}}}')
+    defaults = {"i7-node": ClusterNode("i7-node", "192.168.68.100", user="amonbaumgartner", mac="aa:bb:cc:dd:ee:ff")}
+
+    inventory = load_inventory(config, defaults, ssh_key="~/.ssh/gentleman_key")
+    assert set(inventory) == {"i7-node", "rx-node"}
+    assert inventory["i7-node"].ip == "192.168.68.105" and inventory["i7-node"].mac == "aa:bb:cc:dd:ee:ff"
+    assert inventory["rx-node"].target == "amo9n11@192.168.68.117"
+    assert inventory["rx-node"].ssh_key == "~/.ssh/gentleman_key"
+    assert load_inventory(tmp_path / "fehlt.json", defaults) == defaults
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Delta Heartbeat Tests
+═══════════════════════════════════════════════════════════════
+Basisversionen, Zusammenführen der Änderungen und 409-Resync am Handshake Server
+"""
+
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from m1_handshake_server import NodeRegistry, apply_changes, handle_handshake  # noqa: E402
+
+def context():
+    return SimpleNamespace(node_registry=NodeRegistry(), metrics=None, forwarder=None)
+
+def full_state(version=1):
+    return {
+        'node_id': 'i7-node',
+        'timestamp': time.time(),
+        'status': 'online',
+        'state_version': version,
+        'system_info': {'cpu_count': 8, 'load_average': [0.5, 0.4, 0.3]},
+        'services': {'llm': True}
+    }
+
+def delta(base_version, state_version, changes=None, removed=None):
+    return {
+        'node_id': 'i7-node',
+        'timestamp': time.time(),
+        'base_version': base_version,
+        'state_version': state_version,
+        'changes': changes or {},
+        'removed': removed or []
+    }
+
+def test_delta_on_known_base_is_merged():
+    ctx = context()
+    assert handle_handshake(ctx, full_state(1), '10.0.0.7')[0] == 200
+
+    status, payload = handle_handshake(ctx, delta(1, 2, {'system_info': {'load_average': [2.0, 1.0, 0.5]}},
+                                                  [['services', 'llm']]), '10.0.0.7')
+
+    assert status == 200 and payload['state_version'] == 2
+    stored = ctx.node_registry.get_node_status('i7-node')
+    assert stored['system_info'] == {'cpu_count': 8, 'load_average': [2.0, 1.0, 0.5]}
+    assert stored['services'] == {}
+    assert stored['status'] == 'online'
+
+def test_stale_base_version_requests_resync():
+    ctx = context()
+    handle_handshake(ctx, full_state(1), '10.0.0.7')
+    handle_handshake(ctx, delta(1, 2), '10.0.0.7')
+
+    # Antwort auf Version 2 ging verloren, der Node rechnet noch mit Basis 1
+    status, payload = handle_handshake(ctx, delta(1, 3), '10.0.0.7')
+    assert status == 409 and payload['status'] == 'resync'
+    assert ctx.node_registry.get_node_status('i7-node')['state_version'] == 2
+
+def test_unknown_node_after_restart_requests_resync():
+    status, payload = handle_handshake(context(), delta(4, 5), '10.0.0.7')
+    assert status == 409 and payload['status'] == 'resync'
+
+def test_full_state_after_resync_is_accepted_again():
+    ctx = context()
+    assert handle_handshake(ctx, delta(4, 5), '10.0.0.7')[0] == 409
+    assert handle_handshake(ctx, full_state(6), '10.0.0.7')[0] == 200
+    assert handle_handshake(ctx, delta(6, 7), '10.0.0.7')[0] == 200
+
+def test_apply_changes_does_not_modify_the_stored_state():
+    state = {'system_info': {'memory': {'total': 16, 'used': 4}}, 'services': {'llm': True}}
+    merged = apply_changes(state, {'system_info': {'memory': {'used': 8}}}, [['system_info', 'memory', 'total']])
+
+    assert merged['system_info'] == {'memory': {'used': 8}}
+    assert state['system_info'] == {'memory': {'total': 16, 'used': 4}}
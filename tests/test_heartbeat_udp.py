@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - UDP Heartbeat Tests
+═══════════════════════════════════════════════════════════════
+HMAC-Prüfung, Schlüsselrotation und Replay-Schutz für heartbeat_udp
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import heartbeat_udp  # noqa: E402
+from m1_handshake_server import HeartbeatListener, NodeRegistry  # noqa: E402
+
+def keyring(tmp_path, key='aktueller-schluessel', backup=None):
+    path = tmp_path / 'api_keys.json'
+    path.write_text(json.dumps({'heartbeat_key': key}))
+    if backup:
+        (tmp_path / 'api_keys.backup_20260101_000000.json').write_text(json.dumps({'heartbeat_key': backup}))
+    return heartbeat_udp.KeyRing(str(path)).load()
+
+def packet(key, sequence=None, node_id='rx-node', state_version=3):
+    sequence = sequence or heartbeat_udp.Sequence().next()
+    return heartbeat_udp.encode(key.encode('utf-8'), node_id, sequence, state_version)
+
+def test_valid_packet_is_accepted(tmp_path):
+    decoded = heartbeat_udp.decode(packet('aktueller-schluessel'), keyring(tmp_path))
+    assert decoded is not None
+    node_id, _, state_version, flags, _ = decoded
+    assert (node_id, state_version, flags) == ('rx-node', 3, 0)
+
+def test_wrong_key_is_rejected(tmp_path):
+    assert heartbeat_udp.decode(packet('fremder-schluessel'), keyring(tmp_path)) is None
+
+def test_tampered_packet_is_rejected(tmp_path):
+    data = bytearray(packet('aktueller-schluessel'))
+    # state_version im Header ändern, MAC bleibt gleich
+    data[heartbeat_udp.HEADER.size - 1] ^= 0x01
+    assert heartbeat_udp.decode(bytes(data), keyring(tmp_path)) is None
+    assert heartbeat_udp.decode(bytes(data[:10]), keyring(tmp_path)) is None
+
+def test_previous_key_stays_valid_during_rotation(tmp_path):
+    ring = keyring(tmp_path, backup='alter-schluessel')
+    assert heartbeat_udp.decode(packet('alter-schluessel'), ring) is not None
+    assert heartbeat_udp.decode(packet('aktueller-schluessel'), ring) is not None
+
+def listener(tmp_path):
+    registry = NodeRegistry()
+    registry.register_node({'node_id': 'rx-node', 'timestamp': 0, 'status': 'online', 'state_version': 3})
+    ctx = SimpleNamespace(node_registry=registry, forwarder=None)
+    sent = []
+    result = HeartbeatListener(ctx, '127.0.0.1', 0, keyring(tmp_path))
+    result.sock = SimpleNamespace(sendto=lambda data, address: sent.append(data))
+    return result, sent
+
+def test_listener_rejects_replay_and_old_sequences(tmp_path):
+    result, _ = listener(tmp_path)
+    now = time.time_ns() // 1000
+    data = packet('aktueller-schluessel', sequence=now)
+
+    result.handle(data, ('10.0.0.5', 40000))
+    result.handle(data, ('10.0.0.5', 40000))
+    result.handle(packet('aktueller-schluessel', sequence=now - 1), ('10.0.0.5', 40000))
+    result.handle(packet('aktueller-schluessel', sequence=now - 120_000_000), ('10.0.0.5', 40000))
+
+    assert result.stats['accepted'] == 1
+    assert result.stats['replayed'] == 3
+
+def test_listener_counts_invalid_mac(tmp_path):
+    result, _ = listener(tmp_path)
+    result.handle(packet('fremder-schluessel'), ('10.0.0.5', 40000))
+    assert (result.stats['received'], result.stats['invalid'], result.stats['accepted']) == (1, 1, 0)
+
+def test_unknown_state_version_gets_signed_resync(tmp_path):
+    result, sent = listener(tmp_path)
+    result.handle(packet('aktueller-schluessel', state_version=4), ('10.0.0.5', 40000))
+
+    assert result.stats['resync'] == 1
+    node_id, _, state_version, flags, _ = heartbeat_udp.decode(sent[0], result.keyring)
+    assert (node_id, state_version) == ('rx-node', 4)
+    assert flags & heartbeat_udp.FLAG_RESYNC
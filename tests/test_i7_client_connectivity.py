@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - I7 Client Connectivity Tests
+═══════════════════════════════════════════════════════════════
+Parallele LAN/Tunnel-Probes und Wiederverwendung des gemerkten Pfads (i7_handshake_client.py)
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from i7_handshake_client import I7HandshakeClient  # noqa: E402
+
+class Response:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload or {}
+        self.text = ""
+
+    def json(self):
+        return self.payload
+
+class Route:
+    """Session-Ersatz für einen Pfad: antwortet nach delay oder scheitert"""
+
+    def __init__(self, delay=0.0, health=None, error=None):
+        self.delay = delay
+        self.health = health or {"status": "healthy"}
+        self.error = error
+        self.probes = 0
+        self.posts = []
+        self.post_status = 200
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.probes += 1
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return Response(200, self.health)
+
+    def post(self, url, json=None, timeout=None):
+        self.posts.append(url)
+        return Response(self.post_status, {"status": "ok", "state_version": json["state_version"]})
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("GENTLEMAN_HEARTBEAT_UDP", "0")
+    client = I7HandshakeClient()
+    yield client
+    client._probe_pool.shutdown(wait=True)
+
+def use_paths(client, lan, tunnel):
+    client.session = lan
+    client.tunnel_session = tunnel
+
+def test_faster_lan_wins_and_keeps_udp_port(client):
+    use_paths(client, Route(health={"udp_heartbeat_port": 8766}), Route(delay=0.3))
+    started = time.monotonic()
+    assert client.test_connectivity()
+    assert time.monotonic() - started < 0.25
+    assert not client.use_tunnel and client.udp_port == 8766
+
+def test_tunnel_is_used_when_lan_is_down(client):
+    use_paths(client, Route(error=ConnectionError("kein Route")), Route(delay=0.05))
+    client.udp_port = 8766
+    assert client.test_connectivity()
+    assert client.use_tunnel and client.udp_port is None
+    assert client.base_url == client.m1_tunnel_url
+
+def test_no_path_answers(client):
+    use_paths(client, Route(error=ConnectionError("aus")), Route(error=ConnectionError("aus")))
+    assert not client.test_connectivity()
+    assert client._path_checked_at == 0.0
+
+def test_remembered_path_is_reused_until_a_request_fails(client):
+    lan, tunnel = Route(), Route(delay=0.1)
+    use_paths(client, lan, tunnel)
+    assert client.ensure_connectivity()
+    assert client.ensure_connectivity()
+    assert lan.probes == 1
+
+    # Fehlgeschlagener Handshake: beim nächsten Durchlauf werden beide Pfade neu geprobt
+    lan.post_status = 500
+    assert not client.send_handshake()
+    assert client.ensure_connectivity()
+    assert lan.probes == 2
+    assert lan.posts == [f"http://{client.m1_host}:{client.handshake_port}/handshake"]
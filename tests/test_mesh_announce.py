@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Mesh Announcement Tests
+═══════════════════════════════════════════════════════════════
+Normalisierung von Announcements und HMAC-Pflicht für fremde Adressen (announce.py, auth.py)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mesh-coordinator"))
+
+import auth  # noqa: E402
+from announce import AnnounceProtocol, InvalidAnnouncement, parse_announcement  # noqa: E402
+
+KNOWN_PORTS = {"stt-service": 8002, "tts-service": 8003, "llm-server": 8001}
+KEY = b"mesh-schluessel"
+
+def test_service_forms_are_normalized():
+    parsed = parse_announcement({
+        "node_id": "m1-mac",
+        "services": {"stt-service": 8002, "tts-service": True, "ssh": True, "llm-server": {"port": 9001}}
+    }, "192.168.68.111", KNOWN_PORTS)
+
+    assert parsed["ip"] == "192.168.68.111"
+    assert {(service["name"], service["url"]) for service in parsed["services"]} == {
+        ("stt-service", "http://192.168.68.111:8002"),
+        ("tts-service", "http://192.168.68.111:8003"),
+        ("llm-server", "http://192.168.68.111:9001")
+    }
+
+def test_unsigned_announcement_may_only_describe_the_sender():
+    with pytest.raises(InvalidAnnouncement, match="Unsigned"):
+        parse_announcement({"ip": "192.168.68.50", "services": {"stt-service": 8002}}, "192.168.68.111", KNOWN_PORTS)
+    with pytest.raises(InvalidAnnouncement, match="foreign URL"):
+        parse_announcement({"services": [{"name": "llm-server", "url": "http://169.254.169.254/"}]},
+                           "192.168.68.111", KNOWN_PORTS)
+
+def test_signed_announcement_may_describe_other_hosts():
+    payload = auth.sign({"node_id": "rx-node", "ip": "192.168.68.50", "services": {"llm-server": 8001}}, KEY)
+    parsed = parse_announcement(payload, "192.168.68.111", KNOWN_PORTS, keys=[KEY])
+    assert parsed["services"][0]["url"] == "http://192.168.68.50:8001"
+
+    with pytest.raises(InvalidAnnouncement, match="signature"):
+        parse_announcement(payload, "192.168.68.111", KNOWN_PORTS, keys=[b"anderer-schluessel"])
+
+def test_signature_covers_payload_and_age():
+    signed = auth.sign({"node_id": "rx-node", "ttl": 180}, KEY)
+    assert auth.verify(signed, [b"alt", KEY])
+    assert not auth.verify({**signed, "ttl": 9999}, [KEY])
+    assert not auth.verify({**signed, "sent_at": time.time() - 2 * auth.MAX_AGE}, [KEY])
+    assert not auth.verify(signed, [])
+    assert auth.sign({"node_id": "rx-node"}, None) == {"node_id": "rx-node"}
+
+def test_udp_protocol_counts_rejected_datagrams():
+    received = []
+    protocol = AnnounceProtocol(lambda payload, ip: received.append((payload["node_id"], ip)))
+    protocol.datagram_received(b'{"node_id": "m1-mac"}', ("192.168.68.111", 4250))
+    protocol.datagram_received(b"kein json", ("192.168.68.111", 4250))
+    protocol.datagram_received(b"[1, 2]", ("192.168.68.111", 4250))
+
+    assert received == [("m1-mac", "192.168.68.111")]
+    assert (protocol.received, protocol.rejected) == (1, 2)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Mesh Change Feed Tests
+═══════════════════════════════════════════════════════════════
+Versionierte Deltas, Nachholen per since= und Resync langsamer Abonnenten (events.py)
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mesh-coordinator"))
+
+from events import ChangeFeed, latency_class  # noqa: E402
+
+def service(status="healthy", latency=0.01, **extra):
+    return {"name": "llm-server", "url": "http://192.168.68.50:8001", "status": status,
+            "latency_ewma": latency, "node_info": {"ip": "192.168.68.50"}, **extra}
+
+def test_only_visible_changes_create_events():
+    feed = ChangeFeed()
+    key = "llm-server@192.168.68.50"
+    feed.update_service(key, service())
+    feed.update_service(key, service(latency=0.02))          # gleiche Latenzklasse
+    feed.update_service(key, service(latency=0.1))           # fast -> normal
+    feed.update_service(key, service(status="unhealthy", latency=0.1))
+    feed.update_service(key, service(latency=0.1))
+    feed.update_service(key, None)
+    feed.update_service(key, None)
+
+    assert [(event["version"], event["type"]) for event in feed.since(0)] == [
+        (1, "service_added"), (2, "latency_class"), (3, "service_down"), (4, "service_up"), (5, "service_removed")
+    ]
+    assert latency_class(None) is None and latency_class(0.3) == "slow"
+
+def test_since_returns_missed_deltas_or_snapshot():
+    feed = ChangeFeed(capacity=3)
+    for index in range(5):
+        feed.update_node(f"192.168.68.{index}", {"hostname": f"node-{index}"})
+
+    assert [event["version"] for event in feed.since(2)] == [3, 4, 5]
+    assert feed.since(5) == []
+    # Aus dem Ringpuffer gefallen oder aus der Zukunft: Snapshot statt Deltas
+    assert feed.since(1) is None and feed.since(6) is None
+    [snapshot] = feed.backlog(1)
+    assert snapshot["type"] == "snapshot" and snapshot["version"] == 5
+    assert len(snapshot["data"]["nodes"]) == 5
+    # Andere Epoche (Coordinator neu gestartet): immer Snapshot
+    assert feed.backlog(4, epoch="anders")[0]["type"] == "snapshot"
+
+def test_stream_delivers_backlog_then_live_events():
+    async def scenario():
+        feed = ChangeFeed()
+        feed.update_node("192.168.68.1", {"hostname": "m1-mac"})
+        stream = feed.stream(since=0, keepalive=0.05)
+        first = await stream.__anext__()
+        feed.update_node("192.168.68.2", {"hostname": "rx-node"})
+        second = await stream.__anext__()
+        keepalive = await stream.__anext__()
+        await stream.aclose()
+        return feed, [first, second, keepalive]
+
+    feed, events = asyncio.run(scenario())
+    assert [event["version"] for event in events[:2]] == [1, 2]
+    assert events[2] is None
+    assert feed.get_status()["subscribers"] == 0
+
+def test_slow_subscriber_gets_resync():
+    async def scenario():
+        feed = ChangeFeed(subscriber_queue=2)
+        stream = feed.stream(since=0, keepalive=1)
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        for index in range(4):
+            feed.update_node(f"192.168.68.{index}", {"hostname": f"node-{index}"})
+        received = [await pending, await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return feed, received
+
+    feed, received = asyncio.run(scenario())
+    assert [event["type"] for event in received] == ["node_join", "node_join", "resync"]
+    assert received[-1]["version"] == 2
+    assert feed.stats["overflows"] == 1
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Mesh Health Monitor Tests
+═══════════════════════════════════════════════════════════════
+EWMA-Latenz, Backoff ausgefallener Services und parallele Sweeps (health.py)
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mesh-coordinator"))
+
+from health import HealthMonitor, HealthRecord  # noqa: E402
+
+class Response:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        if self.payload is None:
+            raise ValueError("kein JSON")
+        return self.payload
+
+class ServiceClient:
+    """Antwortet je URL mit einem festen Status nach einer festen Verzögerung"""
+
+    def __init__(self, answers, delay=0.0):
+        self.answers = answers
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, url):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            answer = self.answers[url]
+            if isinstance(answer, Exception):
+                raise answer
+            return Response(*answer)
+        finally:
+            self.in_flight -= 1
+
+def monitor_with(client, **kwargs):
+    monitor = HealthMonitor(**kwargs)
+    monitor.client = client
+    monitor._semaphore = asyncio.Semaphore(monitor.concurrency)
+    return monitor
+
+def test_latency_is_smoothed_and_failures_reset():
+    record = HealthRecord(alpha=0.5)
+    record.observe(0.1)
+    record.observe(0.3)
+    assert abs(record.latency_ewma - 0.2) < 1e-9
+    record.fail()
+    record.fail()
+    assert record.consecutive_failures == 2
+    record.observe(0.2)
+    assert record.consecutive_failures == 0 and record.samples == 3
+
+def test_check_reports_status_and_backs_off_failing_services():
+    client = ServiceClient({
+        "http://a:8001/health": (200, {"status": "healthy", "in_flight": 2}),
+        "http://b:8001/health": (503, None),
+        "http://c:8001/health": OSError("Verbindung abgelehnt")
+    })
+
+    async def scenario():
+        monitor = monitor_with(client, interval=10, jitter=0.0, max_backoff=40)
+        results = {key: await monitor.check(key, f"http://{key}:8001") for key in "abc"}
+        for _ in range(3):
+            await monitor.check("c", "http://c:8001")
+        return monitor, results
+
+    monitor, results = asyncio.run(scenario())
+    assert results["a"]["status"] == "healthy" and results["a"]["payload"]["in_flight"] == 2
+    assert results["b"] == {"status": "unhealthy", "latency": results["b"]["latency"], "payload": None, "code": 503}
+    assert results["c"]["status"] == "unreachable"
+    # Vierter Fehlschlag in Folge: 10 * 2^3 = 80 s, begrenzt auf max_backoff
+    assert abs(monitor.records["c"].next_check - time.time() - 40) < 1
+    assert abs(monitor.records["a"].next_check - time.time() - 10) < 1
+    assert monitor.stats["failures"] == 5
+
+def test_sweep_checks_due_services_concurrently():
+    urls = {f"svc-{index}": f"http://svc-{index}:8001" for index in range(6)}
+    client = ServiceClient({f"{url}/health": (200, {}) for url in urls.values()}, delay=0.05)
+    results = {}
+
+    async def scenario():
+        monitor = monitor_with(client, concurrency=3)
+        for key in urls:
+            monitor.record(key).next_check = 0
+        monitor.records["weg"] = HealthRecord()
+        checked = await monitor.sweep(urls, lambda key, result: results.setdefault(key, result["status"]))
+        again = await monitor.sweep(urls, lambda key, result: None)
+        return monitor, checked, again
+
+    monitor, checked, again = asyncio.run(scenario())
+    assert (checked, again) == (6, 0)
+    assert set(results.values()) == {"healthy"}
+    assert client.max_in_flight == 3
+    assert "weg" not in monitor.records
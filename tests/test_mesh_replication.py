@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Mesh Replication Tests
+═══════════════════════════════════════════════════════════════
+Last-Writer-Wins-Merge, Auslaufen verwaister Einträge und signierte Gossip-Runden (replication.py)
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mesh-coordinator"))
+
+import auth  # noqa: E402
+from replication import Gossiper, ReplicationStore  # noqa: E402
+
+KEY = b"mesh-schluessel"
+
+def service(latency=0.02, status="healthy"):
+    return {"name": "llm-server", "url": "http://192.168.68.50:8001", "status": status, "latency_ewma": latency}
+
+def entry(key, version, value=None):
+    return {"key": key, "value": value, "deleted": value is None, "version": version}
+
+def now_ms(offset=0.0):
+    return int((time.time() + offset) * 1000)
+
+def test_newer_version_wins_and_origin_breaks_ties():
+    store = ReplicationStore("coordinator-m1")
+    stamp = now_ms()
+    assert store.merge([entry("llm@a", [stamp, "coordinator-rx"], service())]) == 1
+    assert store.merge([entry("llm@a", [stamp - 1, "coordinator-i7"], service(0.5))]) == 0
+    assert store.merge([entry("llm@a", [stamp, "coordinator-zz"], service(0.3))]) == 1
+    assert store.entries["llm@a"]["value"]["latency_ewma"] == 0.3
+    # Die Hybrid-Uhr läuft nie hinter gesehenen Versionen her
+    assert store.local_update("llm@b", service())[0] > stamp
+
+def test_versions_far_in_the_future_are_rejected():
+    store = ReplicationStore("coordinator-m1", max_skew=60)
+    assert store.merge([entry("llm@a", [now_ms(3600), "coordinator-rx"], service())]) == 0
+    assert store.merge([entry("llm@a", ["kaputt", "coordinator-rx"], service())]) == 0
+    assert store.stats["rejected_future"] == 1
+    assert "llm@a" not in store.entries
+
+def test_small_latency_changes_are_not_republished():
+    store = ReplicationStore("coordinator-m1", latency_tolerance=0.2)
+    assert store.local_update("llm@a", service(0.100)) is not None
+    assert store.local_update("llm@a", service(0.110)) is None
+    assert store.local_update("llm@a", service(0.200)) is not None
+    assert store.local_update("llm@a", service(0.200, status="unhealthy")) is not None
+    assert store.local_update("llm@a", None)[1] == "coordinator-m1"
+    assert store.entries["llm@a"]["deleted"]
+
+def test_expire_origins_renews_own_and_tombstones_orphaned_entries():
+    store = ReplicationStore("coordinator-m1", origin_ttl=600)
+    applied = []
+    store.on_apply = applied.append
+    store.local_update("llm@own", service())
+    old = now_ms(-700)
+    store.merge([entry("llm@orphan", [old, "coordinator-rx"], service()),
+                 entry("llm@recent", [now_ms(-100), "coordinator-rx"], service())])
+    store.entries["llm@own"]["version"] = [old, "coordinator-m1"]
+    applied.clear()
+
+    store.expire_origins()
+
+    assert store.entries["llm@own"]["version"][0] > old and not store.entries["llm@own"]["deleted"]
+    assert store.entries["llm@orphan"] == entry("llm@orphan", [old, "coordinator-rx"])
+    assert not store.entries["llm@recent"]["deleted"]
+    assert [tombstone["key"] for tombstone in applied] == ["llm@orphan"]
+    assert (store.stats["refreshed"], store.stats["expired"]) == (1, 1)
+
+def test_sync_round_converges_both_sides():
+    m1, rx = ReplicationStore("coordinator-m1"), ReplicationStore("coordinator-rx")
+    m1.local_update("llm@m1", service())
+    rx.local_update("llm@rx", service())
+
+    answer = rx.handle_sync({"hash": m1.digest_hash(), "digest": m1.digest()})
+    m1.merge(answer["entries"])
+    rx.handle_sync({"entries": [m1.entries[key] for key in answer["request"]], "push_only": True})
+
+    assert m1.digest() == rx.digest() and m1.digest_hash() == rx.digest_hash()
+    assert rx.handle_sync({"hash": m1.digest_hash(), "digest": m1.digest()})["in_sync"]
+
+class PeerClient:
+    """Schickt Gossip-Requests direkt an den ReplicationStore eines zweiten Coordinators"""
+
+    def __init__(self, peer, keys, sign_responses=True):
+        self.peer = peer
+        self.keys = keys
+        self.sign_responses = sign_responses
+
+    async def post(self, url, timeout=None, json=None):
+        assert auth.verify(json, self.keys)
+        answer = self.peer.handle_sync(json)
+        body = auth.sign(answer, self.keys[0]) if self.sign_responses else answer
+
+        class Response:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return body
+        return Response()
+
+def test_gossiper_pulls_and_pushes_over_signed_requests():
+    m1, rx = ReplicationStore("coordinator-m1"), ReplicationStore("coordinator-rx")
+    m1.local_update("llm@m1", service())
+    rx.local_update("llm@rx", service())
+    gossiper = Gossiper(m1, keys=[KEY])
+
+    received = asyncio.run(gossiper.sync_with(PeerClient(rx, [KEY]), "http://192.168.68.50:8005"))
+
+    assert received == 1
+    assert m1.digest() == rx.digest()
+    assert (gossiper.stats["entries_received"], gossiper.stats["entries_sent"]) == (1, 1)
+
+def test_gossiper_rejects_unsigned_response():
+    gossiper = Gossiper(ReplicationStore("coordinator-m1"), keys=[KEY])
+    with pytest.raises(ValueError, match="Unsigned"):
+        asyncio.run(gossiper.sync_with(PeerClient(ReplicationStore("coordinator-rx"), [KEY], sign_responses=False),
+                                       "http://192.168.68.50:8005"))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Mesh Routing Tests
+═══════════════════════════════════════════════════════════════
+Bewertung nach Latenz, Last und Hardware sowie P2C/least-outstanding-Auswahl (routing.py)
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mesh-coordinator"))
+
+from routing import RoutingEngine, reported_load  # noqa: E402
+
+def candidates():
+    return [
+        ("llm-server@rx", {"latency_ewma": 0.02, "health": {"stats": {"in_flight": 0}}}, "rx6700xt"),
+        ("llm-server@m1", {"latency_ewma": 0.02, "health": {"in_flight": 3}}, "apple_silicon"),
+        ("llm-server@i7", {"latency_ewma": 0.2}, "linux_cpu")
+    ]
+
+def test_reported_load_reads_nested_llm_stats():
+    assert reported_load({"in_flight": 1, "queue_depth": 2}) == 3
+    assert reported_load({"stats": {"in_flight": 2}, "busy_workers": 1}) == 3
+    assert reported_load({"in_flight": True}) == 0
+    assert reported_load(None) == 0
+
+def test_rank_orders_by_latency_times_load():
+    engine = RoutingEngine()
+    ranked = engine.rank("llm-server", candidates())
+
+    assert [entry["key"] for entry in ranked] == ["llm-server@rx", "llm-server@m1", "llm-server@i7"]
+    assert abs(sum(entry["weight"] for entry in ranked) - 1.0) < 1e-3
+    assert ranked[0]["weight"] > ranked[1]["weight"]
+
+def test_hardware_preference_and_cpu_alias():
+    engine = RoutingEngine()
+    engine.load_config({"service_preferences": {"llm-server": {"preferred_hardware": ["cpu", "rx6700xt"]}}})
+
+    assert engine.hardware_penalty("llm-server", "linux_cpu") == 1.0
+    assert engine.hardware_penalty("llm-server", "rx6700xt") == 2.0
+    # Unbekannte Hardware wie der letzte Fallback, fremde dahinter
+    assert engine.hardware_penalty("llm-server", None) == 2.0
+    assert engine.hardware_penalty("llm-server", "apple_silicon") == 3.0
+    assert engine.hardware_penalty("tts-service", "apple_silicon") == 1.0
+
+def test_least_outstanding_spreads_by_assignments():
+    engine = RoutingEngine()
+    engine.load_config({"load_balancing": {"strategy": "least_connections"}})
+    assert engine.strategy == "least_outstanding"
+
+    services = [("tts@a", {"latency_ewma": 0.05}, None), ("tts@b", {"latency_ewma": 0.05}, None)]
+    picks = [engine.choose(engine.rank("tts-service", services))["key"] for _ in range(4)]
+    # Jede Zuweisung zählt als ausstehende Arbeit, also abwechselnd
+    assert sorted(picks) == ["tts@a", "tts@a", "tts@b", "tts@b"]
+    assert engine.stats["p2c_samples"] == 0
+
+def test_power_of_two_never_picks_the_worse_of_its_pair():
+    random.seed(7)
+    engine = RoutingEngine(assignment_decay=1e-9)
+    ranked = engine.rank("llm-server", candidates())
+    picks = {engine.choose(ranked)["key"] for _ in range(50)}
+
+    assert "llm-server@i7" not in picks
+    assert picks == {"llm-server@rx", "llm-server@m1"}
+    assert engine.stats["p2c_samples"] == 50
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Mesh Scan State Tests
+═══════════════════════════════════════════════════════════════
+Backoff toter Endpoints, Auffrischen lebender und Persistenz (scan_state.py)
+"""
+
+import asyncio
+import ipaddress
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mesh-coordinator"))
+
+from scan_state import ScanStateStore  # noqa: E402
+from scanner import SubnetScanner  # noqa: E402
+
+NOW = 1_800_000_000.0
+
+def key(ip, port):
+    return int(ipaddress.IPv4Address(ip)), port
+
+def next_probe(store, ip, port):
+    return store._conn.execute("SELECT next_probe FROM endpoints WHERE ip = ? AND port = ?", key(ip, port)).fetchone()[0]
+
+def test_backoff_doubles_per_failure_up_to_limit():
+    store = ScanStateStore(base_backoff=100, max_backoff=1000)
+    waits = []
+    for attempt in range(6):
+        now = NOW + attempt * 10_000
+        store.record("192.168.68.20", 8001, False, now=now)
+        store.flush()
+        waits.append(next_probe(store, "192.168.68.20", 8001) - now)
+
+    # base_backoff * 2^Fehlschläge, jeweils mit ±10 % Jitter
+    for failures, wait in enumerate(waits[:4]):
+        assert 0.9 * 100 * 2 ** failures <= wait <= 1.1 * 100 * 2 ** failures
+    assert waits[-1] == 1000
+
+def test_answer_resets_backoff_and_is_refreshed_live():
+    store = ScanStateStore(live_interval=300, base_backoff=100)
+    store.record("192.168.68.20", 8001, False, now=NOW)
+    store.record("192.168.68.20", 8001, True, service="llm-server", now=NOW + 50)
+
+    assert store.not_due(now=NOW + 100) == {key("192.168.68.20", 8001)}
+    assert store.due_live(now=NOW + 100) == []
+    assert store.due_live(now=NOW + 400) == [("192.168.68.20", 8001, "llm-server")]
+    [endpoint] = store.live_endpoints(max_age=600, now=NOW + 400)
+    assert endpoint["service"] == "llm-server" and endpoint["last_seen"] == NOW + 50
+
+def test_dead_endpoint_is_not_refreshed_live():
+    store = ScanStateStore(base_backoff=100)
+    store.record("192.168.68.21", 8002, False, now=NOW)
+    assert store.due_live(now=NOW + 10_000) == []
+    assert store.get_stats()["backed_off"] == 1
+
+def test_state_survives_restart(tmp_path):
+    path = str(tmp_path / "scan_state.db")
+    store = ScanStateStore(path)
+    store.record("192.168.68.20", 8001, True, service="llm-server")
+    store.close()
+
+    restored = ScanStateStore(path)
+    assert restored.is_known()
+    assert restored.get_stats()["live"] == 1
+
+def test_scanner_skips_endpoints_in_backoff():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    port = listener.getsockname()[1]
+    probed = []
+
+    async def verify(ip, port):
+        return None
+
+    scanner = SubnetScanner(rate=0)
+    try:
+        asyncio.run(scanner.scan([key("127.0.0.1", 0)[0]], [port, port + 1], verify,
+                                 skip={key("127.0.0.1", port + 1)},
+                                 on_probe=lambda ip, probed_port, is_open: probed.append((probed_port, is_open))))
+    finally:
+        listener.close()
+    assert probed == [(port, True)]
+    assert scanner.total == 1
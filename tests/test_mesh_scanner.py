@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Mesh Scanner Tests
+═══════════════════════════════════════════════════════════════
+Zielauswahl, adaptive Connect-Timeouts und Scan gegen lokale Ports (scanner.py)
+"""
+
+import asyncio
+import ipaddress
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "mesh-coordinator"))
+
+from scanner import RTTEstimator, SubnetScanner, expand_targets  # noqa: E402
+
+LOCALHOST = int(ipaddress.IPv4Address("127.0.0.1"))
+
+def test_targets_skip_network_and_excluded_addresses():
+    hosts, ports = expand_targets(["192.168.68.0/30", "kein-netz", "192.168.68.0/30"], [8001, 8002],
+                                  exclude=("192.168.68.2",))
+    assert sorted(str(ipaddress.IPv4Address(host)) for host in hosts) == ["192.168.68.1"]
+    assert ports == [8001, 8002]
+
+def test_timeout_follows_measured_rtt():
+    rtt = RTTEstimator(initial_timeout=2.0, min_timeout=0.25, max_timeout=2.0)
+    assert rtt.timeout == 2.0
+    for _ in range(20):
+        rtt.observe(0.01)
+    assert rtt.timeout == 0.25
+    for _ in range(20):
+        rtt.observe(1.0)
+    assert 1.0 < rtt.timeout <= 2.0
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_open_ports_are_verified():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    open_port = listener.getsockname()[1]
+    closed_port = free_port()
+
+    async def verify(ip, port):
+        return {"url": f"http://{ip}:{port}"}
+
+    scanner = SubnetScanner(concurrency=4, rate=0)
+    try:
+        results = asyncio.run(scanner.scan([LOCALHOST], [open_port, closed_port], verify))
+    finally:
+        listener.close()
+
+    assert results == [{"url": f"http://127.0.0.1:{open_port}"}]
+    progress = scanner.get_progress()
+    assert (progress["total"], progress["completed"], progress["open_ports"], progress["services_found"]) == (2, 2, 1, 1)
+    assert not progress["running"] and progress["srtt"] is not None
+
+def test_failing_verification_does_not_abort_scan():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+
+    async def verify(ip, port):
+        raise RuntimeError("kein HTTP")
+
+    scanner = SubnetScanner(rate=0)
+    try:
+        results = asyncio.run(scanner.scan([LOCALHOST], [listener.getsockname()[1]], verify))
+    finally:
+        listener.close()
+    assert results == [] and scanner.open_ports == 1
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Node Metrics Tests
+═══════════════════════════════════════════════════════════════
+Stufenwahl, Verdichtung (Mittel/Maximum) und Persistenz von node_metrics
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from node_metrics import TIERS, MetricsStore, NodeSeries  # noqa: E402
+
+START = 1_800_000_000.0  # durch 3600 teilbar: Fenstergrenzen liegen auf vollen Stunden
+
+def system_info(load, memory=50.0):
+    return {'load_average': [load, 0.0, 0.0], 'memory_usage': {'usage_percent': memory}}
+
+def fill(store, node_id, seconds, step=30.0, load=lambda ts: 1.0):
+    ts = START
+    while ts < START + seconds:
+        store.record(node_id, system_info(load(ts)), ts=ts)
+        ts += step
+    return ts - step
+
+def test_five_minute_buckets_hold_mean_and_max():
+    store = MetricsStore()
+    # Load steigt je Sample um 1: Fenster 0-300 s enthält 0..9
+    last = fill(store, 'rx-node', 600, load=lambda ts: (ts - START) / 30)
+
+    result = store.query('rx-node', ('load_1m',), start=START, end=last, step=300)
+    assert result['tier'] == '5m'
+    first_bucket = result['series']['load_1m'][0]
+    assert first_bucket == [START, 4.5, 9.0]
+    # Das offene zweite Fenster wird mitgeliefert
+    assert result['series']['load_1m'][1] == [START + 300, 14.5, 19.0]
+
+def test_raw_tier_is_chosen_while_it_covers_the_range():
+    store = MetricsStore()
+    last = fill(store, 'rx-node', 3600)
+    result = store.query('rx-node', start=last - 600, end=last)
+    assert result['tier'] == 'raw'
+    assert len(result['series']['load_1m']) == 21
+
+def test_coarser_tier_once_raw_ring_has_wrapped():
+    series = NodeSeries()
+    raw_capacity = dict((name, capacity) for name, _, capacity in TIERS)['raw']
+    for index in range(raw_capacity + 100):
+        series.add(START + 30 * index, (1.0, 50.0, 10.0))
+
+    assert series.choose_tier(START + 30 * 200) == ('raw', 0)
+    # Älteste Raw-Samples sind überschrieben: für den Anfang bleibt nur eine Verdichtungsstufe
+    assert series.choose_tier(START) == ('5m', 300)
+    assert series.choose_tier(START, step=3600) == ('1h', 3600)
+
+def test_missing_values_become_null():
+    store = MetricsStore()
+    store.record('m1-mac', {'load_average': [0.7]}, ts=START)
+    point = store.query('m1-mac', ('memory_percent',), start=START, end=START)['series']['memory_percent'][0]
+    assert point == [START, None, None]
+    assert store.record('m1-mac', {'status': 'online'}, ts=START + 30) is False
+
+def test_save_and_load_round_trip(tmp_path):
+    store = MetricsStore(tmp_path / 'metrics.bin')
+    last = fill(store, 'rx-node', 900, load=lambda ts: (ts - START) / 30)
+    store.save()
+
+    restored = MetricsStore(tmp_path / 'metrics.bin')
+    assert restored.load() == 1
+    for step in (None, 300):
+        assert (restored.query('rx-node', start=START, end=last, step=step) ==
+                store.query('rx-node', start=START, end=last, step=step))
+
+def test_sample_counter_is_exact_under_parallel_heartbeats():
+    store = MetricsStore()
+
+    def heartbeat(node_id):
+        for index in range(500):
+            store.record(node_id, system_info(1.0), ts=START + 30 * index)
+
+    threads = [threading.Thread(target=heartbeat, args=(f'node-{index}',)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.samples == 8 * 500
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Node Registry Tests
+═══════════════════════════════════════════════════════════════
+Zählung aktiver Nodes über den Heap und parallele Heartbeats auf Stripe-Locks
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from m1_handshake_server import NodeRegistry  # noqa: E402
+
+def node(node_id, state_version=1, **extra):
+    return {'node_id': node_id, 'timestamp': time.time(), 'status': 'online', 'state_version': state_version, **extra}
+
+def test_expired_nodes_leave_the_active_count():
+    registry = NodeRegistry(timeout=0.2)
+    registry.register_node(node('rx-node'))
+    registry.register_node(node('m1-mac'))
+    assert registry.active_count() == 2
+
+    time.sleep(0.25)
+    registry.touch('m1-mac', 1)
+    assert registry.active_count() == 1
+    summary = registry.get_cluster_summary()
+    assert (summary['total_nodes'], summary['active_nodes']) == (2, 1)
+    assert list(summary['nodes']) == ['m1-mac']
+    assert 'nodes' not in registry.get_cluster_summary(include_nodes=False)
+
+def test_heartbeat_reactivates_expired_node():
+    registry = NodeRegistry(timeout=0.2)
+    registry.register_node(node('rx-node'))
+    time.sleep(0.25)
+    assert registry.active_count() == 0
+    assert registry.touch('rx-node', 1) is not None
+    assert registry.active_count() == 1
+
+def test_touch_requires_known_state_version():
+    registry = NodeRegistry()
+    assert registry.touch('rx-node', 1) is None
+    registry.register_node(node('rx-node', state_version=3))
+    assert registry.touch('rx-node', 2) is None
+    assert registry.touch('rx-node', 3)['node_id'] == 'rx-node'
+
+def test_parallel_heartbeats_keep_count_consistent():
+    registry = NodeRegistry()
+    node_ids = [f'node-{index}' for index in range(40)]
+
+    def heartbeat(offset):
+        for round_index in range(50):
+            node_id = node_ids[(offset + round_index) % len(node_ids)]
+            registry.register_node(node(node_id, load=round_index))
+            registry.touch(node_id, 1)
+
+    threads = [threading.Thread(target=heartbeat, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.active_count() == len(node_ids)
+    assert len(registry.get_active_nodes()) == len(node_ids)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Pooled HTTP Server Tests
+═══════════════════════════════════════════════════════════════
+Keep-Alive-Verbindungen im Leerlauf dürfen keine Worker des Thread-Backends belegen
+"""
+
+import http.client
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from m1_handshake_server import HandshakeHandler, PooledHTTPServer  # noqa: E402
+
+def start_server(workers=2, keepalive_timeout=30.0):
+    server = PooledHTTPServer(('127.0.0.1', 0), HandshakeHandler, workers=workers,
+                              keepalive_timeout=keepalive_timeout)
+    server.ctx = SimpleNamespace(heartbeat_listener=None)
+    server.admin_timeout = 1
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+def health(connection):
+    connection.request('GET', '/health')
+    response = connection.getresponse()
+    response.read()
+    return response.status
+
+def test_idle_keep_alive_connections_do_not_block_workers():
+    server = start_server(workers=2)
+    port = server.server_address[1]
+    idle = [http.client.HTTPConnection('127.0.0.1', port, timeout=5) for _ in range(2)]
+    try:
+        for connection in idle:
+            assert health(connection) == 200
+        # Beide Verbindungen bleiben offen, der dritte Client muss trotzdem sofort bedient werden
+        started = time.monotonic()
+        third = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        assert health(third) == 200
+        assert time.monotonic() - started < 1.0
+        third.close()
+
+        # Wiederverwendung der geparkten Verbindungen
+        for connection in idle:
+            assert health(connection) == 200
+    finally:
+        for connection in idle:
+            connection.close()
+        stop_server(server)
+
+def test_pipelined_requests_are_answered_in_order():
+    server = start_server(workers=1)
+    try:
+        with socket.create_connection(server.server_address, timeout=5) as sock:
+            sock.sendall(b'GET /health HTTP/1.1\r\nHost: x\r\n\r\nGET /nodes-unbekannt HTTP/1.1\r\nHost: x\r\n\r\n')
+            received = b''
+            while received.count(b'HTTP/1.1 ') < 2:
+                chunk = sock.recv(65536)
+                assert chunk
+                received += chunk
+        first, second = received.split(b'HTTP/1.1 ')[1:3]
+        assert first.startswith(b'200') and second.startswith(b'404')
+    finally:
+        stop_server(server)
+
+def test_idle_connection_is_closed_after_keepalive_timeout():
+    server = start_server(keepalive_timeout=0.5)
+    try:
+        connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+        assert health(connection) == 200
+        # Leerlauf-Prüfung läuft im Sekundentakt; der Server schließt, der Client liest EOF
+        assert connection.sock.recv(1) == b''
+        connection.close()
+    finally:
+        stop_server(server)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Registry Journal Tests
+═══════════════════════════════════════════════════════════════
+WAL-Replay des Node Registry nach einem Absturz mitten im Schreiben
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from m1_handshake_server import NodeRegistry, RegistryJournal  # noqa: E402
+
+def node(node_id, status='online'):
+    return {'node_id': node_id, 'timestamp': 0, 'status': status, 'state_version': 1}
+
+def stop_without_compaction(journal):
+    """Wie ein Absturz nach dem letzten fsync: alles steht im WAL, kein Snapshot"""
+    journal.flush()
+    journal._stopped = True
+    journal._wake.set()
+    journal._thread.join(timeout=5)
+    journal._wal.close()
+
+def write_registry(state_dir, *nodes):
+    journal = RegistryJournal(state_dir, flush_interval=60)
+    registry = NodeRegistry(journal=journal)
+    for data in nodes:
+        registry.register_node(data)
+    stop_without_compaction(journal)
+
+def test_truncated_last_line_is_ignored_and_removed(tmp_path):
+    write_registry(tmp_path, node('rx-node'), node('m1-mac'))
+    wal_path = tmp_path / 'registry.wal'
+    intact_size = wal_path.stat().st_size
+    # Absturz während des Schreibens: halbe JSON-Zeile ohne Zeilenende
+    with open(wal_path, 'ab') as wal:
+        wal.write(b'{"node_id":"i7-node","last_seen":17')
+
+    journal = RegistryJournal(tmp_path)
+    entries = journal.load()
+
+    assert [entry['node_id'] for entry in entries] == ['rx-node', 'm1-mac']
+    assert wal_path.stat().st_size == intact_size
+
+def test_replay_continues_after_truncation(tmp_path):
+    write_registry(tmp_path, node('rx-node'))
+    with open(tmp_path / 'registry.wal', 'ab') as wal:
+        wal.write(b'{"node_id":"rx-no')
+
+    journal = RegistryJournal(tmp_path, flush_interval=60)
+    registry = NodeRegistry(journal=journal)
+    registry.register_node(node('m1-mac'))
+    stop_without_compaction(journal)
+
+    # Neue Einträge dürfen nicht an der kaputten Zeile hängen
+    replayed = RegistryJournal(tmp_path).load()
+    assert [entry['node_id'] for entry in replayed] == ['rx-node', 'm1-mac']
+
+def test_restore_keeps_newest_state(tmp_path):
+    write_registry(tmp_path, node('rx-node', 'online'), node('rx-node', 'busy'))
+
+    journal = RegistryJournal(tmp_path, flush_interval=60)
+    registry = NodeRegistry(journal=journal)
+    try:
+        assert registry.get_node_status('rx-node')['status'] == 'busy'
+        assert registry.active_count() == 1
+    finally:
+        stop_without_compaction(journal)
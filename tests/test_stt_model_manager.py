@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - STT Model Manager Tests
+═══════════════════════════════════════════════════════════════
+Lazy Load, Fehler-Backoff und Entladen des Whisper-Modells (ohne echtes Whisper)
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "stt-service"))
+
+from model_manager import ModelUnavailableError, WhisperModelManager  # noqa: E402
+
+class FakeWhisper:
+    def __init__(self, delay=0.0, release=None):
+        self.delay = delay
+        self.release = release
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        time.sleep(self.delay)
+        return {"text": f"transkript {self.calls}", "segments": []}
+
+def manager_with(model=None, error=None, **kwargs):
+    manager = WhisperModelManager(warmup=False, **kwargs)
+    loads = []
+
+    def load():
+        loads.append(time.time())
+        time.sleep(0.05)
+        if error is not None:
+            raise error
+        return model or FakeWhisper()
+
+    manager._load_blocking = load
+    return manager, loads
+
+def test_concurrent_requests_load_the_model_once():
+    manager, loads = manager_with()
+
+    async def scenario():
+        return await asyncio.gather(*[manager.transcribe("clip.wav") for _ in range(4)])
+
+    results = asyncio.run(scenario())
+    assert len(loads) == 1
+    assert [result["text"] for result in results] == [f"transkript {index}" for index in range(1, 5)]
+    status = manager.get_status()
+    assert (status["state"], status["load_count"], status["in_use"]) == ("loaded", 1, 0)
+
+def test_failed_load_is_not_retried_before_backoff():
+    manager, loads = manager_with(error=RuntimeError("kein Speicher"), retry_after_seconds=60)
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(ModelUnavailableError, match="kein Speicher"):
+                await manager.ensure_loaded()
+
+    asyncio.run(scenario())
+    assert len(loads) == 1
+    assert manager.get_status()["state"] == "failed"
+
+def test_unload_waits_for_running_transcription():
+    release = threading.Event()
+    manager, _ = manager_with(model=FakeWhisper(release=release))
+
+    async def scenario():
+        running = asyncio.create_task(manager.transcribe("clip.wav"))
+        while not manager.in_use:
+            await asyncio.sleep(0.01)
+        await manager.unload()
+        assert manager.is_loaded
+        release.set()
+        await running
+        await manager.unload()
+
+    asyncio.run(scenario())
+    assert not manager.is_loaded
+    assert manager.get_status()["unload_count"] == 1
+
+def test_model_is_reloaded_after_unload():
+    manager, loads = manager_with()
+
+    async def scenario():
+        await manager.transcribe("clip.wav")
+        await manager.unload()
+        await manager.transcribe("clip.wav")
+
+    asyncio.run(scenario())
+    assert len(loads) == 2
+    assert manager.get_status()["load_count"] == 2
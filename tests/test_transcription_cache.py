@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - STT Transcription Cache Tests
+═══════════════════════════════════════════════════════════════
+Fingerprint-Treffer für verrauschte Kopien desselben Clips (services/stt-service)
+"""
+
+import io
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "stt-service"))
+
+from transcription_cache import AudioFingerprint, TranscriptionCache  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+def speech_like_clip(seed: int, noise_seed: int, noise_db: float = -45.0) -> bytes:
+    """Vier stimmhafte Abschnitte mit Pausen dazwischen, plus weißes Rauschen als 16-bit WAV"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for _ in range(4):
+        parts.append(np.zeros(int(0.6 * SAMPLE_RATE)))
+        t = np.arange(int(rng.uniform(0.4, 0.9) * SAMPLE_RATE)) / SAMPLE_RATE
+        f0 = rng.uniform(100, 220) * (1 + 0.2 * np.sin(2 * np.pi * rng.uniform(2, 5) * t))
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 15)) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)) ** 2
+        parts.append(0.3 * voiced / np.abs(voiced).max())
+    parts.append(np.zeros(int(0.6 * SAMPLE_RATE)))
+    samples = np.concatenate(parts)
+    samples += np.random.default_rng(noise_seed).normal(0, 10 ** (noise_db / 20), len(samples))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+def test_silent_frames_are_masked():
+    fingerprint = AudioFingerprint.from_wav(speech_like_clip(1, 10))
+    assert fingerprint is not None
+    assert 0.0 < fingerprint.active.mean() < 1.0
+
+def test_noisy_copies_hit_the_cache():
+    cache = TranscriptionCache()
+    original = speech_like_clip(1, 10)
+    _, key, fingerprint = cache.lookup(original)
+    cache.put(key, {"text": "hallo gentleman"}, fingerprint)
+
+    for noise_seed in (11, 12, 13):
+        result, _, _ = cache.lookup(speech_like_clip(1, noise_seed))
+        assert result == {"text": "hallo gentleman"}
+    assert cache.stats["hits_fingerprint"] == 3
+
+def test_bit_error_rate_ignores_noise_in_pauses():
+    a = AudioFingerprint.from_wav(speech_like_clip(1, 10, noise_db=-40.0))
+    b = AudioFingerprint.from_wav(speech_like_clip(1, 11, noise_db=-40.0))
+    assert a.bit_error_rate(b) <= 0.08
+
+def test_different_clip_misses():
+    cache = TranscriptionCache()
+    _, key, fingerprint = cache.lookup(speech_like_clip(1, 10))
+    cache.put(key, {"text": "hallo gentleman"}, fingerprint)
+
+    result, _, _ = cache.lookup(speech_like_clip(2, 10))
+    assert result is None
+    assert cache.stats["misses"] == 2
+
+def test_exact_hit_skips_fingerprint():
+    cache = TranscriptionCache()
+    clip = speech_like_clip(1, 10)
+    _, key, fingerprint = cache.lookup(clip)
+    cache.put(key, {"text": "hallo gentleman"}, fingerprint)
+
+    result, _, fingerprint = cache.lookup(clip)
+    assert result == {"text": "hallo gentleman"}
+    assert fingerprint is None
+    assert (cache.stats["hits_exact"], cache.stats["hits_fingerprint"], cache.stats["misses"]) == (1, 0, 1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - TTS Audio Cache Tests
+═══════════════════════════════════════════════════════════════
+Schlüssel-Normalisierung, Speicher-LRU und mmap-Disk-Stufe des Phrasen-Caches
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "tts-service"))
+
+from audio_cache import SynthesisCache, make_cache_key  # noqa: E402
+from tts_pool import RenderedAudio  # noqa: E402
+
+def audio(size, fill=b"\x01"):
+    return RenderedAudio(22050, 1, 2, fill * size)
+
+def test_key_ignores_whitespace_and_unicode_form():
+    composed = make_cache_key("Grüß  Gott ", "anna", 1.0, "wav")
+    decomposed = make_cache_key("Gru\u0308ß Gott", "anna", 1.0, "wav")
+    assert composed == decomposed
+    assert make_cache_key("Grüß Gott", "anna", 1.1, "wav") != composed
+    assert make_cache_key("Grüß Gott", "anna", 1.0, "opus") != composed
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = SynthesisCache(max_memory_bytes=250)
+    cache.put("a", audio(100))
+    cache.put("b", audio(100))
+    assert cache.get("a") is not None
+    cache.put("c", audio(100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats["evictions_memory"] == 1
+
+def test_disk_tier_survives_restart(tmp_path):
+    SynthesisCache(disk_dir=str(tmp_path)).put("phrase", audio(64, b"\x02"))
+
+    restored = SynthesisCache(disk_dir=str(tmp_path))
+    hit = restored.get("phrase")
+    assert hit.frames == b"\x02" * 64 and hit.sample_rate == 22050
+    assert restored.stats["hits_disk"] == 1
+    # Danach liegt der Eintrag wieder im Speicher
+    restored.get("phrase")
+    assert restored.stats["hits_memory"] == 1
+
+def test_corrupt_disk_entry_is_dropped(tmp_path):
+    SynthesisCache(disk_dir=str(tmp_path)).put("phrase", audio(64))
+    (tmp_path / "phrase.pcm").write_bytes(b"kaputt")
+
+    cache = SynthesisCache(disk_dir=str(tmp_path))
+    assert cache.get("phrase") is None
+    assert not (tmp_path / "phrase.pcm").exists()
+
+def test_disk_tier_is_trimmed_below_budget(tmp_path):
+    cache = SynthesisCache(max_memory_bytes=0, disk_dir=str(tmp_path), max_disk_bytes=500)
+    for index in range(6):
+        cache.put(f"phrase-{index}", audio(100))
+
+    assert cache.stats["evictions_disk"] > 0
+    assert sum(entry.stat().st_size for entry in tmp_path.glob("*.pcm")) <= 500
+    assert cache.get_stats()["disk_bytes"] <= 500
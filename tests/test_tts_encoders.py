@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - TTS Encoder Tests
+═══════════════════════════════════════════════════════════════
+Format- und Sample-Rate-Aushandlung, Resampling und WAV/PCM-Streams
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "tts-service"))
+
+import encoders  # noqa: E402
+from encoders import (  # noqa: E402
+    UnsupportedFormatError, create_encoder, negotiate_format, negotiate_sample_rate, resample_pcm16
+)
+
+@pytest.fixture
+def without_ffmpeg(monkeypatch):
+    monkeypatch.setattr(encoders, "ffmpeg_available", lambda: False)
+
+@pytest.fixture
+def with_ffmpeg(monkeypatch):
+    monkeypatch.setattr(encoders, "ffmpeg_available", lambda: True)
+
+def test_request_field_wins_over_accept_header(with_ffmpeg):
+    assert negotiate_format("ogg", "audio/flac") == "opus"
+    assert negotiate_format(None, "audio/flac;q=0.9, audio/wav") == "flac"
+    assert negotiate_format(None, None) == "wav"
+    with pytest.raises(UnsupportedFormatError):
+        negotiate_format("mp3", None)
+
+def test_compressed_formats_need_ffmpeg(without_ffmpeg):
+    assert negotiate_format(None, "audio/ogg, audio/L16") == "pcm"
+    with pytest.raises(UnsupportedFormatError, match="ffmpeg"):
+        negotiate_format("flac", None)
+
+def test_sample_rate_snaps_to_supported_value():
+    assert negotiate_sample_rate("wav", None, 22050) == 22050
+    assert negotiate_sample_rate("opus", None, 22050) == 24000
+    assert negotiate_sample_rate("wav", 20000, 22050) == 22050
+    assert negotiate_sample_rate("opus", 96000, 22050) == 48000
+
+def test_resampling_keeps_duration_and_signal():
+    source = (np.sin(np.linspace(0, 20 * np.pi, 2205)) * 10000).astype("<i2")
+    resampled = np.frombuffer(resample_pcm16(source.tobytes(), 1, 22050, 16000), dtype="<i2")
+    assert len(resampled) == 1600
+    assert abs(int(resampled.max()) - int(source.max())) < 200
+    assert resample_pcm16(source.tobytes(), 1, 22050, 22050) == source.tobytes()
+
+def test_wav_and_pcm_streams_count_bytes():
+    async def encode(fmt):
+        encoder = create_encoder(fmt, 16000, 1)
+        output = await encoder.start()
+        output += await encoder.feed(b"\x00\x01" * 16000)
+        output += await encoder.finish()
+        return encoder, output
+
+    wav, wav_bytes = asyncio.run(encode("wav"))
+    pcm, pcm_bytes = asyncio.run(encode("pcm"))
+    assert wav_bytes[:4] == b"RIFF" and len(wav_bytes) == 44 + 32000
+    assert pcm_bytes == b"\x00\x01" * 16000
+    assert wav.audio_seconds == pcm.audio_seconds == 1.0
+    assert pcm.media_type == "audio/L16;rate=16000;channels=1"
+    with pytest.raises(UnsupportedFormatError):
+        create_encoder("wav", 16000, 1, sample_width=1)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - TTS Worker Pool Tests
+═══════════════════════════════════════════════════════════════
+Worker-Prozesse, Warteschlangen-Limit und Ersatz abgestürzter Worker
+Ohne pyttsx3 liefern die Worker eine Sekunde Stille je Job.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "tts-service"))
+
+from tts_pool import FALLBACK_SAMPLE_RATE, PoolFullError, TTSWorkerPool, WorkerCrashedError  # noqa: E402
+
+def run_with_pool(scenario, **kwargs):
+    async def main():
+        pool = TTSWorkerPool(**kwargs)
+        await pool.start()
+        try:
+            return await scenario(pool)
+        finally:
+            await pool.shutdown()
+    return asyncio.run(main())
+
+def test_jobs_are_spread_over_the_pool():
+    async def scenario(pool):
+        results = await asyncio.gather(*[pool.synthesize(f"Satz {index}") for index in range(4)])
+        return pool, results, {worker_id: worker.jobs_done for worker_id, worker in pool.workers.items()}
+
+    pool, results, jobs_done = run_with_pool(scenario, size=2)
+    assert all(audio.sample_rate == FALLBACK_SAMPLE_RATE and audio.duration == 1.0 for audio in results)
+    assert sorted(jobs_done) == [0, 1] and sum(jobs_done.values()) == 4
+    assert pool.stats["jobs_completed"] == 4
+
+def test_full_queue_rejects_new_jobs():
+    async def scenario(pool):
+        with pytest.raises(PoolFullError):
+            await pool.synthesize("Hallo")
+        return pool
+
+    pool = run_with_pool(scenario, size=1, max_queue=0)
+    assert pool.stats["jobs_rejected"] == 1
+
+def test_crashed_worker_is_replaced():
+    async def scenario(pool):
+        [worker] = pool.workers.values()
+        worker.process.kill()
+        worker.process.join(timeout=5)
+        with pytest.raises(WorkerCrashedError):
+            await pool.synthesize("Hallo")
+
+        # Der Ersatz startet im Hintergrund und übernimmt den nächsten Job
+        audio = await pool.synthesize("Hallo")
+        return pool, audio, list(pool.workers)
+
+    pool, audio, worker_ids = run_with_pool(scenario, size=1)
+    assert audio.duration == 1.0
+    assert pool.stats["worker_restarts"] == 1
+    assert worker_ids == [1]
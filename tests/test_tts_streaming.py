@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - TTS Streaming Tests
+═══════════════════════════════════════════════════════════════
+Satz-Chunking und offener WAV-Header für die gestreamte Synthese
+"""
+
+import io
+import struct
+import sys
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "tts-service"))
+
+from streaming import STREAMING_DATA_SIZE, split_sentences, wav_stream_header  # noqa: E402
+
+def test_text_is_split_into_sentences():
+    text = "Guten Morgen, wie geht es dir heute? Das Wetter ist schön. Ich mache gleich einen Spaziergang!"
+    assert split_sentences(text) == [
+        "Guten Morgen, wie geht es dir heute?",
+        "Das Wetter ist schön.",
+        "Ich mache gleich einen Spaziergang!"
+    ]
+
+def test_short_fragments_are_merged_with_the_next_sentence():
+    chunks = split_sentences("Ja. Okay. Dann starten wir jetzt mit der Synthese.")
+    assert chunks == ["Ja. Okay. Dann starten wir jetzt mit der Synthese."]
+    # Ein kurzer Rest am Ende hängt am letzten Chunk
+    assert split_sentences("Dann starten wir jetzt mit der Synthese. Gut.") == [
+        "Dann starten wir jetzt mit der Synthese. Gut."
+    ]
+
+def test_long_sentence_is_split_at_clauses():
+    clause = "dieser Nebensatz ist absichtlich recht lang geraten"
+    text = ", ".join([clause] * 8) + "."
+    chunks = split_sentences(text, max_chars=120)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks) == text
+
+def test_stream_header_is_readable_wav():
+    header = wav_stream_header(22050, channels=1, sample_width=2)
+    assert len(header) == 44
+    assert struct.unpack_from("<I", header, 4)[0] == STREAMING_DATA_SIZE
+
+    # Header plus ein paar Frames lassen sich als WAV öffnen, obwohl die Länge offen ist
+    with wave.open(io.BytesIO(header + b"\x00\x00" * 100), "rb") as wav:
+        assert (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) == (22050, 1, 2)
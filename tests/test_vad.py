@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - STT Voice Activity Detection Tests
+═══════════════════════════════════════════════════════════════
+Trimmen von Stille, Padding um Sprache und Rückabbildung der Zeitstempel
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "services" / "stt-service"))
+
+from vad import VoiceActivityDetector  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+def tone(seconds: float, amplitude: float = 0.3) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    return np.random.default_rng(0).normal(0, 1e-3, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+def seconds(regions):
+    return [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in regions]
+
+def test_leading_and_trailing_silence_is_trimmed_with_padding():
+    vad = VoiceActivityDetector()
+    result = vad.process(np.concatenate([silence(1.0), tone(1.0), silence(1.0)]), SAMPLE_RATE)
+
+    [(start, end)] = seconds(result.regions)
+    padding = vad.padding_ms / 1000
+    # Sprache liegt bei 1.0-2.0 s: Padding davor, Padding plus Hangover danach
+    assert 1.0 - padding - 0.05 <= start <= 1.0 - padding + 0.03
+    assert 2.0 + padding <= end <= 2.0 + padding + vad.hangover_ms / 1000 + 0.05
+    assert abs(result.output_duration - (end - start)) < 1e-6
+    assert 0.4 < result.removed_fraction < 0.6
+
+def test_long_pause_is_shortened_to_gap():
+    vad = VoiceActivityDetector()
+    result = vad.process(np.concatenate([silence(1.0), tone(0.5), silence(2.0), tone(0.5), silence(1.0)]),
+                         SAMPLE_RATE)
+
+    assert len(result.regions) == 2
+    lengths = sum(end - start for start, end in result.regions) / SAMPLE_RATE
+    assert abs(result.output_duration - (lengths + vad.gap_ms / 1000)) < 1e-6
+    # Beginn der zweiten Region im getrimmten Audio -> Beginn im Original
+    first_start, first_end = seconds(result.regions)[0]
+    second_start = seconds(result.regions)[1][0]
+    assert abs(result.map_time(first_end - first_start + vad.gap_ms / 1000) - second_start) < 1e-6
+
+def test_short_pause_stays_in_one_region():
+    vad = VoiceActivityDetector(max_pause_ms=600)
+    result = vad.process(np.concatenate([silence(1.0), tone(0.5), silence(0.3), tone(0.5), silence(1.0)]),
+                         SAMPLE_RATE)
+    assert len(result.regions) == 1
+
+def test_silence_only_is_silent():
+    vad = VoiceActivityDetector()
+    assert vad.process(silence(2.0), SAMPLE_RATE).is_silent
+    assert vad.process(np.zeros(2 * SAMPLE_RATE, dtype=np.float32), SAMPLE_RATE).is_silent
+    assert vad.process(np.zeros(10, dtype=np.float32), SAMPLE_RATE).is_silent
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+🎩 GENTLEMAN - Voice Pipeline Tests
+═══════════════════════════════════════════════════════════════
+Satz-Chunking des LLM-Streams, Reihenfolge der Audio-Antworten und Barge-in
+(services/voice-pipeline, STT/LLM/TTS durch einen Test-Client ersetzt)
+"""
+
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+MAIN = Path(__file__).resolve().parent.parent / "services" / "voice-pipeline" / "main.py"
+spec = importlib.util.spec_from_file_location("voice_pipeline_main", MAIN)
+pipeline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pipeline)
+
+class Response:
+    def __init__(self, payload=None, content=b"", headers=None, lines=()):
+        self.payload = payload
+        self.content = content
+        self.headers = headers or {}
+        self.lines = lines
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+    async def aread(self):
+        return json.dumps(self.payload).encode("utf-8")
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            await asyncio.sleep(0)
+            yield line
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class Services:
+    """STT, LLM und TTS in einem; TTS für den ersten Satz absichtlich am langsamsten"""
+
+    def __init__(self, tokens, tts_delays=(0.05, 0.0, 0.0), llm_delay=0.0):
+        self.tokens = tokens
+        self.tts_delays = list(tts_delays)
+        self.llm_delay = llm_delay
+        self.synthesized = []
+
+    async def post(self, url, files=None, json=None):
+        if url.endswith("/transcribe"):
+            name, audio, _ = files["audio"]
+            return Response({"text": audio.decode("utf-8")})
+        delay = self.tts_delays[len(self.synthesized)] if len(self.synthesized) < len(self.tts_delays) else 0.0
+        self.synthesized.append(json["text"])
+        await asyncio.sleep(delay)
+        return Response(content=json["text"].encode("utf-8"), headers={"content-type": "audio/wav"})
+
+    def stream(self, method, url, json=None):
+        lines = [_json({"token": token}) for token in self.tokens] + [_json({"done": True})]
+        if self.llm_delay:
+            lines = [""] * 1000 + lines
+        return Response(headers={"content-type": "application/x-ndjson"}, lines=lines)
+
+def _json(payload):
+    return json.dumps(payload)
+
+class WebSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, text):
+        self.messages.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        self.messages.append(data)
+
+def run_session(services, scenario):
+    async def main():
+        pipeline.state.client = services
+        session = pipeline.VoiceSession(WebSocket())
+        await scenario(session)
+        return session.websocket.messages
+    return asyncio.run(main())
+
+def test_chunker_emits_sentences_and_holds_short_fragments():
+    chunker = pipeline.SentenceChunker(min_chars=20)
+    assert chunker.feed("Ja. Das ist ein ganzer ") == []
+    assert chunker.feed("Satz. Und noch") == ["Ja. Das ist ein ganzer Satz."]
+    assert chunker.feed(" einer!\n") == []
+    assert chunker.flush() == "Und noch einer!"
+    assert chunker.flush() is None
+
+def test_turn_streams_audio_in_sentence_order():
+    tokens = ["Guten Morgen, hier spricht ", "Gentleman. ", "Heute wird es sonnig ", "und warm. ", "Bis später!"]
+
+    async def scenario(session):
+        session.add_segment(b"wie wird")
+        session.add_segment(b"das Wetter")
+        session.start_turn()
+        await session.turn_task
+
+    messages = run_session(Services(tokens), scenario)
+    events = [message for message in messages if isinstance(message, dict)]
+    transcript = [event for event in events if event["type"] == "transcript" and not event["partial"]]
+    assert transcript[0]["text"] == "wie wird das Wetter"
+
+    audio_headers = [event for event in events if event["type"] == "audio"]
+    assert [header["index"] for header in audio_headers] == [0, 1, 2]
+    # Auf jeden Audio-Header folgt direkt sein Binärframe
+    for header in audio_headers:
+        position = messages.index(header)
+        assert messages[position + 1] == header["text"].encode("utf-8")
+
+    done = events[-1]
+    assert done["type"] == "done" and done["sentences"] == 3
+    assert done["response"] == "".join(tokens).strip()
+    assert done["latency"]["first_audio"] <= done["latency"]["total"]
+
+def test_typed_text_skips_stt_and_empty_turn_finishes_quietly():
+    async def scenario(session):
+        await session.handle_control({"type": "text", "text": "Hallo Gentleman"})
+        session.start_turn()
+        await session.turn_task
+        session.start_turn()
+        await session.turn_task
+
+    messages = run_session(Services(["Hallo zurück, schön dich zu hören."]), scenario)
+    done = [message for message in messages if isinstance(message, dict) and message["type"] == "done"]
+    assert done[0]["transcript"] == "Hallo Gentleman" and done[0]["sentences"] == 1
+    assert done[1]["transcript"] == "" and done[1]["response"] == ""
+
+def test_llm_error_event_fails_the_turn():
+    class FailingLLM(Services):
+        def stream(self, method, url, json=None):
+            return Response(headers={"content-type": "application/x-ndjson"},
+                            lines=[_json({"token": "Moment"}), _json({"done": True, "error": "CUDA out of memory"})])
+
+    async def scenario(session):
+        await session.handle_control({"type": "text", "text": "Hallo"})
+        session.start_turn()
+        await session.turn_task
+
+    messages = run_session(FailingLLM([]), scenario)
+    assert messages[-1]["type"] == "error" and messages[-1]["stage"] == "llm"
+    assert "CUDA" in messages[-1]["detail"]
+
+def test_cancel_stops_the_running_answer():
+    async def scenario(session):
+        await session.handle_control({"type": "text", "text": "Erzähl mir eine lange Geschichte"})
+        await session.handle_control({"type": "end"})
+        await asyncio.sleep(0.01)
+        await session.handle_control({"type": "cancel"})
+        with pytest.raises(asyncio.CancelledError):
+            await session.turn_task
+        # Ohne laufende Antwort ist cancel wirkungslos
+        await session.handle_control({"type": "cancel"})
+
+    cancelled_before = pipeline.state.stats["turns_cancelled"]
+    messages = run_session(Services(["Es war einmal. "] * 3, llm_delay=1.0), scenario)
+    assert [message["type"] for message in messages if isinstance(message, dict)].count("cancelled") == 1
+    assert not any(isinstance(message, dict) and message["type"] == "done" for message in messages)
+    assert pipeline.state.stats["turns_cancelled"] == cancelled_before + 1